@@ -0,0 +1,104 @@
+"""
+Quick Vworld 명령줄 도구
+
+QGIS GUI 없이 VWorld 레이어를 파일로 다운로드합니다. 플러그인 폴더의
+상위 디렉토리에서 QGIS Python 환경으로 실행합니다:
+
+    python -m QuickVworld download lt_c_uq111 --bbox 126.95,37.56,127.02,37.63 -o out.gpkg
+    python -m QuickVworld download lt_c_uq111 --aoi sig.gpkg --where "SIG_CD = '11110'" -o out.geojson
+    python -m QuickVworld job nightly.json
+
+중단된 다운로드는 같은 명령을 다시 실행하면 이어서 진행합니다.
+종료 코드: 0 완료, 1 미완료(다시 실행하면 이어받음), 2 잘못된 인자
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Without a display the GUI-less application still needs a Qt platform
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+def _parse_bbox(text):
+    try:
+        values = tuple(float(value) for value in text.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"잘못된 bbox: {text}")
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError("bbox는 xmin,ymin,xmax,ymax 형식입니다")
+    return values
+
+
+def _parse_list(text):
+    return [value.strip() for value in text.split(',') if value.strip()]
+
+
+def _print_progress(progress):
+    sys.stderr.write(f"\r진행률 {progress:5.1f}%")
+    sys.stderr.flush()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m QuickVworld', description='Quick Vworld 명령줄 다운로드')
+    parser.add_argument('-v', '--verbose', action='store_true', help='상세 로그 출력')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    download = commands.add_parser('download', help='레이어 하나를 범위 또는 AOI 파일로 다운로드')
+    download.add_argument('typename', help='레이어 typename (예: lt_c_uq111)')
+    area = download.add_mutually_exclusive_group(required=True)
+    area.add_argument('--bbox', type=_parse_bbox, help='범위 xmin,ymin,xmax,ymax (EPSG:4326)')
+    area.add_argument('--aoi', help='관심 지역 벡터 파일')
+    download.add_argument('--where', help='AOI 파일에서 사용할 피처를 고르는 표현식')
+    download.add_argument('-o', '--output', required=True, help='출력 파일 (.gpkg 또는 .geojson)')
+    download.add_argument('--format', choices=['gpkg', 'geojson'], help='출력 형식 (기본: 파일 확장자)')
+    download.add_argument('--properties', type=_parse_list, help='저장할 속성 (쉼표로 구분)')
+    download.add_argument('--filter', help='피처 필터 (QGIS 표현식)')
+    download.add_argument('--api-key', help='VWorld API 키')
+    download.add_argument('--tile-size', type=float, help='타일 크기 (도)')
+    download.add_argument('--workers', type=int, help='동시 요청 수')
+
+    job = commands.add_parser('job', help='작업 매니페스트(JSON/YAML) 실행')
+    job.add_argument('manifest', help='작업 매니페스트 파일')
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s %(levelname)s %(message)s'
+    )
+
+    # QGIS is only imported once the arguments are known to be valid
+    from .core.headless import download, run_job, start_qgis
+    from .core.jobs import load_manifest
+
+    app = start_qgis()
+    try:
+        if args.command == 'download':
+            finished, summary = download(
+                args.typename, args.output,
+                bbox=args.bbox, aoi_file=args.aoi, aoi_where=args.where,
+                output_format=args.format, properties=args.properties,
+                expression=args.filter, api_key=args.api_key,
+                tile_size=args.tile_size, workers=args.workers,
+                progress_callback=_print_progress
+            )
+        else:
+            finished, summary = run_job(load_manifest(args.manifest), _print_progress)
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"오류: {e}\n")
+        return 2
+    finally:
+        app.exitQgis()
+
+    sys.stderr.write('\n')
+    print(summary)
+    return 0 if finished else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
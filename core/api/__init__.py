@@ -1,7 +1,9 @@
 """API package for VWorld integration."""
 
 from .downloader import Downloader
+from .scheduler import Priority, RequestScheduler, get_scheduler
 from .vworld_client import VworldWFSClient, build_wfs_url
+from .wfs_request import WfsRequest
 from .legend_client import (
     VworldLegendClient, 
     get_legend_url, 
@@ -11,8 +13,12 @@ from .legend_client import (
 
 __all__ = [
     'Downloader',
+    'Priority',
+    'RequestScheduler',
+    'get_scheduler',
     'VworldWFSClient',
     'build_wfs_url',
+    'WfsRequest',
     'VworldLegendClient',
     'get_legend_url',
     'download_legend',
@@ -1,23 +1,40 @@
 """
 Downloader module for Quick Vworld Plugin
 
-This module provides a base downloader class using QgsFileDownloader
-for synchronous HTTP GET/POST requests.
+This module provides a base downloader class using the shared
+QgsNetworkAccessManager for synchronous HTTP GET/POST requests, so
+consecutive requests reuse persistent connections (see network.py).
 """
 
 import logging
-from qgis.core import Qgis, QgsFileDownloader
-from qgis.PyQt.QtCore import QByteArray, QEventLoop, QUrl
+import zlib
+from qgis.core import QgsNetworkAccessManager
+from qgis.PyQt.QtCore import QByteArray, QEventLoop, QFile, QIODevice, QTimer, QUrl
+from qgis.PyQt.QtNetwork import QNetworkReply, QNetworkRequest
+
+from .limits import get_quota_limiter
+from .network import StreamDecoder, create_request, get_network_stats
+from .scheduler import Priority, get_scheduler
+from ...definitions.layers import PREFETCH_QUOTA_RESERVE
 
 LOGGER = logging.getLogger('QuickVworld')
 
+# Attempts per request and delay before the first retry (doubled each time)
+MAX_ATTEMPTS = 3
+RETRY_DELAY_MS = 1000
+
+# Error codes (besides QNetworkReply's) of bodies that cannot be decoded
+CORRUPT_BODY_ERROR = 'corrupt_body'
+UNSUPPORTED_ENCODING_ERROR = 'unsupported_encoding'
+
 
 class Downloader:
     """
-    HTTP Downloader base class using QgsFileDownloader.
+    HTTP Downloader base class using QgsNetworkAccessManager.
     
     This class provides synchronous download functionality using
-    QEventLoop to wait for the download to complete.
+    QEventLoop to wait for the download to complete. The response
+    body is streamed to result_path as it arrives.
     """
 
     def __init__(self, url=None):
@@ -34,8 +51,16 @@ class Downloader:
             
         self.result_path = None
         self.errors = []
+        self.priority = Priority.INTERACTIVE_VISIBLE
+        self.job_id = id(self)
+        self.status_code = None
+        self.compressed_bytes = 0
+        self.uncompressed_bytes = 0
+        self.request_headers = {}
+        self.response_headers = {}
+        self.max_attempts = MAX_ATTEMPTS
         self._loop = None
-        self._downloader = None
+        self._reply = None
 
     def set_url(self, url):
         """
@@ -80,11 +105,28 @@ class Downloader:
         if self._loop and self._loop.isRunning():
             self._loop.quit()
 
+    def set_priority(self, priority, job_id=None):
+        """
+        Set the scheduling priority of the requests made by this downloader.
+        
+        :param priority: Priority class (see Priority)
+        :type priority: int
+        :param job_id: Job the requests belong to (used for fairness)
+        :type job_id: hashable
+        """
+        self.priority = priority
+        if job_id is not None:
+            self.job_id = job_id
+
     def download_sync(self, use_post=False, post_data=None):
         """
         Download data synchronously.
         
         This method blocks until the download is complete or an error occurs.
+        Interrupted transfers and server errors are retried up to
+        max_attempts times. When the server supports byte ranges and sent
+        a validator, the retry continues after the bytes already received
+        (Range / If-Range); otherwise the request starts over.
         
         :param use_post: Use POST method instead of GET
         :type use_post: bool
@@ -103,50 +145,74 @@ class Downloader:
 
         # Clear previous errors
         self.errors = []
+        self.status_code = None
+        self.compressed_bytes = 0
+        self.uncompressed_bytes = 0
+        self.response_headers = {}
 
+        # Wait for a connection slot
+        scheduler = get_scheduler()
+        ticket = scheduler.acquire(self.priority, self.job_id)
+        if ticket is None:
+            self.errors.append("Request preempted by higher priority work")
+            return False
+
+        reserve = PREFETCH_QUOTA_RESERVE if self.priority in Priority.BACKGROUND else 0.0
+        output = QFile(self.result_path)
         try:
-            if use_post and post_data:
-                # POST request
-                post_data_bytes = QByteArray(
-                    post_data.encode() if isinstance(post_data, str) else post_data
-                )
-                self._downloader = QgsFileDownloader(
-                    self._url,
-                    self.result_path,
-                    delayStart=True,
-                    httpMethod=Qgis.HttpMethod.Post,
-                    data=post_data_bytes
-                )
+            if not output.open(QIODevice.WriteOnly | QIODevice.Truncate):
+                self.errors.append(f"Cannot write {self.result_path}: {output.errorString()}")
+                return False
+
+            decoder = None
+            for attempt in range(1, self.max_attempts + 1):
+                # Every attempt is a request counted against the quota
+                if not get_quota_limiter().try_acquire(reserve):
+                    self.errors.append("일일 API 요청 한도를 초과했습니다.")
+                    return False
+
+                offset = decoder.compressed_bytes if decoder and self._can_resume(use_post) else 0
+                if offset == 0:
+                    decoder = None
+                    output.resize(0)
+                    output.seek(0)
+
+                decoder, error = self._request(use_post, post_data, output, decoder, offset)
+                if error is None or not self._is_retryable(error) or attempt == self.max_attempts:
+                    break
+
+                delay = RETRY_DELAY_MS * 2 ** (attempt - 1)
+                LOGGER.warning(f"Download interrupted ({error[1]}), retrying in {delay} ms "
+                               f"({attempt}/{self.max_attempts - 1})")
+                self._wait(delay)
+
+            if decoder is not None:
+                if error is None:
+                    try:
+                        output.write(decoder.flush())
+                    except zlib.error as e:
+                        error = (CORRUPT_BODY_ERROR, f"Corrupt response body: {e}")
+                self.compressed_bytes = decoder.compressed_bytes
+                self.uncompressed_bytes = decoder.uncompressed_bytes
+                get_network_stats().add_transfer(self.compressed_bytes, self.uncompressed_bytes)
+
+            if error is not None and error[0] == QNetworkReply.OperationCanceledError:
+                self.canceled()
+                self.errors.append('Download canceled')
+            elif error is not None:
+                self.error(f"{error[1]} (HTTP {self.status_code})")
             else:
-                # GET request
-                self._downloader = QgsFileDownloader(
-                    self._url,
-                    self.result_path,
-                    delayStart=True
-                )
-
-            # Connect signals
-            self._downloader.downloadExited.connect(self.completed)
-            self._downloader.downloadError.connect(self.error)
-            self._downloader.downloadCanceled.connect(self.canceled)
-
-            # Create event loop for synchronous execution
-            self._loop = QEventLoop()
-            self._downloader.downloadExited.connect(self._loop.quit)
-            
-            # Start download
-            LOGGER.info(f"Starting download from: {self._url.toString()}")
-            self._downloader.startDownload()
-            
-            # Wait for download to complete
-            self._loop.exec_()
+                self.completed()
             
             # Check for errors
             if self.errors:
                 LOGGER.error(f"Download failed with errors: {self.errors}")
                 return False
                 
-            LOGGER.info(f"Download successful: {self.result_path}")
+            LOGGER.info(
+                f"Download successful: {self.result_path} "
+                f"({self.compressed_bytes} bytes received, {self.uncompressed_bytes} bytes decoded)"
+            )
             return True
             
         except Exception as e:
@@ -154,8 +220,158 @@ class Downloader:
             self.errors.append(str(e))
             return False
         finally:
+            output.close()
+            scheduler.release(ticket)
+            # Conditional headers only apply to the request they were set for
+            self.request_headers = {}
             self._loop = None
-            self._downloader = None
+            self._reply = None
+
+    def _request(self, use_post, post_data, output, decoder, offset):
+        """
+        Send one request and stream its body into the output file.
+        
+        :return: (decoder, error) where error is None on success or a
+            (QNetworkReply error code or CORRUPT_BODY_ERROR /
+            UNSUPPORTED_ENCODING_ERROR, message) tuple. The decoder is
+            None when the body could not be decoded (nothing to resume).
+        :rtype: tuple
+        """
+        manager = QgsNetworkAccessManager.instance()
+        request = create_request(self._url)
+        for name, value in self.request_headers.items():
+            request.setRawHeader(name.encode('latin-1'), value.encode('latin-1'))
+
+        if offset:
+            # Only valid if the representation is still the one we have the start of
+            validator = self.response_headers.get('etag') or self.response_headers.get('last-modified')
+            request.setRawHeader(b'Range', f"bytes={offset}-".encode('latin-1'))
+            request.setRawHeader(b'If-Range', validator.encode('latin-1'))
+            LOGGER.info(f"Resuming download at byte {offset}: {self._url.toString()}")
+        else:
+            LOGGER.info(f"Starting download from: {self._url.toString()}")
+
+        if use_post and post_data:
+            # POST request
+            post_data_bytes = QByteArray(
+                post_data.encode() if isinstance(post_data, str) else post_data
+            )
+            request.setHeader(QNetworkRequest.ContentTypeHeader, 'application/x-www-form-urlencoded')
+            self._reply = manager.post(request, post_data_bytes)
+        else:
+            # GET request
+            self._reply = manager.get(request)
+
+        get_network_stats().track(self._reply)
+        reply = self._reply
+        state = {'decoder': decoder, 'started': False, 'error': None}
+
+        def write_chunk():
+            if state['error'] is not None:
+                return
+            # Exceptions must not escape a Qt slot (PyQt aborts the process
+            # when no excepthook handles them, e.g. in headless runs)
+            try:
+                # Decompress each chunk as it arrives (headers are known by then)
+                if not state['started']:
+                    state['started'] = True
+                    status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+                    if not (offset and status == 206):
+                        # New body (or the server ignored the range): start over
+                        output.resize(0)
+                        output.seek(0)
+                        state['decoder'] = StreamDecoder(reply.rawHeader(b'Content-Encoding'))
+                output.write(state['decoder'].decode(reply.readAll()))
+            except zlib.error as e:
+                state['error'] = (CORRUPT_BODY_ERROR, f"Corrupt response body: {e}")
+                reply.abort()
+            except ValueError as e:
+                state['error'] = (UNSUPPORTED_ENCODING_ERROR, str(e))
+                reply.abort()
+
+        try:
+            reply.readyRead.connect(write_chunk)
+
+            # Wait for download to complete
+            if not reply.isFinished():
+                self._loop = QEventLoop()
+                reply.finished.connect(self._loop.quit)
+                self._loop.exec_()
+
+            write_chunk()
+
+            self.status_code = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+            if not offset or self.status_code != 206:
+                self.response_headers = {
+                    bytes(name).decode('latin-1').lower(): bytes(value).decode('latin-1')
+                    for name, value in reply.rawHeaderPairs()
+                }
+
+            if state['error'] is not None:
+                # The bytes received so far cannot be continued
+                return None, state['error']
+            if reply.error() != QNetworkReply.NoError:
+                return state['decoder'], (reply.error(), reply.errorString())
+            return state['decoder'], None
+        finally:
+            reply.deleteLater()
+
+    def _can_resume(self, use_post):
+        """Check whether the last partial response can be continued with a Range request."""
+        return (
+            not use_post
+            and self.response_headers.get('accept-ranges', '').lower() == 'bytes'
+            and bool(self.response_headers.get('etag') or self.response_headers.get('last-modified'))
+        )
+
+    def _is_retryable(self, error):
+        """Check whether a failed request is worth retrying."""
+        code = error[0]
+        if code == CORRUPT_BODY_ERROR:
+            # Usually a truncated or mangled transfer, the next one starts over
+            return True
+        if code == UNSUPPORTED_ENCODING_ERROR:
+            return False
+        # QgsNetworkAccessManager aborts timed out requests, which shows up as
+        # OperationCanceledError
+        if code == QNetworkReply.OperationCanceledError:
+            return True
+        if self.status_code is not None:
+            return self.status_code >= 500
+        # Network layer errors (connection refused/closed, host not found, TLS, ...)
+        return int(code) < 100
+
+    @staticmethod
+    def _wait(milliseconds):
+        """Wait without blocking the thread's event loop."""
+        loop = QEventLoop()
+        QTimer.singleShot(milliseconds, loop.quit)
+        loop.exec_()
+
+    def is_not_modified(self):
+        """
+        Check whether the last request was answered with 304 Not Modified.
+        
+        The result file is empty in that case.
+        
+        :return: True if the server confirmed the cached copy
+        :rtype: bool
+        """
+        return self.status_code == 304
+
+    def get_validators(self):
+        """
+        Get the cache validators of the last response.
+        
+        :return: Dict with 'etag' and/or 'last_modified' (empty if none)
+        :rtype: dict
+        """
+        validators = {}
+        if self.response_headers.get('etag'):
+            validators['etag'] = self.response_headers['etag']
+        if self.response_headers.get('last-modified'):
+            validators['last_modified'] = self.response_headers['last-modified']
+        return validators
 
     def get_errors(self):
         """
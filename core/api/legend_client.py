@@ -11,13 +11,11 @@ from qgis.PyQt.QtCore import QDir, QTemporaryFile, QUrlQuery, QUrl
 from qgis.PyQt.QtGui import QPixmap
 
 from .downloader import Downloader
-from ...definitions.layers import DEFAULT_API_KEY
+from .scheduler import Priority
+from ...definitions.layers import DEFAULT_API_KEY, LEGEND_API_URL, LEGEND_TYPES, get_legend_params
 
 LOGGER = logging.getLogger('QuickVworld')
 
-# Legend API 기본 URL
-LEGEND_API_URL = "https://api.vworld.kr/req/image"
-
 
 class VworldLegendClient(Downloader):
     """
@@ -41,6 +39,7 @@ class VworldLegendClient(Downloader):
         self._style = None
         self._type = 'ALL'  # ALL, POINT, LINE, POLYGON
         self._format = 'png'
+        self.priority = Priority.LEGEND
         
         # Create temporary file for result
         self._create_temp_file()
@@ -82,7 +81,7 @@ class VworldLegendClient(Downloader):
         :param legend_type: Legend type (ALL, POINT, LINE, POLYGON)
         :type legend_type: str
         """
-        if legend_type.upper() in ['ALL', 'POINT', 'LINE', 'POLYGON']:
+        if legend_type.upper() in LEGEND_TYPES:
             self._type = legend_type.upper()
         else:
             LOGGER.warning(f"Invalid legend type: {legend_type}, using ALL")
@@ -95,21 +94,11 @@ class VworldLegendClient(Downloader):
         :return: Complete URL with query parameters
         :rtype: str
         """
-        if not self._layer:
-            raise ValueError("Layer must be set before building URL")
-        
-        # Style defaults to layer name if not set
-        style = self._style or self._layer
-
-        # Build query parameters
+        # Build query parameters (style defaults to layer name if not set)
         query = QUrlQuery()
-        query.addQueryItem('service', 'image')
-        query.addQueryItem('request', 'GetLegendGraphic')
-        query.addQueryItem('format', self._format)
-        query.addQueryItem('layer', self._layer)
-        query.addQueryItem('style', style)
-        query.addQueryItem('type', self._type)
-        query.addQueryItem('key', self.api_key)
+        for name, value in get_legend_params(
+                self._layer, self._style, self._type, self._format, self.api_key):
+            query.addQueryItem(name, value)
 
         # Build full URL
         url = QUrl(LEGEND_API_URL)
@@ -160,6 +149,11 @@ class VworldLegendClient(Downloader):
             LOGGER.error(f"Failed to download legend: {self.get_errors()}")
             return None
 
+        if self.is_not_modified():
+            # Conditional request: the caller's cached copy is still valid
+            LOGGER.info(f"Legend not modified: {layer}")
+            return self.result_path
+
         # Verify file exists and has content
         if not os.path.exists(self.result_path):
             LOGGER.error(f"Downloaded legend file does not exist: {self.result_path}")
@@ -0,0 +1,108 @@
+"""
+Request limits for Quick Vworld Plugin
+
+This module keeps every request to api.vworld.kr within the daily
+quota of the API key. Connection slots are handed out by the
+request scheduler (see scheduler.py).
+"""
+
+import logging
+import threading
+from datetime import date
+
+from ...definitions.layers import DAILY_REQUEST_LIMIT
+from ..utilities import get_setting, set_setting
+
+LOGGER = logging.getLogger('QuickVworld')
+
+
+class QuotaLimiter:
+    """
+    Daily request quota.
+
+    The request count is persisted in the plugin settings and reset
+    when the date changes.
+    """
+
+    def __init__(self, daily_limit=DAILY_REQUEST_LIMIT):
+        """
+        Constructor.
+
+        :param daily_limit: Maximum number of requests per day
+        :type daily_limit: int
+        """
+        self.daily_limit = daily_limit
+        self._lock = threading.Lock()
+
+    def _load(self):
+        today = date.today().isoformat()
+        if get_setting('quota/date') != today:
+            return today, 0
+        return today, int(get_setting('quota/count', 0) or 0)
+
+    def used(self):
+        """
+        Get the number of requests made today.
+
+        :return: Request count
+        :rtype: int
+        """
+        with self._lock:
+            return self._load()[1]
+
+    def remaining(self):
+        """
+        Get the number of requests left today.
+
+        :return: Remaining requests
+        :rtype: int
+        """
+        return max(self.daily_limit - self.used(), 0)
+
+    def has_remaining(self, reserve=0.0):
+        """
+        Check whether requests can still be made today.
+
+        :param reserve: Fraction of the quota kept free (see try_acquire)
+        :type reserve: float
+        :return: True if at least one more request is allowed
+        :rtype: bool
+        """
+        return self.used() < int(self.daily_limit * (1.0 - reserve))
+
+    def try_acquire(self, reserve=0.0):
+        """
+        Count one request against the quota.
+
+        :param reserve: Fraction of the quota to keep free (used by
+            background work so interactive requests never run out)
+        :type reserve: float
+        :return: True if the request may be sent
+        :rtype: bool
+        """
+        with self._lock:
+            today, count = self._load()
+            limit = int(self.daily_limit * (1.0 - reserve))
+            if count >= limit:
+                LOGGER.warning(f"Daily request quota reached ({count}/{self.daily_limit})")
+                return False
+            set_setting('quota/date', today)
+            set_setting('quota/count', count + 1)
+            return True
+
+
+_quota_limiter = None
+
+
+def get_quota_limiter():
+    """
+    Get the shared quota limiter.
+
+    :return: Quota limiter
+    :rtype: QuotaLimiter
+    """
+    global _quota_limiter
+    if _quota_limiter is None:
+        _quota_limiter = QuotaLimiter()
+    return _quota_limiter
+
@@ -0,0 +1,263 @@
+"""
+Network helpers for Quick Vworld Plugin
+
+All requests to api.vworld.kr go through QgsNetworkAccessManager, which
+keeps one access manager per thread. Requests made from the same thread
+therefore share its pool of persistent (keep-alive) connections and TLS
+sessions, and use HTTP/2 multiplexing when the server offers it.
+
+This module builds the requests, warms up the connection, decodes
+compressed responses and keeps counters showing how often connections
+are reused and how much compression saves.
+"""
+
+import logging
+import threading
+import time
+import zlib
+from qgis.PyQt.QtCore import QUrl
+from qgis.PyQt.QtNetwork import QNetworkRequest
+from qgis.core import QgsNetworkAccessManager
+
+LOGGER = logging.getLogger('QuickVworld')
+
+# Host contacted to open a connection before the first real request
+VWORLD_HOST_URL = "https://api.vworld.kr/"
+
+# Qt renamed the HTTP/2 attributes in 5.15
+HTTP2_ALLOWED_ATTRIBUTE = getattr(
+    QNetworkRequest, 'Http2AllowedAttribute',
+    getattr(QNetworkRequest, 'HTTP2AllowedAttribute', None)
+)
+HTTP2_USED_ATTRIBUTE = getattr(
+    QNetworkRequest, 'Http2WasUsedAttribute',
+    getattr(QNetworkRequest, 'HTTP2WasUsedAttribute', None)
+)
+
+
+# Content codings we can decode. Setting the header ourselves turns off
+# Qt's own transparent decompression, so the wire size stays visible.
+ACCEPT_ENCODING = b'gzip, deflate'
+
+
+def create_request(url):
+    """
+    Build a network request to the VWorld API.
+
+    The request asks for a compressed response; use StreamDecoder on
+    the reply body.
+
+    :param url: Request URL
+    :type url: str or QUrl
+    :return: Network request
+    :rtype: QNetworkRequest
+    """
+    request = QNetworkRequest(QUrl(url) if isinstance(url, str) else url)
+    request.setAttribute(QNetworkRequest.FollowRedirectsAttribute, True)
+    request.setRawHeader(b'Accept-Encoding', ACCEPT_ENCODING)
+    if HTTP2_ALLOWED_ATTRIBUTE is not None:
+        request.setAttribute(HTTP2_ALLOWED_ATTRIBUTE, True)
+    return request
+
+
+class StreamDecoder:
+    """
+    Incremental decoder of a response body by its Content-Encoding.
+
+    Chunks are decompressed as they arrive, so large responses are
+    never held in memory compressed and uncompressed at once.
+    """
+
+    def __init__(self, content_encoding=None):
+        """
+        Constructor.
+
+        :param content_encoding: Content-Encoding header value
+        :type content_encoding: str or bytes
+        """
+        if isinstance(content_encoding, bytes):
+            content_encoding = content_encoding.decode('latin-1')
+        self.encoding = (content_encoding or 'identity').strip().lower()
+        self.compressed_bytes = 0
+        self.uncompressed_bytes = 0
+
+        if self.encoding in ('gzip', 'x-gzip'):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == 'deflate':
+            self._decompressor = zlib.decompressobj(zlib.MAX_WBITS)
+        elif self.encoding == 'identity':
+            self._decompressor = None
+        else:
+            raise ValueError(f"Unsupported Content-Encoding: {self.encoding}")
+
+    def decode(self, chunk):
+        """
+        Decode the next chunk of the body.
+
+        :param chunk: Bytes received
+        :type chunk: bytes
+        :return: Decoded bytes
+        :rtype: bytes
+        """
+        chunk = bytes(chunk)
+        if not chunk:
+            return b''
+
+        if self._decompressor is None:
+            data = chunk
+        else:
+            try:
+                data = self._decompressor.decompress(chunk)
+            except zlib.error:
+                if self.encoding != 'deflate' or self.compressed_bytes:
+                    raise
+                # Some servers send raw deflate without the zlib header
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                data = self._decompressor.decompress(chunk)
+
+        self.compressed_bytes += len(chunk)
+        self.uncompressed_bytes += len(data)
+        return data
+
+    def flush(self):
+        """
+        Get the data left in the decompressor at the end of the body.
+
+        :return: Decoded bytes
+        :rtype: bytes
+        """
+        if self._decompressor is None:
+            return b''
+        data = self._decompressor.flush()
+        self.uncompressed_bytes += len(data)
+        return data
+
+
+class NetworkStats:
+    """
+    Connection reuse and latency counters.
+
+    A reply emits ``encrypted`` only when a new TLS handshake was made,
+    so requests without it were sent over a reused connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.requests = 0
+            self.handshakes = 0
+            self.http2 = 0
+            self.total_latency = 0.0
+            self.total_first_byte = 0.0
+            self.compressed_bytes = 0
+            self.uncompressed_bytes = 0
+
+    def track(self, reply):
+        """
+        Start tracking a reply.
+
+        :param reply: Network reply
+        :type reply: QNetworkReply
+        """
+        started = time.monotonic()
+        timing = {'first_byte': None}
+
+        def on_ready_read():
+            if timing['first_byte'] is None:
+                timing['first_byte'] = time.monotonic() - started
+
+        def on_encrypted():
+            with self._lock:
+                self.handshakes += 1
+
+        def on_finished():
+            latency = time.monotonic() - started
+            http2 = HTTP2_USED_ATTRIBUTE is not None and bool(reply.attribute(HTTP2_USED_ATTRIBUTE))
+            with self._lock:
+                self.requests += 1
+                self.total_latency += latency
+                self.total_first_byte += timing['first_byte'] if timing['first_byte'] is not None else latency
+                if http2:
+                    self.http2 += 1
+            LOGGER.debug(f"Request finished in {latency * 1000:.0f} ms "
+                         f"({'HTTP/2' if http2 else 'HTTP/1.1'}): {reply.url().toString()}")
+
+        reply.readyRead.connect(on_ready_read)
+        reply.encrypted.connect(on_encrypted)
+        reply.finished.connect(on_finished)
+
+    def add_transfer(self, compressed_bytes, uncompressed_bytes):
+        """
+        Count the body size of a finished request.
+
+        :param compressed_bytes: Bytes received over the network
+        :type compressed_bytes: int
+        :param uncompressed_bytes: Bytes after decompression
+        :type uncompressed_bytes: int
+        """
+        with self._lock:
+            self.compressed_bytes += compressed_bytes
+            self.uncompressed_bytes += uncompressed_bytes
+
+    def reuse_rate(self):
+        """
+        Get the share of requests sent over an existing connection.
+
+        :return: Reuse rate between 0 and 1
+        :rtype: float
+        """
+        with self._lock:
+            if not self.requests:
+                return 0.0
+            return max(self.requests - self.handshakes, 0) / self.requests
+
+    def summary(self):
+        """
+        Get a one-line summary of the counters.
+
+        :return: Summary text
+        :rtype: str
+        """
+        reuse = self.reuse_rate()
+        with self._lock:
+            if not self.requests:
+                return "No requests"
+            return (
+                f"{self.requests} requests, {self.handshakes} new TLS connections "
+                f"(reuse {reuse:.0%}), {self.http2} over HTTP/2, "
+                f"avg latency {self.total_latency / self.requests * 1000:.0f} ms, "
+                f"avg first byte {self.total_first_byte / self.requests * 1000:.0f} ms, "
+                f"{self.compressed_bytes / 1024:.0f} KiB received for "
+                f"{self.uncompressed_bytes / 1024:.0f} KiB of data"
+            )
+
+
+_network_stats = NetworkStats()
+
+
+def get_network_stats():
+    """
+    Get the shared network counters.
+
+    :return: Network counters
+    :rtype: NetworkStats
+    """
+    return _network_stats
+
+
+def warm_up_connection():
+    """
+    Open a connection to api.vworld.kr in the background.
+
+    Sends a HEAD request to the host (not an API call, so it does not
+    count against the quota) to get the TCP and TLS handshakes done
+    before the user starts a download. Must be called from the thread
+    that makes the following requests (normally the main thread).
+    """
+    reply = QgsNetworkAccessManager.instance().head(create_request(VWORLD_HOST_URL))
+    reply.finished.connect(reply.deleteLater)
+    LOGGER.debug("Warming up connection to api.vworld.kr")
@@ -0,0 +1,244 @@
+"""
+Request scheduler for Quick Vworld Plugin
+
+This module hands out the limited connection slots to api.vworld.kr by
+priority class. Interactive requests always go first, speculative and
+bulk work only uses the slots left over.
+"""
+
+import logging
+import threading
+from collections import OrderedDict, deque
+from qgis.PyQt.QtCore import QCoreApplication, QThread
+
+from ...definitions.layers import MAX_CONCURRENT_REQUESTS
+
+LOGGER = logging.getLogger('QuickVworld')
+
+# Wait granularity (seconds) when the GUI thread waits for a slot
+GUI_WAIT_INTERVAL = 0.02
+
+
+class Priority:
+    """Request priority classes (lower value runs first)."""
+    INTERACTIVE_VISIBLE = 0
+    INTERACTIVE_OFFSCREEN = 1
+    LEGEND = 2
+    PREFETCH = 3
+    BULK = 4
+
+    ALL = (INTERACTIVE_VISIBLE, INTERACTIVE_OFFSCREEN, LEGEND, PREFETCH, BULK)
+    BACKGROUND = (PREFETCH, BULK)
+
+
+class Ticket:
+    """A granted or pending connection slot."""
+
+    __slots__ = ('priority', 'job_id', 'granted', 'preempted', '_event')
+
+    def __init__(self, priority, job_id):
+        self.priority = priority
+        self.job_id = job_id
+        self.granted = False
+        self.preempted = False
+        self._event = threading.Event()
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+    def wake(self):
+        self._event.set()
+
+
+class RequestScheduler:
+    """
+    Central priority scheduler for network requests.
+
+    - Waiting requests are served by priority class.
+    - Within a class, jobs are served round-robin so one large job
+      cannot starve a smaller one.
+    - Background classes (prefetch, bulk) never take the slots reserved
+      for interactive work.
+    - Queued prefetch requests are dropped when interactive requests
+      have to wait.
+    """
+
+    def __init__(self, max_slots=MAX_CONCURRENT_REQUESTS, reserved_slots=1):
+        """
+        Constructor.
+
+        :param max_slots: Maximum simultaneous requests
+        :type max_slots: int
+        :param reserved_slots: Slots only available to non-background work
+        :type reserved_slots: int
+        """
+        self.max_slots = max_slots
+        self.background_slots = max(max_slots - reserved_slots, 1)
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self._running_background = 0
+        self._queues = {priority: OrderedDict() for priority in Priority.ALL}
+
+        self.stats = {'granted': 0, 'waited': 0, 'preempted': 0}
+
+    def _can_run(self, priority):
+        if self._running >= self.max_slots:
+            return False
+        if priority in Priority.BACKGROUND:
+            return self._running_background < self.background_slots
+        return True
+
+    def _grant(self, ticket):
+        ticket.granted = True
+        self._running += 1
+        if ticket.priority in Priority.BACKGROUND:
+            self._running_background += 1
+        self.stats['granted'] += 1
+        ticket.wake()
+
+    def _enqueue(self, ticket):
+        jobs = self._queues[ticket.priority]
+        jobs.setdefault(ticket.job_id, deque()).append(ticket)
+
+    def _dequeue(self, ticket):
+        jobs = self._queues[ticket.priority]
+        tickets = jobs.get(ticket.job_id)
+        if tickets and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del jobs[ticket.job_id]
+
+    def _has_waiting(self, priority):
+        return bool(self._queues[priority])
+
+    def _dispatch(self):
+        # Grant free slots to waiting tickets, best priority first
+        for priority in Priority.ALL:
+            jobs = self._queues[priority]
+            while jobs and self._can_run(priority):
+                # Round-robin between jobs of the same class
+                job_id, tickets = next(iter(jobs.items()))
+                ticket = tickets.popleft()
+                del jobs[job_id]
+                if tickets:
+                    jobs[job_id] = tickets
+                self._grant(ticket)
+
+    def _preempt_background(self):
+        # Speculative work is worthless once the user is waiting
+        jobs = self._queues[Priority.PREFETCH]
+        for tickets in jobs.values():
+            for ticket in tickets:
+                ticket.preempted = True
+                ticket.wake()
+                self.stats['preempted'] += 1
+        jobs.clear()
+
+    def acquire(self, priority=Priority.INTERACTIVE_VISIBLE, job_id=None, blocking=True):
+        """
+        Acquire a connection slot.
+
+        :param priority: Priority class
+        :type priority: int
+        :param job_id: Identifier of the job the request belongs to
+        :type job_id: hashable
+        :param blocking: Wait until a slot is free
+        :type blocking: bool
+        :return: Granted ticket, or None if not granted (non-blocking
+            and busy, or preempted while queued)
+        :rtype: Ticket or None
+        """
+        ticket = Ticket(priority, job_id)
+
+        with self._lock:
+            if self._can_run(priority) and not any(
+                    self._has_waiting(p) for p in Priority.ALL if p <= priority):
+                self._grant(ticket)
+                return ticket
+
+            if not blocking:
+                return None
+
+            self._enqueue(ticket)
+            self.stats['waited'] += 1
+            if priority < Priority.LEGEND:
+                self._preempt_background()
+
+        self._wait(ticket)
+
+        if ticket.preempted:
+            LOGGER.debug(f"Request preempted (priority {priority}, job {job_id})")
+            return None
+        return ticket
+
+    def _wait(self, ticket):
+        app = QCoreApplication.instance()
+        in_gui_thread = app is not None and QThread.currentThread() == app.thread()
+
+        if not in_gui_thread:
+            ticket.wait()
+            return
+
+        # Keep the GUI responsive while waiting for a slot
+        while not ticket.wait(GUI_WAIT_INTERVAL):
+            QCoreApplication.processEvents()
+
+    def release(self, ticket):
+        """
+        Release a granted slot.
+
+        :param ticket: Ticket returned by acquire
+        :type ticket: Ticket
+        """
+        with self._lock:
+            if not ticket.granted:
+                self._dequeue(ticket)
+                return
+            ticket.granted = False
+            self._running -= 1
+            if ticket.priority in Priority.BACKGROUND:
+                self._running_background -= 1
+            self._dispatch()
+
+    def cancel_job(self, job_id):
+        """
+        Drop all queued requests of a job.
+
+        :param job_id: Job identifier
+        :type job_id: hashable
+        """
+        with self._lock:
+            for jobs in self._queues.values():
+                tickets = jobs.pop(job_id, None)
+                for ticket in tickets or []:
+                    ticket.preempted = True
+                    ticket.wake()
+
+    def running(self):
+        """
+        Get the number of requests in flight.
+
+        :return: Running request count
+        :rtype: int
+        """
+        with self._lock:
+            return self._running
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """
+    Get the shared request scheduler.
+
+    :return: Request scheduler
+    :rtype: RequestScheduler
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
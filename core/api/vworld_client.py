@@ -5,22 +5,21 @@ This module provides a client for accessing VWorld WFS API
 to download spatial data.
 """
 
+import json
 import logging
 import os
-from qgis.PyQt.QtCore import QDir, QFileInfo, QTemporaryFile, QUrlQuery
-from qgis.core import QgsRectangle
+from qgis.PyQt.QtCore import QDir, QFileInfo, QTemporaryFile
 
 from .downloader import Downloader
-from ...definitions.layers import (
-    VWORLD_WFS_URL,
-    DEFAULT_API_KEY,
-    WFS_VERSION,
-    WFS_SERVICE,
-    WFS_REQUEST,
-    CRS_WGS84,
-    OUTPUT_FORMAT_JSON,
-    DEFAULT_MAX_FEATURES
+from .wfs_request import WfsRequest, format_bbox
+from ..cache import get_default_cache
+from ..checkpoint import Checkpoint
+from ..features import (
+    StringPool, bounds_contain, bounds_intersect, load_feature_collection, read_feature_records,
+    record_filter
 )
+from ..tiling import TileGrid, extent_to_tuple
+from ...definitions.layers import DEFAULT_API_KEY, CRS_WGS84, DEFAULT_MAX_FEATURES
 
 LOGGER = logging.getLogger('QuickVworld')
 
@@ -30,7 +29,9 @@ class VworldWFSClient(Downloader):
     VWorld WFS API Client.
     
     This client handles WFS GetFeature requests to VWorld API
-    and downloads the result to a temporary GeoJSON file.
+    and downloads the result to a temporary GeoJSON file. Requests are
+    described by WfsRequest values; a client downloads one at a time,
+    so concurrent downloads use one client each.
     """
 
     def __init__(self, api_key=None):
@@ -48,6 +49,8 @@ class VworldWFSClient(Downloader):
         self._srsname = CRS_WGS84
         self._max_features = DEFAULT_MAX_FEATURES
         self._last_request_url = None  # Store last request URL
+        self.cache_hits = 0
+        self.revalidated = 0
         
         # Create temporary file for result
         self._create_temp_file()
@@ -64,6 +67,15 @@ class VworldWFSClient(Downloader):
         
         LOGGER.info(f"Created temporary file: {self.result_path}")
 
+    def cleanup(self):
+        """Remove the temporary result file (the client can't be used afterwards)."""
+        if self.result_path and os.path.exists(self.result_path):
+            try:
+                os.remove(self.result_path)
+            except OSError as e:
+                LOGGER.warning(f"Failed to remove temporary file {self.result_path}: {e}")
+        self.result_path = None
+
     def set_typename(self, typename):
         """
         Set the WFS typename (layer name).
@@ -83,12 +95,7 @@ class VworldWFSClient(Downloader):
         :param bbox: Bounding box (QgsRectangle or string)
         :type bbox: QgsRectangle or str
         """
-        if isinstance(bbox, QgsRectangle):
-            # Convert QgsRectangle to string
-            # VWorld API expects: ymin,xmin,ymax,xmax for EPSG:4326
-            self._bbox = f"{bbox.yMinimum()},{bbox.xMinimum()},{bbox.yMaximum()},{bbox.xMaximum()}"
-        else:
-            self._bbox = str(bbox)
+        self._bbox = format_bbox(bbox) if bbox else None
 
     def set_srsname(self, srsname):
         """
@@ -117,6 +124,17 @@ class VworldWFSClient(Downloader):
         """
         return self._last_request_url
 
+    def request(self):
+        """
+        Get the request described by the parameters set on the client.
+
+        :return: Request
+        :rtype: WfsRequest
+        """
+        return WfsRequest.create(
+            self._typename, self._bbox, self.api_key, self._srsname, self._max_features
+        )
+
     def build_url(self):
         """
         Build the WFS GetFeature URL with parameters.
@@ -124,32 +142,7 @@ class VworldWFSClient(Downloader):
         :return: Complete URL with query parameters
         :rtype: str
         """
-        if not self._typename:
-            raise ValueError("Typename must be set before building URL")
-
-        # Build query parameters
-        query = QUrlQuery()
-        query.addQueryItem('SERVICE', WFS_SERVICE)
-        query.addQueryItem('VERSION', WFS_VERSION)
-        query.addQueryItem('REQUEST', WFS_REQUEST)
-        query.addQueryItem('TYPENAME', self._typename)
-        query.addQueryItem('SRSNAME', self._srsname)
-        query.addQueryItem('OUTPUT', OUTPUT_FORMAT_JSON)
-        query.addQueryItem('KEY', self.api_key)
-        
-        # Add optional parameters
-        if self._bbox:
-            query.addQueryItem('BBOX', self._bbox)
-        
-        if self._max_features:
-            query.addQueryItem('MAXFEATURES', str(self._max_features))
-
-        # Build full URL
-        from qgis.PyQt.QtCore import QUrl
-        url = QUrl(VWORLD_WFS_URL)
-        url.setQuery(query)
-        
-        return url.toString()
+        return self.request().url()
 
     def fetch_data(self, typename, bbox=None, srsname=CRS_WGS84, max_features=None):
         """
@@ -177,21 +170,35 @@ class VworldWFSClient(Downloader):
         if max_features:
             self.set_max_features(max_features)
 
-        # Build URL
         try:
-            url = self.build_url()
-            self._last_request_url = url  # Store the request URL
-            self.set_url(url)
-            
-            LOGGER.info(f"Fetching data from VWorld WFS API")
-            LOGGER.info(f"Typename: {typename}")
-            LOGGER.info(f"BBOX: {self._bbox}")
-            LOGGER.info(f"URL: {url}")
-            
-        except Exception as e:
+            request = self.request()
+        except ValueError as e:
             LOGGER.error(f"Error building URL: {e}")
             return None
 
+        return self.fetch_request(request)
+
+    def fetch_request(self, request):
+        """
+        Download a WFS request to the client's result file.
+
+        Only the download state of the client is used, so any request
+        (e.g. planned in another thread) can be fetched.
+
+        :param request: Request to download
+        :type request: WfsRequest
+        :return: Path to downloaded file if successful, None otherwise
+        :rtype: str or None
+        """
+        url = request.url()
+        self._last_request_url = url  # Store the request URL
+        self.set_url(url)
+
+        LOGGER.info(f"Fetching data from VWorld WFS API")
+        LOGGER.info(f"Typename: {request.typename}")
+        LOGGER.info(f"BBOX: {request.bbox}")
+        LOGGER.info(f"URL: {url}")
+
         # Download data
         success = self.download_sync()
         
@@ -199,6 +206,11 @@ class VworldWFSClient(Downloader):
             LOGGER.error(f"Failed to download data: {self.get_errors()}")
             return None
 
+        if self.is_not_modified():
+            # Conditional request: the caller's cached copy is still valid
+            LOGGER.info(f"Not modified: {url}")
+            return self.result_path
+
         # Verify file exists and has content
         file_info = QFileInfo(self.result_path)
         if not file_info.exists():
@@ -212,10 +224,318 @@ class VworldWFSClient(Downloader):
         LOGGER.info(f"Successfully downloaded data to: {self.result_path} ({file_info.size()} bytes)")
         return self.result_path
 
+    def tile_url(self, typename, tile, grid):
+        """
+        Build the request URL of a grid tile.
+
+        :param typename: Layer typename
+        :type typename: str
+        :param tile: Tile (col, row)
+        :type tile: tuple
+        :param grid: Tile grid
+        :type grid: TileGrid
+        :return: Request URL
+        :rtype: str
+        """
+        return WfsRequest.for_tile(typename, tile, grid, self.api_key).url()
+
+    def fetch_tile(self, typename, tile, grid, cache=None):
+        """
+        Fetch a single grid tile, serving it from the cache when possible.
+
+        A tile holding more than MAXFEATURES features is read page by
+        page and the pages are merged, so the tile file is complete. The
+        merged file replaces the first page in the cache (with its
+        feature count in the metadata), so it is found by tile_url().
+
+        :param typename: Layer typename
+        :type typename: str
+        :param tile: Tile (col, row)
+        :type tile: tuple
+        :param grid: Tile grid
+        :type grid: TileGrid
+        :param cache: Response cache (shared cache if not provided)
+        :type cache: ResponseCache
+        :return: Path to the cached tile file, or None if failed
+        :rtype: str or None
+        """
+        cache = cache or get_default_cache()
+        request = WfsRequest.for_tile(typename, tile, grid, self.api_key)
+        path = self.fetch_cached(request, cache)
+        if not path or not request.max_features:
+            return path
+
+        url = request.url()
+        if 'feature_count' in (cache.get_meta(url) or {}):
+            # Counted (and merged if needed) when it was downloaded
+            return path
+
+        try:
+            collection = load_feature_collection(path)
+        except (OSError, ValueError) as e:
+            # Passed on as it is, readers report invalid responses
+            LOGGER.warning(f"Cannot count the features of {typename} tile {tile}: {e}")
+            return path
+
+        features = collection['features'] or []
+        if len(features) < request.max_features:
+            cache.update_meta(url, {'feature_count': len(features)})
+            return path
+
+        return self._fetch_pages(request, collection, tile, cache)
+
+    def _fetch_pages(self, request, collection, tile, cache):
+        """
+        Fetch the pages following a full first page and cache the merged tile.
+
+        :param request: Request of the first page
+        :type request: WfsRequest
+        :param collection: GeoJSON FeatureCollection of the first page
+        :type collection: dict
+        :param tile: Tile (col, row), for messages
+        :type tile: tuple
+        :param cache: Response cache
+        :type cache: ResponseCache
+        :return: Path to the cached tile file, or None if a page failed
+        :rtype: str or None
+        """
+        features = collection['features']
+        ids = {feature.get('id') for feature in features} - {None}
+        page = request
+        count = len(features)
+        pages = 1
+
+        while count >= request.max_features:
+            page = page.next_page(count)
+            path = self.fetch_cached(page, cache)
+            if not path:
+                return None
+            try:
+                page_features = load_feature_collection(path)['features'] or []
+            except (OSError, ValueError) as e:
+                self.error(f"Invalid response for {request.typename} tile {tile}: {e}")
+                return None
+
+            count = len(page_features)
+            new_features = [feature for feature in page_features
+                            if feature.get('id') is None or feature.get('id') not in ids]
+            if count and not new_features:
+                # The server ignored STARTINDEX and returned the first page again
+                LOGGER.warning(f"{request.typename} tile {tile} holds more than "
+                               f"{request.max_features} features and cannot be paged, "
+                               f"only {len(features)} were downloaded")
+                break
+            ids.update(feature.get('id') for feature in new_features if feature.get('id') is not None)
+            features.extend(new_features)
+            pages += 1
+
+        LOGGER.info(f"{request.typename} tile {tile}: {len(features)} features in {pages} pages")
+        with open(self.result_path, 'w', encoding='utf-8') as f:
+            json.dump(collection, f, ensure_ascii=False)
+        # No validators: a 304 for the first page says nothing about the others
+        return cache.put(request.url(), self.result_path,
+                         extra={'feature_count': len(features), 'pages': pages})
+
+    def fetch_cached(self, request, cache=None):
+        """
+        Fetch a request, serving it from the cache when possible.
+
+        :param request: Request to fetch
+        :type request: WfsRequest
+        :param cache: Response cache (shared cache if not provided)
+        :type cache: ResponseCache
+        :return: Path to the cached response file, or None if failed
+        :rtype: str or None
+        """
+        cache = cache or get_default_cache()
+        url = request.url()
+
+        cached_path = cache.get(url)
+        if cached_path:
+            self._last_request_url = url
+            self.cache_hits += 1
+            LOGGER.debug(f"Cache hit: {url}")
+            return cached_path
+
+        # An expired entry is revalidated instead of downloaded again
+        self.request_headers = cache.conditional_headers(url)
+        if not self.fetch_request(request):
+            return None
+
+        if self.is_not_modified():
+            self.revalidated += 1
+            return cache.touch(url, self.get_validators())
+
+        return cache.put(url, self.result_path, extra=self.get_validators())
+
+    def fetch_tiles(self, typename, extent, grid=None, cache=None,
+                    progress_callback=None, tile_callback=None, checkpoint=None):
+        """
+        Fetch all grid tiles covering an extent.
+
+        :param typename: Layer typename
+        :type typename: str
+        :param extent: Extent in EPSG:4326
+        :type extent: QgsRectangle
+        :param grid: Tile grid (default grid if not provided)
+        :type grid: TileGrid
+        :param cache: Response cache (shared cache if not provided)
+        :type cache: ResponseCache
+        :param progress_callback: Called with (done, total) after each tile
+        :type progress_callback: callable
+        :param tile_callback: Called with (tile file, tile) as soon as it arrives
+        :type tile_callback: callable
+        :param checkpoint: Records completed tiles so an interrupted
+            download resumes after the tiles it already has
+        :type checkpoint: Checkpoint
+        :return: Paths to the tile files, or None if any tile failed
+        :rtype: list or None
+        """
+        grid = grid or TileGrid()
+        cache = cache or get_default_cache()
+        tiles = grid.tiles_for_extent(extent)
+        paths = []
+        hits_before = self.cache_hits
+        revalidated_before = self.revalidated
+
+        LOGGER.info(f"Fetching {len(tiles)} tiles for {typename}")
+
+        for index, tile in enumerate(tiles):
+            unit = Checkpoint.unit_key(typename, *tile)
+            path = None
+            if checkpoint and checkpoint.is_done(unit):
+                # Completed before the interruption: keep it even if it expired since
+                path = cache.get(self.tile_url(typename, tile, grid), allow_stale=True)
+
+            if not path:
+                path = self.fetch_tile(typename, tile, grid, cache)
+            if not path:
+                # Only this tile failed; the completed ones stay in the checkpoint
+                return None
+            paths.append(path)
+
+            if checkpoint:
+                checkpoint.mark_done(unit)
+
+            if tile_callback:
+                tile_callback(path, tile)
+
+            if progress_callback:
+                progress_callback(index + 1, len(tiles))
+
+        LOGGER.info(f"Fetched {len(tiles)} tiles ({self.cache_hits - hits_before} from cache, "
+                    f"{self.revalidated - revalidated_before} revalidated)")
+        return paths
+
+    def iter_features(self, typename, extent, filter=None, properties=None, grid=None, cache=None):
+        """
+        Iterate over the features of a layer in an extent.
+
+        Tiles are requested only when the iteration reaches them, and a
+        tile holding more than MAXFEATURES features is read page by page,
+        so one page of records is in memory at a time and stopping early
+        (e.g. breaking out of the loop) saves the remaining requests.
+        Features crossing tile borders are yielded once; their ids are
+        only remembered until the iteration has passed the last tile row
+        they reach. Records of a tile share one string pool (see
+        features.py), so memory does not grow with the features streamed.
+
+        Example, counting parcels by zoning code::
+
+            counts = collections.Counter(
+                record['ucode'] for record in client.iter_features('lt_c_uq111', extent)
+            )
+
+        :param typename: Layer typename
+        :type typename: str
+        :param extent: Extent in EPSG:4326
+        :type extent: QgsRectangle or tuple
+        :param filter: Callable taking a FeatureRecord, or QGIS expression
+            (see features.record_filter)
+        :type filter: callable or str
+        :param properties: Property names to keep (all if not provided)
+        :type properties: list
+        :param grid: Tile grid (default grid if not provided)
+        :type grid: TileGrid
+        :param cache: Response cache (shared cache if not provided)
+        :type cache: ResponseCache
+        :return: Features intersecting the extent
+        :rtype: generator of FeatureRecord
+        :raises ValueError: If the filter expression is invalid
+        :raises OSError: If a tile cannot be downloaded
+        """
+        grid = grid or TileGrid()
+        cache = cache or get_default_cache()
+        bounds = extent_to_tuple(extent)
+        matches = record_filter(filter)
+        top_row = grid.tile_at(bounds[2], bounds[3])[1]
+        # Id -> last tile row of the features crossing tile borders
+        border_ids = {}
+        current_row = None
+
+        for tile in grid.tiles_for_extent(extent):
+            if tile[1] != current_row:
+                # Tiles go row by row: features ending below this row cannot come back
+                current_row = tile[1]
+                border_ids = {feature_id: last_row for feature_id, last_row in border_ids.items()
+                              if last_row >= current_row}
+
+            tile_bounds = grid.tile_bounds(tile)
+            # Only features of tiles sticking out of the extent need a bounds check
+            check_bounds = not bounds_contain(bounds, tile_bounds)
+            request = WfsRequest.for_tile(typename, tile, grid, self.api_key)
+            pool = StringPool()
+            tile_ids = set()
+
+            while request is not None:
+                path = self.fetch_cached(request, cache)
+                if not path:
+                    raise OSError(f"Failed to download {typename} tile {tile}: "
+                                  + '; '.join(self.get_errors()))
+                try:
+                    records = read_feature_records(path, properties, pool)
+                except (OSError, ValueError) as e:
+                    raise OSError(f"Invalid response for {typename} tile {tile}: {e}")
+
+                new_ids = 0
+                for record in records:
+                    if record.id is not None:
+                        if record.id in tile_ids:
+                            continue
+                        tile_ids.add(record.id)
+                        new_ids += 1
+                        # Features crossing tile borders are returned by every tile
+                        if record.id in border_ids:
+                            continue
+                        if record.bounds is None:
+                            border_ids[record.id] = top_row
+                        elif not _strictly_inside(tile_bounds, record.bounds):
+                            border_ids[record.id] = grid.tile_at(record.bounds[2], record.bounds[3])[1]
+
+                    if check_bounds and (record.bounds is None or not bounds_intersect(bounds, record.bounds)):
+                        continue
+                    if matches is None or matches(record):
+                        yield record
+
+                # A full page may be followed by more, unless it repeated known features.
+                # A longer first page is a tile fetch_tile() already merged.
+                if request.max_features and len(records) == request.max_features and new_ids:
+                    request = request.next_page(len(records))
+                else:
+                    request = None
+
+
+def _strictly_inside(outer, inner):
+    # Features touching a tile edge may also be returned by the neighbour tile
+    return (outer[0] < inner[0] and outer[1] < inner[1]
+            and inner[2] < outer[2] and inner[3] < outer[3])
+
 
 def build_wfs_url(typename, bbox=None, api_key=None, srsname=CRS_WGS84, max_features=None):
     """
     Helper function to build a VWorld WFS GetFeature URL.
+
+    Builds the URL only (see WfsRequest), no client is created.
     
     :param typename: Layer typename
     :type typename: str
@@ -230,16 +550,4 @@ def build_wfs_url(typename, bbox=None, api_key=None, srsname=CRS_WGS84, max_feat
     :return: Complete WFS URL
     :rtype: str
     """
-    client = VworldWFSClient(api_key)
-    client.set_typename(typename)
-    
-    if bbox:
-        client.set_bbox(bbox)
-    
-    client.set_srsname(srsname)
-    
-    if max_features:
-        client.set_max_features(max_features)
-    
-    return client.build_url()
-
+    return WfsRequest.create(typename, bbox, api_key, srsname, max_features or DEFAULT_MAX_FEATURES).url()
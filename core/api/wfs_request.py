@@ -0,0 +1,166 @@
+"""
+WFS request values for Quick Vworld Plugin
+
+A WfsRequest describes one VWorld WFS GetFeature request and nothing
+else: it holds no network or file state, cannot be changed once made
+and is hashable, so the same request can be planned in one thread,
+fetched in another and used as a cache or job key. Building its URL
+needs no Qt objects, which keeps planning large tiled jobs cheap.
+"""
+
+from collections import namedtuple
+from urllib.parse import quote
+
+from ...definitions.layers import (
+    VWORLD_WFS_URL,
+    DEFAULT_API_KEY,
+    WFS_VERSION,
+    WFS_SERVICE,
+    WFS_REQUEST,
+    CRS_WGS84,
+    OUTPUT_FORMAT_JSON,
+    DEFAULT_MAX_FEATURES,
+    MAX_FEATURES
+)
+
+# Characters left as they are in query values. Matches the URLs QUrl
+# used to build, so cache entries made by earlier versions still match.
+QUERY_SAFE = "-._~!$'()*,:@/?"
+
+# Parameters shared by every GetFeature request
+_URL_PREFIX = (
+    f"{VWORLD_WFS_URL}?SERVICE={WFS_SERVICE}&VERSION={WFS_VERSION}"
+    f"&REQUEST={WFS_REQUEST}&TYPENAME="
+)
+
+
+def encode_query_value(value):
+    """
+    Percent-encode a URL query value.
+
+    :param value: Query value
+    :type value: str
+    :return: Encoded value
+    :rtype: str
+    """
+    return quote(value, safe=QUERY_SAFE)
+
+
+def format_bbox(bbox):
+    """
+    Get the VWorld BBOX parameter value of a bounding box.
+
+    VWorld expects ymin,xmin,ymax,xmax for EPSG:4326. Strings are taken
+    as already formatted.
+
+    :param bbox: Bounding box (QgsRectangle, (xmin, ymin, xmax, ymax) or string)
+    :type bbox: QgsRectangle or tuple or str
+    :return: BBOX parameter value
+    :rtype: str
+    """
+    if isinstance(bbox, str):
+        return bbox
+    if hasattr(bbox, 'xMinimum'):
+        return f"{bbox.yMinimum()},{bbox.xMinimum()},{bbox.yMaximum()},{bbox.xMaximum()}"
+    xmin, ymin, xmax, ymax = bbox
+    return f"{ymin},{xmin},{ymax},{xmax}"
+
+
+class WfsRequest(namedtuple('WfsRequest', 'typename bbox srsname max_features api_key start_index')):
+    """
+    Immutable VWorld WFS GetFeature request.
+
+    Use create() or for_tile() rather than the constructor, they
+    normalize the values so equal requests compare (and hash) equal.
+    Responses larger than max_features are read in pages, see
+    next_page().
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, typename, bbox=None, api_key=None, srsname=CRS_WGS84,
+               max_features=DEFAULT_MAX_FEATURES, start_index=None):
+        """
+        Make a request.
+
+        :param typename: Layer typename (e.g., 'lt_c_upisuq153')
+        :type typename: str
+        :param bbox: Bounding box (see format_bbox)
+        :type bbox: QgsRectangle or tuple or str
+        :param api_key: VWorld API key (uses default if not provided)
+        :type api_key: str
+        :param srsname: Spatial reference system (default: EPSG:4326)
+        :type srsname: str
+        :param max_features: Maximum features to retrieve (max 1000)
+        :type max_features: int
+        :param start_index: Index of the first feature to retrieve
+        :type start_index: int
+        :return: Request
+        :rtype: WfsRequest
+        """
+        if not typename:
+            raise ValueError("Typename must be set before building URL")
+        return cls(
+            typename,
+            format_bbox(bbox) if bbox else None,
+            srsname or CRS_WGS84,
+            min(int(max_features), MAX_FEATURES) if max_features else None,
+            api_key or DEFAULT_API_KEY,
+            int(start_index) if start_index else None
+        )
+
+    @classmethod
+    def for_tile(cls, typename, tile, grid, api_key=None):
+        """
+        Make the request of a grid tile.
+
+        :param typename: Layer typename
+        :type typename: str
+        :param tile: Tile (col, row)
+        :type tile: tuple
+        :param grid: Tile grid
+        :type grid: TileGrid
+        :param api_key: VWorld API key (uses default if not provided)
+        :type api_key: str
+        :return: Request
+        :rtype: WfsRequest
+        """
+        return cls.create(typename, grid.tile_bbox(tile), api_key)
+
+    def next_page(self, count):
+        """
+        Make the request of the features following a page.
+
+        VWorld documents STARTINDEX for WFS 2.0.0 only. A server ignoring
+        it returns the first page again, so callers stop when a page
+        repeats features they already have.
+
+        :param count: Number of features in this request's response
+        :type count: int
+        :return: Request of the next page
+        :rtype: WfsRequest
+        """
+        return self._replace(start_index=(self.start_index or 0) + count)
+
+    def url(self):
+        """
+        Build the GetFeature URL of the request.
+
+        :return: Complete URL with query parameters
+        :rtype: str
+        """
+        parts = [
+            _URL_PREFIX, encode_query_value(self.typename),
+            '&SRSNAME=', encode_query_value(self.srsname),
+            '&OUTPUT=', encode_query_value(OUTPUT_FORMAT_JSON),
+            '&KEY=', encode_query_value(self.api_key),
+        ]
+        if self.bbox:
+            parts += ['&BBOX=', encode_query_value(self.bbox)]
+        if self.max_features:
+            parts += ['&MAXFEATURES=', str(self.max_features)]
+        if self.start_index:
+            # Only on later pages, first pages keep the URL (and cache key) of a plain request
+            parts += ['&STARTINDEX=', str(self.start_index)]
+        return ''.join(parts)
@@ -0,0 +1,295 @@
+"""
+Response cache for Quick Vworld Plugin
+
+This module stores downloaded API responses on disk, keyed by the
+request URL, so repeated downloads of the same area are served locally.
+Expired entries keep their HTTP validators (ETag / Last-Modified) so they
+can be revalidated with a conditional request instead of refetched.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from ..definitions.layers import DEFAULT_CACHE_TTL
+from .utilities import get_cache_dir
+
+LOGGER = logging.getLogger('QuickVworld')
+
+
+class ResponseCache:
+    """
+    Disk cache of API responses.
+
+    Each entry consists of a body file and a small JSON metadata file
+    named after the SHA-1 of the request URL. Both are written to a
+    unique temporary file and renamed into place, so threads and other
+    processes (e.g. command line jobs) sharing the directory never read
+    a partial file.
+    """
+
+    def __init__(self, cache_dir=None, ttl=DEFAULT_CACHE_TTL, suffix='.geojson'):
+        """
+        Constructor.
+
+        :param cache_dir: Cache directory (plugin cache dir if not provided)
+        :type cache_dir: str
+        :param ttl: Entry lifetime in seconds
+        :type ttl: int
+        :param suffix: File suffix of cached bodies
+        :type suffix: str
+        """
+        self.cache_dir = cache_dir or get_cache_dir('wfs')
+        self.ttl = ttl
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(url):
+        """
+        Get the cache key of a request URL.
+
+        :param url: Request URL
+        :type url: str
+        :return: Cache key
+        :rtype: str
+        """
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, key + self.suffix)
+
+    def _meta_path(self, key):
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def _read_meta(self, key):
+        try:
+            with open(self._meta_path(key), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, url, allow_stale=False):
+        """
+        Get the cached body of a request if it is still fresh.
+
+        :param url: Request URL
+        :type url: str
+        :param allow_stale: Also return expired entries (e.g. when a
+            refetch failed)
+        :type allow_stale: bool
+        :return: Path to the cached body, or None on a miss
+        :rtype: str or None
+        """
+        key = self.key_for(url)
+        meta = self._read_meta(key)
+        body_path = self._body_path(key)
+
+        if not meta or not os.path.exists(body_path):
+            return None
+
+        age = time.time() - meta.get('stored_at', 0)
+        if age > meta.get('ttl', self.ttl) and not allow_stale:
+            LOGGER.debug(f"Cache entry expired: {url}")
+            return None
+
+        return body_path
+
+    def contains(self, url):
+        """
+        Check whether a fresh entry exists for a request.
+
+        :param url: Request URL
+        :type url: str
+        :return: True if cached
+        :rtype: bool
+        """
+        return self.get(url) is not None
+
+    def get_meta(self, url):
+        """
+        Get the metadata stored with an entry.
+
+        :param url: Request URL
+        :type url: str
+        :return: Metadata dict, or None if there is no entry
+        :rtype: dict or None
+        """
+        return self._read_meta(self.key_for(url))
+
+    @staticmethod
+    def content_hash(path):
+        """
+        Get the SHA-256 of a file.
+
+        :param path: File path
+        :type path: str
+        :return: Hex digest
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _replace(self, path, write):
+        """Write a file under a unique temporary name, then rename it to path."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _write_meta(self, key, meta):
+        self._replace(self._meta_path(key), lambda f: f.write(json.dumps(meta).encode('utf-8')))
+
+    def put(self, url, source_path, extra=None):
+        """
+        Store a downloaded response.
+
+        If the body is identical to the stored one (same SHA-256), only
+        the metadata is refreshed.
+
+        :param url: Request URL
+        :type url: str
+        :param source_path: Downloaded file to copy into the cache
+        :type source_path: str
+        :param extra: Additional metadata stored with the entry
+            (e.g. validators from Downloader.get_validators())
+        :type extra: dict
+        :return: Path to the cached body
+        :rtype: str
+        """
+        key = self.key_for(url)
+        body_path = self._body_path(key)
+        meta = {
+            'url': url,
+            'stored_at': time.time(),
+            'ttl': self.ttl,
+            'size': os.path.getsize(source_path),
+            'sha256': self.content_hash(source_path),
+        }
+        if extra:
+            meta.update(extra)
+
+        with self._lock:
+            previous = self._read_meta(key)
+            unchanged = (previous and previous.get('sha256') == meta['sha256']
+                         and os.path.exists(body_path))
+            if not unchanged:
+                with open(source_path, 'rb') as source:
+                    self._replace(body_path, lambda f: shutil.copyfileobj(source, f))
+            self._write_meta(key, meta)
+
+        if unchanged:
+            LOGGER.debug(f"Cached response unchanged: {url}")
+        else:
+            LOGGER.debug(f"Cached response: {url} -> {body_path}")
+        return body_path
+
+    def conditional_headers(self, url):
+        """
+        Get the headers of a conditional request for a cached entry.
+
+        :param url: Request URL
+        :type url: str
+        :return: If-None-Match / If-Modified-Since headers (empty if the
+            entry does not exist or has no validators)
+        :rtype: dict
+        """
+        key = self.key_for(url)
+        meta = self._read_meta(key)
+        if not meta or not os.path.exists(self._body_path(key)):
+            return {}
+
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def touch(self, url, extra=None):
+        """
+        Renew the lifetime of an entry confirmed by a 304 response.
+
+        :param url: Request URL
+        :type url: str
+        :param extra: Metadata to update (e.g. new validators)
+        :type extra: dict
+        :return: Path to the cached body, or None if there is no entry
+        :rtype: str or None
+        """
+        key = self.key_for(url)
+        body_path = self._body_path(key)
+
+        with self._lock:
+            meta = self._read_meta(key)
+            if not meta or not os.path.exists(body_path):
+                return None
+            meta['stored_at'] = time.time()
+            meta['ttl'] = self.ttl
+            if extra:
+                meta.update(extra)
+            self._write_meta(key, meta)
+
+        LOGGER.debug(f"Cache entry revalidated: {url}")
+        return body_path
+
+    def update_meta(self, url, extra):
+        """
+        Add metadata to an entry without renewing its lifetime.
+
+        :param url: Request URL
+        :type url: str
+        :param extra: Metadata to update
+        :type extra: dict
+        :return: True if the entry exists
+        :rtype: bool
+        """
+        key = self.key_for(url)
+        with self._lock:
+            meta = self._read_meta(key)
+            if not meta:
+                return False
+            meta.update(extra)
+            self._write_meta(key, meta)
+        return True
+
+    def clear(self):
+        """Remove all cache entries."""
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError as e:
+                    LOGGER.warning(f"Failed to remove cache file {name}: {e}")
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """
+    Get the shared WFS response cache.
+
+    :return: Response cache
+    :rtype: ResponseCache
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
@@ -0,0 +1,124 @@
+"""
+Layer catalog refresh for Quick Vworld Plugin
+
+This module fetches the VWorld WFS GetCapabilities document in the
+background and stores the advertised layers in the layer catalog
+(see definitions/catalog.py).
+"""
+
+import logging
+import os
+from qgis.PyQt.QtCore import QDir, QTemporaryFile, QUrl, QUrlQuery
+from qgis.core import QgsTask
+
+from .api.downloader import Downloader
+from .api.scheduler import Priority
+from .utilities import get_cache_dir
+from ..definitions.layers import (
+    CATALOG_TTL,
+    DEFAULT_API_KEY,
+    VWORLD_WFS_URL,
+    WFS_SERVICE,
+    WFS_VERSION,
+    get_catalog,
+)
+
+LOGGER = logging.getLogger('QuickVworld')
+
+
+def capabilities_url(api_key=None):
+    """
+    Build the WFS GetCapabilities URL.
+
+    :param api_key: VWorld API key (uses default if not provided)
+    :type api_key: str
+    :return: GetCapabilities URL
+    :rtype: str
+    """
+    query = QUrlQuery()
+    query.addQueryItem('SERVICE', WFS_SERVICE)
+    query.addQueryItem('VERSION', WFS_VERSION)
+    query.addQueryItem('REQUEST', 'GetCapabilities')
+    query.addQueryItem('KEY', api_key or DEFAULT_API_KEY)
+
+    url = QUrl(VWORLD_WFS_URL)
+    url.setQuery(query)
+    return url.toString()
+
+
+def init_catalog():
+    """
+    Point the layer catalog at its file in the plugin cache directory.
+
+    The file itself is only read on the first catalog lookup.
+
+    :return: Layer catalog
+    :rtype: LayerCatalog
+    """
+    catalog = get_catalog()
+    catalog.set_path(os.path.join(get_cache_dir('catalog'), 'layers.json'))
+    return catalog
+
+
+def catalog_needs_refresh(catalog=None):
+    """
+    Check whether the persisted catalog is missing or older than CATALOG_TTL.
+
+    :param catalog: Layer catalog (shared catalog if not provided)
+    :type catalog: LayerCatalog
+    :return: True if GetCapabilities should be fetched
+    :rtype: bool
+    """
+    age = (catalog or get_catalog()).age()
+    return age is None or age > CATALOG_TTL
+
+
+class CatalogRefreshTask(QgsTask):
+    """Background task fetching GetCapabilities into the layer catalog."""
+
+    def __init__(self, catalog=None, api_key=None):
+        """
+        Constructor.
+
+        :param catalog: Layer catalog (shared catalog if not provided)
+        :type catalog: LayerCatalog
+        :param api_key: VWorld API key (uses default if not provided)
+        :type api_key: str
+        """
+        super().__init__('Quick Vworld layer catalog', QgsTask.CanCancel | QgsTask.Silent)
+        self.catalog = catalog or get_catalog()
+        self.api_key = api_key
+        self.layer_count = 0
+        self.error = None
+
+    def run(self):
+        """Download and parse GetCapabilities (runs in a worker thread)."""
+        temp_file = QTemporaryFile(os.path.join(QDir.tempPath(), 'quickvworld-XXXXXX.xml'))
+        if not temp_file.open():
+            self.error = "Failed to create temporary file"
+            return False
+        temp_file.close()
+
+        downloader = Downloader(capabilities_url(self.api_key))
+        downloader.result_path = temp_file.fileName()
+        downloader.set_priority(Priority.BULK, job_id='catalog')
+
+        if not downloader.download_sync() or self.isCanceled():
+            self.error = '; '.join(downloader.get_errors()) or 'canceled'
+            return False
+
+        try:
+            with open(downloader.result_path, 'rb') as f:
+                self.layer_count = self.catalog.update_from_capabilities(f.read())
+        except (OSError, ValueError) as e:
+            self.error = str(e)
+            return False
+
+        return True
+
+    def finished(self, result):
+        """Log the task result (runs in the main thread)."""
+        if result:
+            LOGGER.info(f"Layer catalog updated: {self.layer_count} layers from GetCapabilities")
+        else:
+            LOGGER.error(f"Layer catalog refresh failed: {self.error}")
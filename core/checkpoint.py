@@ -0,0 +1,211 @@
+"""
+Download checkpoints for Quick Vworld Plugin
+
+This module records the completed units (tiles, pages) of a long
+download on disk, so the download can continue where it stopped after
+a failure or a QGIS restart instead of starting over.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from .utilities import get_cache_dir
+
+LOGGER = logging.getLogger('QuickVworld')
+
+
+class Checkpoint:
+    """
+    Set of completed units of a job, persisted as an append-only file.
+
+    Each completed unit is one line, written and flushed as soon as the
+    unit is done, so at most the unit in progress is lost on a crash.
+    """
+
+    def __init__(self, job_key, description=None, directory=None, max_age=None):
+        """
+        Constructor.
+
+        :param job_key: Identifier of the job (same key resumes the same job)
+        :type job_key: str
+        :param description: Job description stored next to the checkpoint
+        :type description: dict
+        :param directory: Checkpoint directory (plugin cache dir if not provided)
+        :type directory: str
+        :param max_age: Age in seconds after which an earlier run is not
+            resumed but started over (e.g. the cache TTL, so resumed units
+            are not older than cached ones)
+        :type max_age: int
+        """
+        self.job_key = job_key
+        name = hashlib.sha1(job_key.encode('utf-8')).hexdigest()
+        directory = directory or get_cache_dir('jobs')
+        self.path = os.path.join(directory, name + '.done')
+        self.meta_path = os.path.join(directory, name + '.json')
+        self._lock = threading.Lock()
+        self._done = set()
+
+        age = self.age()
+        if max_age is not None and age is not None and age > max_age:
+            LOGGER.info(f"Checkpoint of {job_key} is {age / 3600:.1f} hours old, starting over")
+            self.remove()
+        self._done = self._read()
+
+        if not os.path.exists(self.meta_path):
+            with open(self.meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'job': job_key, 'created_at': time.time(),
+                           'description': description or {}}, f, ensure_ascii=False)
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return {line.rstrip('\n') for line in f if line.strip()}
+        except OSError:
+            return set()
+
+    def age(self):
+        """
+        Get the age of the checkpoint.
+
+        :return: Seconds since the job was first started, or None if the
+            checkpoint does not exist yet
+        :rtype: float or None
+        """
+        try:
+            with open(self.meta_path, encoding='utf-8') as f:
+                created_at = json.load(f).get('created_at', 0)
+        except (OSError, ValueError):
+            return None
+        return time.time() - created_at
+
+    @staticmethod
+    def unit_key(*parts):
+        """
+        Build the key of a unit.
+
+        :param parts: Parts identifying the unit (e.g. typename, col, row)
+        :return: Unit key
+        :rtype: str
+        """
+        return '/'.join(str(part) for part in parts)
+
+    def is_resumed(self):
+        """
+        Check whether units were completed by an earlier run.
+
+        :return: True if the job continues a previous run
+        :rtype: bool
+        """
+        return bool(self._done)
+
+    def completed_count(self):
+        """
+        Get the number of completed units.
+
+        :return: Completed units
+        :rtype: int
+        """
+        return len(self._done)
+
+    def is_done(self, unit):
+        """
+        Check whether a unit is completed.
+
+        :param unit: Unit key
+        :type unit: str
+        :return: True if completed
+        :rtype: bool
+        """
+        return unit in self._done
+
+    def mark_done(self, unit):
+        """
+        Record a completed unit.
+
+        :param unit: Unit key
+        :type unit: str
+        """
+        with self._lock:
+            if unit in self._done:
+                return
+            self._done.add(unit)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(unit + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def remove(self):
+        """Delete the checkpoint (the job finished)."""
+        with self._lock:
+            for path in (self.path, self.meta_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    LOGGER.warning(f"Failed to remove checkpoint file {path}: {e}")
+            self._done = set()
+
+
+def remove_expired_checkpoints(max_age, directory=None):
+    """
+    Delete the checkpoints of jobs first started longer ago than max_age.
+
+    Failed downloads that are never run again would otherwise keep
+    their checkpoint forever.
+
+    :param max_age: Age in seconds
+    :type max_age: int
+    :param directory: Checkpoint directory (plugin cache dir if not provided)
+    :type directory: str
+    :return: Number of checkpoints removed
+    :rtype: int
+    """
+    directory = directory or get_cache_dir('jobs')
+    removed = 0
+    for name in os.listdir(directory):
+        if not name.endswith('.done'):
+            continue
+        base = os.path.join(directory, name[:-len('.done')])
+        try:
+            with open(base + '.json', encoding='utf-8') as f:
+                created_at = json.load(f).get('created_at', 0)
+        except (OSError, ValueError):
+            created_at = os.path.getmtime(base + '.done')
+        if time.time() - created_at <= max_age:
+            continue
+        for path in (base + '.done', base + '.json'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                LOGGER.warning(f"Failed to remove checkpoint file {path}: {e}")
+        removed += 1
+    if removed:
+        LOGGER.info(f"Removed {removed} expired download checkpoints")
+    return removed
+
+
+def tile_job_key(typename, extent, grid):
+    """
+    Get the checkpoint key of a tiled download.
+
+    :param typename: Layer typename
+    :type typename: str
+    :param extent: Extent in EPSG:4326
+    :type extent: QgsRectangle or tuple
+    :param grid: Tile grid
+    :type grid: TileGrid
+    :return: Job key
+    :rtype: str
+    """
+    # Tiles are row-major from south-west, so the first and last tiles
+    # identify the whole range
+    tiles = grid.tiles_for_extent(extent)
+    (col_min, row_min), (col_max, row_max) = tiles[0], tiles[-1]
+    return f"tiles:{typename}:{grid.tile_size}:{col_min},{row_min},{col_max},{row_max}"
@@ -0,0 +1,329 @@
+"""
+Columnar export for Quick Vworld Plugin
+
+Turns feature records (see features.py) into NumPy arrays for
+vectorized analysis, without going through a QgsVectorLayer:
+
+- numeric and boolean properties become typed arrays (int64, float64,
+  bool), with a validity mask when some values are missing;
+- string properties are dictionary-encoded: int32 codes (-1 for
+  missing) into an array of distinct values;
+- geometries are flattened GeoArrow-style into one interleaved x/y
+  coordinate array and nested offset arrays.
+
+NumPy ships with QGIS but is only imported when a table is built;
+to_pandas() also needs pandas.
+"""
+
+import logging
+import struct
+from array import array
+
+from .features import WKB_COUNT, WKB_HEADER, WKB_POINT
+
+LOGGER = logging.getLogger('QuickVworld')
+
+# Geometry dimension -> GeoArrow geometry type (single parts become multi)
+GEOMETRY_TYPES = {0: 'multipoint', 1: 'multilinestring', 2: 'multipolygon'}
+
+# WKB type -> geometry dimension
+_DIMENSIONS = {1: 0, 2: 1, 3: 2, 4: 0, 5: 1, 6: 2}
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Columnar export needs NumPy")
+    return numpy
+
+
+class DictionaryColumn:
+    """A dictionary-encoded string column."""
+
+    __slots__ = ('codes', 'dictionary')
+
+    def __init__(self, codes, dictionary):
+        """
+        Constructor.
+
+        :param codes: Index of each value in dictionary, -1 if missing
+        :type codes: numpy.ndarray
+        :param dictionary: Distinct values
+        :type dictionary: numpy.ndarray
+        """
+        self.codes = codes
+        self.dictionary = dictionary
+
+    def __len__(self):
+        return len(self.codes)
+
+    def decode(self):
+        """
+        Get the values (None where missing).
+
+        :rtype: numpy.ndarray
+        """
+        numpy = _import_numpy()
+        values = numpy.empty(len(self.codes), dtype=object)
+        present = self.codes >= 0
+        values[present] = self.dictionary[self.codes[present]]
+        return values
+
+
+class GeometryArrays:
+    """
+    GeoArrow-style geometry column.
+
+    For a multipolygon column, the coordinates of ring k are
+    coords[ring_offsets[k]:ring_offsets[k + 1]], the rings of polygon j
+    are ring_offsets[polygon_offsets[j]:polygon_offsets[j + 1]], and the
+    polygons of feature i are polygon_offsets[geometry_offsets[i]:
+    geometry_offsets[i + 1]]. Multilinestrings have two offset levels
+    and multipoints one. Features without geometry have no parts.
+    """
+
+    __slots__ = ('geometry_type', 'coords', 'offsets', 'bounds')
+
+    def __init__(self, geometry_type, coords, offsets, bounds):
+        """
+        Constructor.
+
+        :param geometry_type: GeoArrow type (see GEOMETRY_TYPES), None if
+            no feature has a geometry
+        :type geometry_type: str
+        :param coords: Coordinates, shape (n, 2)
+        :type coords: numpy.ndarray
+        :param offsets: Offset arrays, outermost (geometry) level first
+        :type offsets: tuple
+        :param bounds: Feature bounds, shape (features, 4), NaN if missing
+        :type bounds: numpy.ndarray
+        """
+        self.geometry_type = geometry_type
+        self.coords = coords
+        self.offsets = offsets
+        self.bounds = bounds
+
+    @property
+    def geometry_offsets(self):
+        """Offsets of each feature's parts (the outermost level)."""
+        return self.offsets[0]
+
+
+class ColumnarTable:
+    """Features of a download as NumPy arrays (see module docstring)."""
+
+    def __init__(self, ids, columns, validity, geometry):
+        """
+        Constructor.
+
+        :param ids: VWorld feature ids (object array)
+        :type ids: numpy.ndarray
+        :param columns: Property name -> array or DictionaryColumn
+        :type columns: dict
+        :param validity: Property name -> True where the value is present,
+            for the numeric columns with missing values
+        :type validity: dict
+        :param geometry: Geometry column
+        :type geometry: GeometryArrays
+        """
+        self.ids = ids
+        self.columns = columns
+        self.validity = validity
+        self.geometry = geometry
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def to_pandas(self):
+        """
+        Get the properties as a pandas DataFrame indexed by feature id.
+
+        String columns become categoricals, integer and boolean columns
+        with missing values become nullable pandas arrays. Geometries
+        are not included (see geometry).
+
+        :rtype: pandas.DataFrame
+        """
+        try:
+            import pandas
+        except ImportError:
+            raise ImportError("to_pandas needs pandas")
+
+        data = {}
+        for name, column in self.columns.items():
+            if isinstance(column, DictionaryColumn):
+                data[name] = pandas.Categorical.from_codes(column.codes, column.dictionary)
+            elif name in self.validity and column.dtype.kind == 'i':
+                data[name] = pandas.arrays.IntegerArray(column, ~self.validity[name])
+            elif name in self.validity and column.dtype.kind == 'b':
+                data[name] = pandas.arrays.BooleanArray(column, ~self.validity[name])
+            else:
+                data[name] = column
+        return pandas.DataFrame(data, index=pandas.Index(self.ids, name='id'))
+
+
+def _read_sequence(wkb, offset):
+    (count,) = WKB_COUNT.unpack_from(wkb, offset)
+    offset += 4
+    return struct.unpack_from(f'<{2 * count}d', wkb, offset), offset + 16 * count
+
+
+def _read_parts(wkb, offset, parts):
+    """Append the parts of a WKB geometry to parts and return (dimension, offset)."""
+    _byte_order, code = WKB_HEADER.unpack_from(wkb, offset)
+    offset += WKB_HEADER.size
+
+    if code == 1:
+        parts.append(WKB_POINT.unpack_from(wkb, offset))
+        return 0, offset + WKB_POINT.size
+    if code == 2:
+        flat, offset = _read_sequence(wkb, offset)
+        parts.append(flat)
+        return 1, offset
+    if code == 3:
+        (count,) = WKB_COUNT.unpack_from(wkb, offset)
+        offset += 4
+        rings = []
+        for _ in range(count):
+            flat, offset = _read_sequence(wkb, offset)
+            rings.append(flat)
+        parts.append(rings)
+        return 2, offset
+    if code in (4, 5, 6):
+        (count,) = WKB_COUNT.unpack_from(wkb, offset)
+        offset += 4
+        for _ in range(count):
+            _dimension, offset = _read_parts(wkb, offset, parts)
+        return _DIMENSIONS[code], offset
+    raise ValueError(f"Unsupported WKB geometry type {code}")
+
+
+def _from_buffer(numpy, values, dtype):
+    # Shares the memory of the array.array instead of copying it
+    if not values:
+        return numpy.empty(0, dtype=dtype)
+    return numpy.frombuffer(values, dtype=dtype)
+
+
+def _column_array(numpy, values):
+    """Get (array, validity or None) of a property column."""
+    present = [value for value in values if value is not None]
+    kinds = {type(value) for value in present}
+    missing = len(present) != len(values)
+
+    if kinds and kinds <= {bool}:
+        array_values = numpy.array([bool(value) for value in values], dtype=bool)
+    elif kinds and kinds <= {int}:
+        array_values = numpy.array([0 if value is None else value for value in values], dtype=numpy.int64)
+    elif kinds and kinds <= {int, float}:
+        # NaN marks the missing values, no mask needed
+        return numpy.array([numpy.nan if value is None else value for value in values],
+                           dtype=numpy.float64), None
+    else:
+        codes = numpy.empty(len(values), dtype=numpy.int32)
+        dictionary = {}
+        for index, value in enumerate(values):
+            if value is None:
+                codes[index] = -1
+                continue
+            if type(value) is not str:
+                value = str(value)
+            code = dictionary.get(value)
+            if code is None:
+                code = dictionary[value] = len(dictionary)
+            codes[index] = code
+        return DictionaryColumn(codes, numpy.array(list(dictionary), dtype=object)), None
+
+    if not missing:
+        return array_values, None
+    return array_values, numpy.array([value is not None for value in values], dtype=bool)
+
+
+def to_columnar(records, properties=None):
+    """
+    Build a columnar table from feature records.
+
+    Records are consumed one by one, so a streaming iterator (e.g.
+    VworldWFSClient.iter_features) is never held as records: only the
+    growing columns are kept.
+
+    :param records: Feature records (an iterator or a list)
+    :type records: iterable
+    :param properties: Property columns (every property seen if not provided)
+    :type properties: list
+    :return: Columnar table
+    :rtype: ColumnarTable
+    :raises ImportError: If NumPy is not installed
+    """
+    numpy = _import_numpy()
+
+    ids = []
+    columns = {name: [] for name in properties or []}
+    bounds = array('d')
+    coords = array('d')
+    dimension = None
+    # Offsets from the outermost level; level 0 counts the feature's parts
+    offsets = [array('q', [0]), array('q', [0]), array('q', [0])]
+    skipped = 0
+
+    for count, record in enumerate(records):
+        ids.append(record.id)
+
+        for name, value in zip(record.schema, record.values):
+            column = columns.get(name)
+            if column is None:
+                if properties:
+                    continue
+                # A property missing from earlier records
+                column = columns[name] = [None] * count
+            column.append(value)
+        for column in columns.values():
+            if len(column) == count:
+                column.append(None)
+
+        parts = []
+        if record.wkb:
+            part_dimension, _offset = _read_parts(record.wkb, 0, parts)
+            if dimension is None:
+                dimension = part_dimension
+            elif part_dimension != dimension:
+                skipped += 1
+                parts = []
+
+        bounds.extend(record.bounds if parts and record.bounds else (numpy.nan,) * 4)
+        for part in parts:
+            if dimension == 0:
+                coords.extend(part)
+            elif dimension == 1:
+                coords.extend(part)
+                offsets[1].append(len(coords) // 2)
+            else:
+                for ring in part:
+                    coords.extend(ring)
+                    offsets[2].append(len(coords) // 2)
+                offsets[1].append(len(offsets[2]) - 1)
+        offsets[0].append(offsets[0][-1] + len(parts))
+
+    if skipped:
+        LOGGER.warning(f"{skipped} geometries of another dimension than "
+                       f"{GEOMETRY_TYPES[dimension]} left empty")
+
+    arrays = {}
+    validity = {}
+    for name, values in columns.items():
+        arrays[name], mask = _column_array(numpy, values)
+        if mask is not None:
+            validity[name] = mask
+
+    levels = (dimension or 0) + 1
+    geometry = GeometryArrays(
+        GEOMETRY_TYPES.get(dimension),
+        _from_buffer(numpy, coords, numpy.float64).reshape(-1, 2),
+        tuple(_from_buffer(numpy, level, numpy.int64) for level in offsets[:levels]),
+        _from_buffer(numpy, bounds, numpy.float64).reshape(-1, 4)
+    )
+    return ColumnarTable(numpy.array(ids, dtype=object), arrays, validity, geometry)
@@ -0,0 +1,236 @@
+"""
+Tile export for Quick Vworld Plugin
+
+This module merges downloaded WFS tiles into a single output file
+(GeoPackage or GeoJSON) without going through a project layer, so it
+can be used by background jobs as well as interactive downloads.
+"""
+
+import logging
+import os
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransformContext,
+    QgsFeature,
+    QgsFeatureRequest,
+    QgsFields,
+    QgsGeometry,
+    QgsVectorFileWriter,
+    QgsVectorLayer,
+    QgsWkbTypes,
+)
+
+from ..definitions.layers import CRS_WGS84
+from .processor import FEATURE_ID_FIELD
+
+LOGGER = logging.getLogger('QuickVworld')
+
+# Output format -> (OGR driver, file suffix)
+OUTPUT_FORMATS = {
+    'gpkg': ('GPKG', '.gpkg'),
+    'geojson': ('GeoJSON', '.geojson'),
+}
+
+
+def select_fields(fields, properties=None):
+    """
+    Get the output fields for a property list.
+
+    The VWorld feature id is always kept, since it identifies features
+    across tiles.
+
+    :param fields: Fields of the downloaded data
+    :type fields: QgsFields
+    :param properties: Property names to keep (all if not provided)
+    :type properties: list
+    :return: Output fields
+    :rtype: QgsFields
+    """
+    if not properties:
+        return QgsFields(fields)
+
+    names = [FEATURE_ID_FIELD] + [name for name in properties if name != FEATURE_ID_FIELD]
+    selected = QgsFields()
+    for name in names:
+        index = fields.indexOf(name)
+        if index < 0:
+            if name != FEATURE_ID_FIELD:
+                LOGGER.warning(f"Property not found in downloaded data: {name}")
+            continue
+        selected.append(fields.at(index))
+    return selected
+
+
+def _create_writer(output_path, layer_name, output_format, fields, wkb_type):
+    driver_name = OUTPUT_FORMATS[output_format][0]
+
+    options = QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName = driver_name
+    options.fileEncoding = 'UTF-8'
+    options.layerName = layer_name
+    # A GeoPackage holds one table per layer, other files are replaced
+    if driver_name == 'GPKG' and os.path.exists(output_path):
+        options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteLayer
+
+    writer = QgsVectorFileWriter.create(
+        output_path, fields, wkb_type, QgsCoordinateReferenceSystem(CRS_WGS84),
+        QgsCoordinateTransformContext(), options
+    )
+    if writer.hasError() != QgsVectorFileWriter.NoError:
+        LOGGER.error(f"Cannot create {output_path}: {writer.errorMessage()}")
+        return None
+    return writer
+
+
+def read_tile_schema(tile_files, properties=None):
+    """
+    Get the output schema of downloaded tiles.
+
+    The fields of the first tile with features are used and the
+    geometry type is made multi, so single and multi parts from any
+    tile fit.
+
+    :param tile_files: Paths to the tile GeoJSON files
+    :type tile_files: list
+    :param properties: Property names to keep (all if not provided)
+    :type properties: list
+    :return: (fields, wkb type), or (None, None) if no tile has features
+    :rtype: tuple
+    """
+    for tile_file in tile_files:
+        source = QgsVectorLayer(tile_file, 'tile', 'ogr')
+        if source.isValid() and source.featureCount() > 0:
+            return select_fields(source.fields(), properties), QgsWkbTypes.multiType(source.wkbType())
+    return None, None
+
+
+def iter_tile_features(tile_files, fields, aoi=None, expression=None, clip=False, is_canceled=None):
+    """
+    Iterate over the features of downloaded tiles, each feature once.
+
+    Features returned by several tiles are yielded once (by VWorld
+    feature id). With an area of interest, only the features
+    intersecting it are yielded, cut to it when clip is set.
+
+    :param tile_files: Paths to the tile GeoJSON files
+    :type tile_files: list
+    :param fields: Output fields (see read_tile_schema)
+    :type fields: QgsFields
+    :param aoi: Area of interest in EPSG:4326 (optional)
+    :type aoi: QgsGeometry
+    :param expression: QGIS filter expression on the features (optional)
+    :type expression: str
+    :param clip: Cut the geometries to the area of interest
+    :type clip: bool
+    :param is_canceled: Returns True when iterating should stop
+    :type is_canceled: callable
+    :return: Features with the output fields
+    :rtype: generator
+    """
+    engine = None
+    if aoi is not None and not aoi.isNull():
+        engine = QgsGeometry.createGeometryEngine(aoi.constGet())
+        engine.prepareGeometry()
+
+    seen_ids = set()
+    for tile_file in tile_files:
+        if is_canceled and is_canceled():
+            return
+
+        source = QgsVectorLayer(tile_file, 'tile', 'ogr')
+        if not source.isValid() or source.featureCount() == 0:
+            continue
+
+        source_names = source.fields().names()
+        # Map output fields to source columns by name (tiles may differ)
+        mapping = [source_names.index(name) if name in source_names else -1
+                   for name in fields.names()]
+        id_index = source_names.index(FEATURE_ID_FIELD) if FEATURE_ID_FIELD in source_names else -1
+
+        request = QgsFeatureRequest()
+        if expression:
+            request.setFilterExpression(expression)
+        if engine is not None:
+            request.setFilterRect(aoi.boundingBox())
+
+        for source_feature in source.getFeatures(request):
+            feature_id = source_feature[id_index] if id_index >= 0 else None
+
+            # Features crossing tile borders are returned by every tile
+            if feature_id is not None:
+                if feature_id in seen_ids:
+                    continue
+                seen_ids.add(feature_id)
+
+            geometry = source_feature.geometry()
+            if engine is not None:
+                if geometry.isNull() or not engine.intersects(geometry.constGet()):
+                    continue
+                if clip and not engine.contains(geometry.constGet()):
+                    geometry_type = geometry.type()
+                    geometry = geometry.intersection(aoi)
+                    if geometry.type() != geometry_type:
+                        # Keep the parts of the layer's geometry type (e.g. no
+                        # boundary lines of a polygon touching the AOI)
+                        geometry = geometry.convertToType(geometry_type, True)
+                    if geometry.isNull() or geometry.isEmpty():
+                        continue
+            if not geometry.isNull():
+                geometry.convertToMultiType()
+
+            source_attributes = source_feature.attributes()
+            feature = QgsFeature(fields)
+            feature.setAttributes([source_attributes[i] if i >= 0 else None for i in mapping])
+            if not geometry.isNull():
+                feature.setGeometry(geometry)
+            yield feature
+
+
+def export_tiles(tile_files, output_path, layer_name, output_format='gpkg',
+                 aoi=None, expression=None, properties=None, clip=False):
+    """
+    Merge downloaded tiles into one output layer.
+
+    See iter_tile_features for the handling of duplicates and of the
+    area of interest.
+
+    :param tile_files: Paths to the tile GeoJSON files
+    :type tile_files: list
+    :param output_path: Output file
+    :type output_path: str
+    :param layer_name: Output layer (GeoPackage table) name
+    :type layer_name: str
+    :param output_format: Output format (see OUTPUT_FORMATS)
+    :type output_format: str
+    :param aoi: Area of interest in EPSG:4326 (optional)
+    :type aoi: QgsGeometry
+    :param expression: QGIS filter expression on the features (optional)
+    :type expression: str
+    :param properties: Property names to write (all if not provided)
+    :type properties: list
+    :param clip: Cut the geometries to the area of interest
+    :type clip: bool
+    :return: Number of features written, or None if writing failed
+    :rtype: int or None
+    """
+    fields, wkb_type = read_tile_schema(tile_files, properties)
+    if fields is None:
+        LOGGER.warning(f"No features to export for {layer_name}, {output_path} not written")
+        return 0
+
+    writer = _create_writer(output_path, layer_name, output_format, fields, wkb_type)
+    if writer is None:
+        return None
+
+    count = 0
+    for feature in iter_tile_features(tile_files, fields, aoi, expression, clip):
+        if not writer.addFeature(feature):
+            LOGGER.error(f"Failed to write {output_path}: {writer.errorMessage()}")
+            del writer
+            return None
+        count += 1
+
+    # The file is completed when the writer is deleted
+    del writer
+    LOGGER.info(f"Exported {count} features to {output_path} ({layer_name})")
+    return count
@@ -0,0 +1,452 @@
+"""
+Feature records for Quick Vworld Plugin
+
+Compact feature representation for scripts and analytics that read
+VWorld features without building a QgsVectorLayer (the streaming
+iterator and the columnar export). A response's GeoJSON is decoded one
+page at a time into FeatureRecord objects:
+
+- records use __slots__ and keep their property values in a tuple,
+  with the property names in a schema tuple shared by every record of
+  the same layout;
+- property strings go through a StringPool, so values repeated in
+  every feature (sido_name, sigg_name, ucode...) are stored once per
+  pool and get a dictionary code. A pool keeps every distinct string it
+  sees, so streaming code uses one per tile;
+- geometries are kept as 2D WKB bytes with their bounding box instead
+  of nested coordinate lists.
+"""
+
+import json
+import logging
+import struct
+
+LOGGER = logging.getLogger('QuickVworld')
+
+# GeoJSON geometry type <-> WKB geometry type
+WKB_TYPES = {
+    'Point': 1,
+    'LineString': 2,
+    'Polygon': 3,
+    'MultiPoint': 4,
+    'MultiLineString': 5,
+    'MultiPolygon': 6,
+    'GeometryCollection': 7,
+}
+GEOJSON_TYPES = {code: name for name, code in WKB_TYPES.items()}
+
+# Multi type -> type of its parts
+_PART_TYPES = {4: 'Point', 5: 'LineString', 6: 'Polygon'}
+
+# WKB byte order and type, element count, 2D point
+WKB_HEADER = struct.Struct('<BI')
+WKB_COUNT = struct.Struct('<I')
+WKB_POINT = struct.Struct('<2d')
+
+
+class StringPool:
+    """
+    Dictionary encoding of strings.
+
+    Equal strings read from different features are replaced by one
+    shared object, and every distinct string gets a code (its index in
+    values).
+    """
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+        self._schemas = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        """
+        Get the dictionary code of a string, adding it if new.
+
+        :param value: String
+        :type value: str
+        :return: Code
+        :rtype: int
+        """
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def intern(self, value):
+        """
+        Get the shared copy of a string (other values are returned as is).
+
+        :param value: Property value
+        :return: The same value, shared if it is a string
+        """
+        if type(value) is not str:
+            return value
+        return self.values[self.code(value)]
+
+    def schema(self, names):
+        """
+        Get the shared copy of a property name tuple.
+
+        :param names: Property names
+        :type names: tuple
+        :return: Shared tuple
+        :rtype: tuple
+        """
+        schema = self._schemas.get(names)
+        if schema is None:
+            schema = tuple(self.intern(name) for name in names)
+            self._schemas[names] = schema
+        return schema
+
+
+class FeatureRecord:
+    """A VWorld feature in compact form (see module docstring)."""
+
+    __slots__ = ('id', 'schema', 'values', 'wkb', 'bounds')
+
+    def __init__(self, feature_id, schema, values, wkb=None, bounds=None):
+        """
+        Constructor.
+
+        :param feature_id: VWorld feature id (None if missing)
+        :type feature_id: str
+        :param schema: Property names
+        :type schema: tuple
+        :param values: Property values, in schema order
+        :type values: tuple
+        :param wkb: Geometry as little-endian 2D WKB (None if missing)
+        :type wkb: bytes
+        :param bounds: Geometry bounds (xmin, ymin, xmax, ymax)
+        :type bounds: tuple
+        """
+        self.id = feature_id
+        self.schema = schema
+        self.values = values
+        self.wkb = wkb
+        self.bounds = bounds
+
+    def __getitem__(self, name):
+        try:
+            return self.values[self.schema.index(name)]
+        except ValueError:
+            raise KeyError(name)
+
+    def get(self, name, default=None):
+        """
+        Get a property value.
+
+        :param name: Property name
+        :type name: str
+        :param default: Value if the feature has no such property
+        :return: Property value
+        """
+        try:
+            return self.values[self.schema.index(name)]
+        except ValueError:
+            return default
+
+    @property
+    def properties(self):
+        """Property name -> value (built on each access)."""
+        return dict(zip(self.schema, self.values))
+
+    @property
+    def geometry(self):
+        """GeoJSON geometry (decoded on each access), or None."""
+        return wkb_to_geojson(self.wkb) if self.wkb else None
+
+    def to_geojson(self):
+        """
+        Get the feature as a GeoJSON feature.
+
+        :rtype: dict
+        """
+        feature = {'type': 'Feature', 'geometry': self.geometry, 'properties': self.properties}
+        if self.id is not None:
+            feature['id'] = self.id
+        return feature
+
+    def __repr__(self):
+        return f"FeatureRecord({self.id!r})"
+
+
+def _pack_points(points, out, bounds):
+    flat = []
+    for point in points:
+        flat.append(point[0])
+        flat.append(point[1])
+    out.append(struct.pack(f'<I{len(flat)}d', len(points), *flat))
+    if flat:
+        xs = flat[0::2]
+        ys = flat[1::2]
+        bounds.append((min(xs), min(ys), max(xs), max(ys)))
+
+
+def _encode(geometry, out, bounds):
+    code = WKB_TYPES.get(geometry.get('type'))
+    if code is None:
+        raise ValueError(f"Unsupported geometry type: {geometry.get('type')}")
+    out.append(WKB_HEADER.pack(1, code))
+
+    coordinates = geometry.get('coordinates')
+    if code == 1:
+        x, y = coordinates[:2] if coordinates else (float('nan'), float('nan'))
+        out.append(WKB_POINT.pack(x, y))
+        if coordinates:
+            bounds.append((x, y, x, y))
+    elif code == 2:
+        _pack_points(coordinates, out, bounds)
+    elif code == 3:
+        out.append(WKB_COUNT.pack(len(coordinates)))
+        for ring in coordinates:
+            _pack_points(ring, out, bounds)
+    elif code in _PART_TYPES:
+        out.append(WKB_COUNT.pack(len(coordinates)))
+        for part in coordinates:
+            _encode({'type': _PART_TYPES[code], 'coordinates': part}, out, bounds)
+    else:
+        parts = geometry.get('geometries') or []
+        out.append(WKB_COUNT.pack(len(parts)))
+        for part in parts:
+            _encode(part, out, bounds)
+
+
+def geojson_to_wkb(geometry):
+    """
+    Encode a GeoJSON geometry as little-endian 2D WKB.
+
+    Z and M values are dropped.
+
+    :param geometry: GeoJSON geometry
+    :type geometry: dict
+    :return: (wkb, bounds) where bounds is None for an empty geometry
+    :rtype: tuple
+    :raises ValueError: If the geometry type is unknown
+    """
+    out = []
+    bounds = []
+    _encode(geometry, out, bounds)
+    if not bounds:
+        return b''.join(out), None
+    return b''.join(out), (
+        min(b[0] for b in bounds), min(b[1] for b in bounds),
+        max(b[2] for b in bounds), max(b[3] for b in bounds),
+    )
+
+
+def _unpack_points(wkb, offset):
+    (count,) = WKB_COUNT.unpack_from(wkb, offset)
+    offset += 4
+    flat = struct.unpack_from(f'<{2 * count}d', wkb, offset)
+    return [[flat[i], flat[i + 1]] for i in range(0, 2 * count, 2)], offset + 16 * count
+
+
+def _decode(wkb, offset):
+    _byte_order, code = WKB_HEADER.unpack_from(wkb, offset)
+    offset += WKB_HEADER.size
+
+    if code == 1:
+        x, y = WKB_POINT.unpack_from(wkb, offset)
+        return {'type': 'Point', 'coordinates': [x, y]}, offset + WKB_POINT.size
+    if code == 2:
+        points, offset = _unpack_points(wkb, offset)
+        return {'type': 'LineString', 'coordinates': points}, offset
+
+    (count,) = WKB_COUNT.unpack_from(wkb, offset)
+    offset += 4
+    parts = []
+    for _ in range(count):
+        if code == 3:
+            part, offset = _unpack_points(wkb, offset)
+        else:
+            part, offset = _decode(wkb, offset)
+        parts.append(part)
+
+    if code == 3:
+        return {'type': 'Polygon', 'coordinates': parts}, offset
+    if code == 7:
+        return {'type': 'GeometryCollection', 'geometries': parts}, offset
+    return {'type': GEOJSON_TYPES[code], 'coordinates': [part['coordinates'] for part in parts]}, offset
+
+
+def wkb_to_geojson(wkb):
+    """
+    Decode WKB written by geojson_to_wkb.
+
+    :param wkb: Little-endian 2D WKB
+    :type wkb: bytes
+    :return: GeoJSON geometry
+    :rtype: dict
+    """
+    return _decode(wkb, 0)[0]
+
+
+def decode_features(features, pool, properties=None):
+    """
+    Convert GeoJSON features to feature records.
+
+    :param features: GeoJSON features
+    :type features: list
+    :param pool: String pool shared by the records
+    :type pool: StringPool
+    :param properties: Property names to keep (all if not provided)
+    :type properties: list
+    :return: Feature records, in the same order
+    :rtype: list
+    :raises ValueError: If a geometry type is unknown
+    """
+    selected = pool.schema(tuple(properties)) if properties else None
+    intern = pool.intern
+    records = []
+    for feature in features:
+        values = feature.get('properties') or {}
+        if selected:
+            schema = selected
+            row = tuple(intern(values.get(name)) for name in schema)
+        else:
+            schema = pool.schema(tuple(values))
+            row = tuple(intern(value) for value in values.values())
+
+        geometry = feature.get('geometry')
+        wkb, bounds = geojson_to_wkb(geometry) if geometry else (None, None)
+        # Ids are unique per feature, pooling them would only grow the pool
+        records.append(FeatureRecord(feature.get('id'), schema, row, wkb, bounds))
+    return records
+
+
+def load_feature_collection(path):
+    """
+    Read a downloaded GeoJSON FeatureCollection.
+
+    :param path: GeoJSON file
+    :type path: str
+    :return: FeatureCollection
+    :rtype: dict
+    :raises ValueError: If the file is not a GeoJSON FeatureCollection
+    """
+    with open(path, encoding='utf-8') as f:
+        collection = json.load(f)
+    if not isinstance(collection, dict) or 'features' not in collection:
+        # VWorld reports errors (e.g. a wrong key) in the response body
+        raise ValueError(f"Not a GeoJSON FeatureCollection: {path}")
+    return collection
+
+
+def read_feature_records(path, properties=None, pool=None):
+    """
+    Read the features of a downloaded GeoJSON file.
+
+    :param path: GeoJSON file (a tile or page of a WFS response)
+    :type path: str
+    :param properties: Property names to keep (all if not provided)
+    :type properties: list
+    :param pool: String pool to share with other files (new if not provided)
+    :type pool: StringPool
+    :return: Feature records, in file order
+    :rtype: list
+    :raises ValueError: If the file is not a GeoJSON FeatureCollection
+    """
+    collection = load_feature_collection(path)
+    return decode_features(collection['features'] or [], pool or StringPool(), properties)
+
+
+def bounds_intersect(a, b):
+    """
+    Check whether two (xmin, ymin, xmax, ymax) boxes intersect.
+
+    :rtype: bool
+    """
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def bounds_contain(outer, inner):
+    """
+    Check whether a (xmin, ymin, xmax, ymax) box contains another.
+
+    :rtype: bool
+    """
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and inner[2] <= outer[2] and inner[3] <= outer[3])
+
+
+def record_filter(filter):
+    """
+    Get a predicate for a record filter.
+
+    A filter is either a callable taking a FeatureRecord, or a QGIS
+    expression on the properties (and $geometry), evaluated without
+    building a layer.
+
+    :param filter: Callable or QGIS expression (None keeps every record)
+    :type filter: callable or str
+    :return: Predicate, or None to keep every record
+    :rtype: callable or None
+    :raises ValueError: If the expression is invalid
+    """
+    if not filter:
+        return None
+    if callable(filter):
+        return filter
+    return _ExpressionFilter(filter)
+
+
+class _ExpressionFilter:
+    """Evaluates a QGIS expression on feature records."""
+
+    def __init__(self, expression):
+        from qgis.core import QgsExpression, QgsExpressionContext, QgsFeature, QgsFields
+
+        self._expression = QgsExpression(expression)
+        if self._expression.hasParserError():
+            raise ValueError(f"Invalid filter expression: {self._expression.parserErrorString()}")
+        self._needs_geometry = self._expression.needsGeometry()
+        self._context = QgsExpressionContext()
+        self._feature = QgsFeature()
+        self._fields = QgsFields()
+        self._schema = None
+
+    def _set_fields(self, schema):
+        from qgis.core import QgsField
+        from qgis.PyQt.QtCore import QVariant
+
+        # Values keep their own types, the field types only name the columns
+        self._fields.clear()
+        for name in schema:
+            self._fields.append(QgsField(name, QVariant.String))
+        self._feature.setFields(self._fields, True)
+        self._context.setFields(self._fields)
+        self._expression.prepare(self._context)
+        self._schema = schema
+
+    def __call__(self, record):
+        # Schemas are shared tuples, so the fields rarely need rebuilding
+        if record.schema is not self._schema:
+            self._set_fields(record.schema)
+
+        self._feature.setAttributes(list(record.values))
+        if self._needs_geometry:
+            self._feature.setGeometry(wkb_to_geometry(record.wkb))
+        self._context.setFeature(self._feature)
+        return bool(self._expression.evaluate(self._context))
+
+
+def wkb_to_geometry(wkb):
+    """
+    Convert record WKB to a QgsGeometry.
+
+    :param wkb: WKB (None for no geometry)
+    :type wkb: bytes
+    :return: Geometry (null without WKB)
+    :rtype: QgsGeometry
+    """
+    from qgis.core import QgsGeometry
+
+    geometry = QgsGeometry()
+    if wkb:
+        geometry.fromWkb(wkb)
+    return geometry
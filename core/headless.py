@@ -0,0 +1,258 @@
+"""
+Headless API for Quick Vworld Plugin
+
+Downloads VWorld layers to files without the QGIS GUI (no iface), e.g.
+from a standalone script or on a batch node:
+
+    from QuickVworld.core.headless import start_qgis, download
+
+    app = start_qgis()
+    download('lt_c_uq111', 'out.gpkg', bbox=(126.95, 37.56, 127.02, 37.63))
+
+Downloads run as bulk jobs (see jobs.py), so they use the same WFS
+client, tile grid, response cache, request scheduler and quota as the
+plugin, fetch tiles in parallel and resume after an interruption.
+
+Scripts that only compute something over the features can stream them
+instead of writing a file:
+
+    for record in iter_features('lt_c_uq111', (126.95, 37.56, 127.02, 37.63)):
+        ...
+
+or load them as NumPy arrays with download_columnar().
+"""
+
+import hashlib
+import logging
+import os
+import signal
+from qgis.PyQt.QtCore import QEventLoop, QTimer
+from qgis.core import QgsApplication
+
+from .api.scheduler import Priority
+from .api.vworld_client import VworldWFSClient
+from .catalog import init_catalog
+from .columnar import to_columnar
+from .export import OUTPUT_FORMATS
+from .jobs import BulkJobTask, normalize_manifest
+from .tiling import TileGrid
+from .utilities import get_cache_dir
+
+LOGGER = logging.getLogger('QuickVworld')
+
+# Milliseconds between two progress reports (also lets Python handle Ctrl+C)
+POLL_INTERVAL_MS = 200
+
+
+def start_qgis():
+    """
+    Start a QGIS application without GUI, unless one is running already.
+
+    Keep a reference to the returned application for as long as QGIS is
+    used, and call ``exitQgis()`` on it at the end.
+
+    :return: The QGIS application
+    :rtype: QgsApplication
+    """
+    app = QgsApplication.instance()
+    if app is None:
+        app = QgsApplication([], False)
+        app.initQgis()
+    init_catalog()
+    return app
+
+
+def run_job(manifest, progress_callback=None):
+    """
+    Run a bulk download job and wait for it to end.
+
+    Must be called from the thread running the QGIS application (the
+    job's worker tasks need its event loop). Interrupting with Ctrl+C
+    cancels the job; running the same manifest again resumes it.
+
+    :param manifest: Normalized manifest (see jobs.load_manifest)
+    :type manifest: dict
+    :param progress_callback: Called with the progress in percent
+    :type progress_callback: callable
+    :return: (finished, summary) where finished is False if requests or
+        outputs are left for a later run
+    :rtype: tuple
+    :raises ValueError: If the job cannot be planned (e.g. unreadable AOIs)
+    """
+    task = BulkJobTask(manifest)
+    result = {}
+    loop = QEventLoop()
+
+    def on_finished(finished, summary):
+        result.update(finished=finished, summary=summary)
+        loop.quit()
+
+    def on_interrupt(signum, frame):
+        LOGGER.warning(f"Bulk job {manifest['name']} interrupted, canceling")
+        task.cancel()
+
+    last_progress = [None]
+
+    def report_progress():
+        if progress_callback and 'finished' not in result and task.progress() != last_progress[0]:
+            last_progress[0] = task.progress()
+            progress_callback(last_progress[0])
+
+    task.jobFinished.connect(on_finished)
+    timer = QTimer()
+    timer.timeout.connect(report_progress)
+    timer.start(POLL_INTERVAL_MS)
+
+    previous_handler = signal.signal(signal.SIGINT, on_interrupt)
+    try:
+        QgsApplication.taskManager().addTask(task)
+        if 'finished' not in result:
+            loop.exec_()
+    finally:
+        timer.stop()
+        signal.signal(signal.SIGINT, previous_handler)
+
+    if task.plan_task.error:
+        raise ValueError(task.plan_task.error)
+    return result['finished'], result['summary']
+
+
+def download(typename, output_path, bbox=None, aoi_file=None, aoi_where=None,
+             output_format=None, properties=None, expression=None, api_key=None,
+             tile_size=None, workers=None, progress_callback=None):
+    """
+    Download one layer for an area to a file.
+
+    The area is either a bbox in EPSG:4326 or the union of the features
+    of a vector file (optionally selected with an expression); only the
+    features intersecting it are written.
+
+    :param typename: Layer typename
+    :type typename: str
+    :param output_path: Output file (.gpkg or .geojson)
+    :type output_path: str
+    :param bbox: Area (xmin, ymin, xmax, ymax) in EPSG:4326
+    :type bbox: tuple
+    :param aoi_file: Vector file with the area of interest
+    :type aoi_file: str
+    :param aoi_where: Expression selecting AOI features of aoi_file
+    :type aoi_where: str
+    :param output_format: Output format (from the file suffix if not provided)
+    :type output_format: str
+    :param properties: Property names to write (all if not provided)
+    :type properties: list
+    :param expression: QGIS filter expression on the features
+    :type expression: str
+    :param api_key: VWorld API key (uses default if not provided)
+    :type api_key: str
+    :param tile_size: Tile size in degrees (default grid if not provided)
+    :type tile_size: float
+    :param workers: Parallel requests (default if not provided)
+    :type workers: int
+    :param progress_callback: Called with the progress in percent
+    :type progress_callback: callable
+    :return: (finished, summary), see run_job
+    :rtype: tuple
+    :raises ValueError: If the arguments are invalid
+    """
+    if (bbox is None) == (aoi_file is None):
+        raise ValueError("Give either a bbox or an AOI file")
+
+    output_path = os.path.abspath(output_path)
+    if output_format is None:
+        suffix = os.path.splitext(output_path)[1].lower()
+        output_format = next(
+            (name for name, (_driver, format_suffix) in OUTPUT_FORMATS.items() if format_suffix == suffix),
+            None
+        )
+        if output_format is None:
+            raise ValueError(f"Cannot tell the output format of {output_path}, use .gpkg or .geojson")
+
+    if bbox is not None:
+        aoi = {'name': 'bbox', 'bbox': list(bbox)}
+    else:
+        aoi = {'name': 'aoi', 'file': os.path.abspath(aoi_file), 'where': aoi_where}
+
+    # The job database is keyed by the request, so running the same
+    # download again after an interruption resumes it
+    job_key = repr((typename, output_path, bbox, aoi_file, aoi_where, tile_size))
+    database = os.path.join(
+        get_cache_dir('jobs'), hashlib.sha1(job_key.encode('utf-8')).hexdigest() + '.sqlite'
+    )
+
+    manifest = normalize_manifest({
+        'name': f"{typename} -> {os.path.basename(output_path)}",
+        'api_key': api_key,
+        'tile_size': tile_size,
+        'workers': workers,
+        'output': {'directory': os.path.dirname(output_path), 'format': output_format,
+                   'path': output_path.replace('{', '{{').replace('}', '}}')},
+        'database': database,
+        'aois': [aoi],
+        'layers': [{'typename': typename, 'properties': properties, 'filter': expression}],
+    }, os.getcwd())
+
+    finished, summary = run_job(manifest, progress_callback)
+    if finished:
+        for path in (database, database + '-wal', database + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+    return finished, summary
+
+
+def iter_features(typename, extent, filter=None, properties=None, api_key=None, tile_size=None):
+    """
+    Iterate over the features of a layer in an extent, without a layer.
+
+    See VworldWFSClient.iter_features; must be called from the thread
+    running the QGIS application.
+
+    :param typename: Layer typename
+    :type typename: str
+    :param extent: Extent (xmin, ymin, xmax, ymax) in EPSG:4326
+    :type extent: tuple or QgsRectangle
+    :param filter: Callable taking a FeatureRecord, or QGIS expression
+    :type filter: callable or str
+    :param properties: Property names to keep (all if not provided)
+    :type properties: list
+    :param api_key: VWorld API key (uses default if not provided)
+    :type api_key: str
+    :param tile_size: Tile size in degrees (default grid if not provided)
+    :type tile_size: float
+    :return: Feature records
+    :rtype: generator of FeatureRecord
+    """
+    client = VworldWFSClient(api_key)
+    client.set_priority(Priority.INTERACTIVE_OFFSCREEN, job_id=f'script:{id(client)}')
+    grid = TileGrid(tile_size) if tile_size else TileGrid()
+    try:
+        yield from client.iter_features(typename, extent, filter, properties, grid)
+    finally:
+        # Also runs when the caller stops early
+        client.cleanup()
+
+
+def download_columnar(typename, extent, filter=None, properties=None, api_key=None, tile_size=None):
+    """
+    Download the features of a layer in an extent as NumPy arrays.
+
+    The features are streamed into the columns (see iter_features and
+    columnar.to_columnar), so no layer or feature list is built.
+
+    :param typename: Layer typename
+    :type typename: str
+    :param extent: Extent (xmin, ymin, xmax, ymax) in EPSG:4326
+    :type extent: tuple or QgsRectangle
+    :param filter: Callable taking a FeatureRecord, or QGIS expression
+    :type filter: callable or str
+    :param properties: Property columns (every property if not provided)
+    :type properties: list
+    :param api_key: VWorld API key (uses default if not provided)
+    :type api_key: str
+    :param tile_size: Tile size in degrees (default grid if not provided)
+    :type tile_size: float
+    :return: Columnar table
+    :rtype: ColumnarTable
+    :raises ImportError: If NumPy is not installed
+    """
+    return to_columnar(iter_features(typename, extent, filter, properties, api_key, tile_size), properties)
@@ -0,0 +1,940 @@
+"""
+Bulk download jobs for Quick Vworld Plugin
+
+A job is described by a manifest (JSON, or YAML when PyYAML is
+available) listing areas of interest, layers and the output target:
+
+    {
+        "name": "nightly",
+        "output": {"directory": "out", "format": "gpkg", "path": "{aoi}.gpkg"},
+        "aois": [
+            {"name": "종로구", "bbox": [126.95, 37.56, 127.02, 37.63]},
+            {"file": "sig.gpkg", "name_field": "SIG_KOR_NM", "where": "\"SIG_CD\" LIKE '11%'"}
+        ],
+        "layers": [
+            "lt_c_uq111",
+            {"typename": "lt_c_uq112", "properties": ["uname"], "filter": "\"uname\" IS NOT NULL"}
+        ]
+    }
+
+All tile requests are planned up front into a SQLite job database and
+executed by concurrent workers at BULK priority, within the request
+scheduler slots and the daily quota. Every finished request is recorded
+immediately, so an interrupted job (cancel, crash, quota reached)
+continues with the requests that are left when it is started again.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from qgis.PyQt.QtCore import pyqtSignal
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
+    QgsExpression,
+    QgsFeatureRequest,
+    QgsGeometry,
+    QgsProject,
+    QgsRectangle,
+    QgsTask,
+    QgsVectorLayer,
+)
+
+from .api.limits import get_quota_limiter
+from .api.scheduler import Priority
+from .api.vworld_client import VworldWFSClient
+from .cache import get_default_cache
+from .export import OUTPUT_FORMATS, export_tiles
+from .tiling import TileGrid
+from ..definitions.layers import (
+    CRS_WGS84,
+    DEFAULT_TILE_SIZE,
+    MAX_CONCURRENT_REQUESTS,
+    PREFETCH_QUOTA_RESERVE,
+    get_layer_info,
+)
+
+LOGGER = logging.getLogger('QuickVworld')
+
+# Failed attempts after which a request is given up for the current run
+JOB_MAX_ATTEMPTS = 3
+
+# Requests between two progress updates of a worker
+PROGRESS_INTERVAL = 20
+
+# Output file per AOI and layer, relative to the output directory. A
+# GeoPackage holds a table per layer, so one file per AOI is enough.
+DEFAULT_OUTPUT_PATHS = {
+    'gpkg': '{aoi}.gpkg',
+    'geojson': '{aoi}/{typename}.geojson',
+}
+
+JOB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    typename TEXT NOT NULL,
+    col INTEGER NOT NULL,
+    row INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    PRIMARY KEY (typename, col, row)
+);
+-- Serves claim(): pending rows in (attempts, rowid) order without a sort
+DROP INDEX IF EXISTS requests_status;
+CREATE INDEX IF NOT EXISTS requests_claim ON requests (status, attempts);
+CREATE TABLE IF NOT EXISTS outputs (
+    aoi TEXT NOT NULL,
+    typename TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    path TEXT,
+    feature_count INTEGER,
+    error TEXT,
+    PRIMARY KEY (aoi, typename)
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _resolve(path, base_dir):
+    path = os.path.expanduser(path)
+    return path if os.path.isabs(path) else os.path.join(base_dir, path)
+
+
+def _normalize_layer(entry):
+    if isinstance(entry, str):
+        entry = {'typename': entry}
+    typename = (entry.get('typename') or '').strip()
+    if not typename:
+        raise ValueError(f"Layer entry without typename: {entry}")
+    if get_layer_info(typename) is None:
+        LOGGER.warning(f"Typename not in the layer catalog: {typename}")
+
+    expression = entry.get('filter')
+    if expression and QgsExpression(expression).hasParserError():
+        raise ValueError(f"Invalid filter for {typename}: {QgsExpression(expression).parserErrorString()}")
+
+    return {
+        'typename': typename,
+        'properties': list(entry.get('properties') or []),
+        'filter': expression or None,
+    }
+
+
+def normalize_manifest(data, base_dir, default_name='job'):
+    """
+    Validate a manifest and fill in the defaults.
+
+    :param data: Parsed manifest
+    :type data: dict
+    :param base_dir: Directory relative paths are resolved against
+    :type base_dir: str
+    :param default_name: Job name if the manifest has none
+    :type default_name: str
+    :return: Normalized manifest
+    :rtype: dict
+    :raises ValueError: If the manifest is invalid
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Manifest must be a mapping")
+
+    output = data.get('output') or {}
+    output_format = (output.get('format') or 'gpkg').lower()
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format} "
+                         f"(supported: {', '.join(OUTPUT_FORMATS)})")
+    output_dir = _resolve(output.get('directory') or 'output', base_dir)
+    output_path = output.get('path') or DEFAULT_OUTPUT_PATHS[output_format]
+
+    aois = []
+    for entry in data.get('aois') or []:
+        entry = dict(entry)
+        if 'bbox' in entry:
+            if len(entry['bbox']) != 4:
+                raise ValueError(f"AOI bbox must be [xmin, ymin, xmax, ymax]: {entry}")
+        elif 'file' in entry:
+            entry['file'] = _resolve(entry['file'], base_dir)
+        else:
+            raise ValueError(f"AOI needs a bbox or a file: {entry}")
+        if not entry.get('name') and not entry.get('name_field'):
+            raise ValueError(f"AOI needs a name or a name_field: {entry}")
+        aois.append(entry)
+
+    layers = [_normalize_layer(entry) for entry in data.get('layers') or []]
+
+    if not aois:
+        raise ValueError("Manifest lists no AOIs")
+    if not layers:
+        raise ValueError("Manifest lists no layers")
+
+    return {
+        'name': data.get('name') or default_name,
+        'api_key': data.get('api_key'),
+        'tile_size': float(data.get('tile_size') or DEFAULT_TILE_SIZE),
+        'workers': max(int(data.get('workers') or MAX_CONCURRENT_REQUESTS), 1),
+        'max_attempts': max(int(data.get('max_attempts') or JOB_MAX_ATTEMPTS), 1),
+        'output': {'directory': output_dir, 'format': output_format, 'path': output_path},
+        'database': _resolve(data['database'], base_dir) if data.get('database')
+        else os.path.join(output_dir, 'job.sqlite'),
+        'aois': aois,
+        'layers': layers,
+    }
+
+
+def load_manifest(path):
+    """
+    Read a job manifest file.
+
+    :param path: Manifest file (.json, or .yaml/.yml with PyYAML installed)
+    :type path: str
+    :return: Normalized manifest
+    :rtype: dict
+    :raises ValueError: If the manifest cannot be parsed or is invalid
+    :raises OSError: If the file cannot be read
+    """
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+
+    if path.lower().endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("YAML manifests need PyYAML, use a JSON manifest instead")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML manifest: {e}")
+    else:
+        data = json.loads(text)
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    return normalize_manifest(data, os.path.dirname(os.path.abspath(path)), name)
+
+
+def load_aois(entries):
+    """
+    Build the areas of interest of a manifest.
+
+    A bbox entry is one AOI. A file entry is one AOI made of the union
+    of the selected features, or one AOI per distinct value of
+    ``name_field``.
+
+    :param entries: AOI entries of a normalized manifest
+    :type entries: list
+    :return: AOIs as dicts with name and geometry (EPSG:4326)
+    :rtype: list
+    :raises ValueError: If an AOI file cannot be read or names collide
+    """
+    wgs84 = QgsCoordinateReferenceSystem(CRS_WGS84)
+    aois = []
+
+    for entry in entries:
+        if 'bbox' in entry:
+            xmin, ymin, xmax, ymax = (float(value) for value in entry['bbox'])
+            aois.append({'name': entry['name'],
+                         'geometry': QgsGeometry.fromRect(QgsRectangle(xmin, ymin, xmax, ymax))})
+            continue
+
+        layer = QgsVectorLayer(entry['file'], 'aoi', 'ogr')
+        if not layer.isValid():
+            raise ValueError(f"Cannot read AOI file: {entry['file']}")
+
+        transform = QgsCoordinateTransform(layer.crs(), wgs84, QgsProject.instance())
+        request = QgsFeatureRequest()
+        if entry.get('where'):
+            request.setFilterExpression(entry['where'])
+
+        groups = {}
+        for feature in layer.getFeatures(request):
+            geometry = QgsGeometry(feature.geometry())
+            if geometry.isNull():
+                continue
+            geometry.transform(transform)
+            name = str(feature[entry['name_field']]) if entry.get('name_field') else entry['name']
+            groups.setdefault(name, []).append(geometry)
+
+        if not groups:
+            raise ValueError(f"No AOI features selected in {entry['file']}")
+        for name, geometries in groups.items():
+            aois.append({'name': name, 'geometry': QgsGeometry.unaryUnion(geometries)})
+
+    names = [aoi['name'] for aoi in aois]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate AOI names: {', '.join(sorted(duplicates))}")
+    return aois
+
+
+class JobDatabase:
+    """
+    SQLite record of a job's planned requests and outputs.
+
+    Every change is committed immediately, so the database always
+    reflects the work done so far. Safe to use from several threads.
+    """
+
+    def __init__(self, path):
+        """
+        Constructor.
+
+        :param path: Database file
+        :type path: str
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(JOB_SCHEMA)
+        # Requests claimed by a run that was interrupted are waiting again
+        self._conn.execute("UPDATE requests SET status = 'pending' WHERE status = 'running'")
+
+    def get_state(self, key, default=None):
+        """
+        Get a job state value.
+
+        :param key: State key
+        :type key: str
+        :return: Value or default
+        :rtype: str
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_state(self, key, value):
+        """
+        Set a job state value.
+
+        :param key: State key
+        :type key: str
+        :param value: Value
+        :type value: str
+        """
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)', (key, value))
+
+    def plan(self, requests, outputs):
+        """
+        Record the requests and outputs of a run.
+
+        Entries already planned keep their status, so planning an
+        unfinished job resumes it; requests that failed are retried.
+        A job whose last run finished starts over.
+
+        :param requests: (typename, col, row) of every tile request
+        :type requests: iterable
+        :param outputs: (aoi name, typename) of every output
+        :type outputs: iterable
+        :return: True if the job continues an unfinished run
+        :rtype: bool
+        """
+        resumed = self.get_state('status') == 'running'
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                if resumed:
+                    self._conn.execute(
+                        "UPDATE requests SET status = 'pending', attempts = 0 WHERE status = 'failed'")
+                    self._conn.execute("UPDATE outputs SET status = 'pending' WHERE status = 'failed'")
+                else:
+                    self._conn.execute('DELETE FROM requests')
+                    self._conn.execute('DELETE FROM outputs')
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO requests (typename, col, row) VALUES (?, ?, ?)', requests)
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO outputs (aoi, typename) VALUES (?, ?)', outputs)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO state (key, value) VALUES ('status', 'running')")
+                self._conn.execute('COMMIT')
+            except sqlite3.Error:
+                self._conn.execute('ROLLBACK')
+                raise
+        return resumed
+
+    def claim(self):
+        """
+        Take the next pending request.
+
+        :return: (typename, col, row) or None when nothing is left
+        :rtype: tuple or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT typename, col, row FROM requests WHERE status = 'pending' "
+                "ORDER BY attempts, rowid LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE requests SET status = 'running' WHERE typename = ? AND col = ? AND row = ?", row)
+            return row
+
+    def release(self, request):
+        """
+        Put a claimed request back without counting an attempt.
+
+        :param request: (typename, col, row)
+        :type request: tuple
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE requests SET status = 'pending' WHERE typename = ? AND col = ? AND row = ?", request)
+
+    def complete(self, request):
+        """
+        Record a finished request.
+
+        :param request: (typename, col, row)
+        :type request: tuple
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE requests SET status = 'done', error = NULL "
+                "WHERE typename = ? AND col = ? AND row = ?", request)
+
+    def fail(self, request, error, max_attempts):
+        """
+        Record a failed attempt; the request is retried until max_attempts.
+
+        :param request: (typename, col, row)
+        :type request: tuple
+        :param error: Error message
+        :type error: str
+        :param max_attempts: Attempts before the request is given up
+        :type max_attempts: int
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE requests SET attempts = attempts + 1, error = ?, "
+                "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END "
+                "WHERE typename = ? AND col = ? AND row = ?",
+                (error, max_attempts) + tuple(request))
+
+    def request_counts(self):
+        """
+        Count the requests by status.
+
+        :return: Status -> count
+        :rtype: dict
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT status, COUNT(*) FROM requests GROUP BY status').fetchall()
+        return dict(rows)
+
+    def request_status(self, typename, col, row):
+        """
+        Get the status of a request.
+
+        :return: Status or None if not planned
+        :rtype: str or None
+        """
+        with self._lock:
+            result = self._conn.execute(
+                'SELECT status FROM requests WHERE typename = ? AND col = ? AND row = ?',
+                (typename, col, row)).fetchone()
+        return result[0] if result else None
+
+    def pending_outputs(self):
+        """
+        Get the outputs not written yet.
+
+        :return: (aoi name, typename) tuples
+        :rtype: list
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT aoi, typename FROM outputs WHERE status != 'done' ORDER BY rowid").fetchall()
+
+    def complete_output(self, aoi, typename, path, feature_count):
+        """
+        Record a written output.
+
+        :param aoi: AOI name
+        :type aoi: str
+        :param typename: Layer typename
+        :type typename: str
+        :param path: Output file
+        :type path: str
+        :param feature_count: Features written
+        :type feature_count: int
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outputs SET status = 'done', path = ?, feature_count = ?, error = NULL "
+                "WHERE aoi = ? AND typename = ?", (path, feature_count, aoi, typename))
+
+    def fail_output(self, aoi, typename, error):
+        """
+        Record an output that could not be written.
+
+        :param aoi: AOI name
+        :type aoi: str
+        :param typename: Layer typename
+        :type typename: str
+        :param error: Error message
+        :type error: str
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outputs SET status = 'failed', error = ? WHERE aoi = ? AND typename = ?",
+                (error, aoi, typename))
+
+    def output_counts(self):
+        """
+        Count the outputs by status.
+
+        :return: Status -> count
+        :rtype: dict
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT status, COUNT(*) FROM outputs GROUP BY status').fetchall()
+        return dict(rows)
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+
+def tiles_for_geometry(grid, geometry):
+    """
+    Get the tiles touching a geometry (not just its bounding box).
+
+    :param grid: Tile grid
+    :type grid: TileGrid
+    :param geometry: Geometry in EPSG:4326
+    :type geometry: QgsGeometry
+    :return: Tiles (col, row)
+    :rtype: list
+    """
+    engine = QgsGeometry.createGeometryEngine(geometry.constGet())
+    engine.prepareGeometry()
+    return [
+        tile for tile in grid.tiles_for_extent(geometry.boundingBox())
+        if engine.intersects(QgsGeometry.fromRect(QgsRectangle(*grid.tile_bounds(tile))).constGet())
+    ]
+
+
+def fetch_tiles_parallel(requests, grid, cache=None, workers=MAX_CONCURRENT_REQUESTS,
+                         api_key=None, priority=Priority.BULK, job_id=None,
+                         is_canceled=None, progress_callback=None):
+    """
+    Fetch tiles with several worker threads and wait for them.
+
+    Each worker has its own WFS client; the response cache, request
+    scheduler and quota are shared with every other download. Safe to
+    call from any thread except one whose event loop the workers need
+    (use a BulkJobTask from the GUI thread instead).
+
+    :param requests: (typename, (col, row)) tuples
+    :type requests: list
+    :param grid: Tile grid
+    :type grid: TileGrid
+    :param cache: Response cache (shared cache if not provided)
+    :type cache: ResponseCache
+    :param workers: Worker threads
+    :type workers: int
+    :param api_key: VWorld API key (uses default if not provided)
+    :type api_key: str
+    :param priority: Scheduling priority of the requests
+    :type priority: int
+    :param job_id: Job the requests belong to (used for fairness)
+    :type job_id: hashable
+    :param is_canceled: Returns True when fetching should stop
+    :type is_canceled: callable
+    :param progress_callback: Called with (done, total) after each tile
+    :type progress_callback: callable
+    :return: (paths, errors) where paths maps each request to its tile
+        file (None if it failed or was canceled)
+    :rtype: tuple
+    """
+    cache = cache or get_default_cache()
+    pending = list(reversed(requests))
+    paths = dict.fromkeys(requests)
+    errors = []
+    lock = threading.Lock()
+    done = [0]
+
+    def work():
+        client = VworldWFSClient(api_key)
+        client.set_priority(priority, job_id=job_id)
+        try:
+            while not (is_canceled and is_canceled()):
+                with lock:
+                    if not pending:
+                        return
+                    request = pending.pop()
+
+                typename, tile = request
+                client.errors = []
+                path = client.fetch_tile(typename, tile, grid, cache)
+                with lock:
+                    paths[request] = path
+                    if not path:
+                        errors.extend(client.get_errors())
+                    done[0] += 1
+                    count = done[0]
+                if progress_callback:
+                    progress_callback(count, len(requests))
+        finally:
+            client.cleanup()
+
+    threads = [threading.Thread(target=work, name=f'QuickVworld-{index}', daemon=True)
+               for index in range(max(min(workers, len(requests)), 1))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return paths, errors
+
+
+def _file_name(name):
+    # AOI names become file names (Korean names are kept as they are)
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', name).strip('_') or 'aoi'
+
+
+class BulkJob:
+    """
+    Plans and executes a bulk download job.
+
+    plan() must be called first (it reads the AOIs and fills the job
+    database). run_worker() can then be called from several threads at
+    once; write_outputs() merges the tiles once the workers are done.
+    """
+
+    def __init__(self, manifest, cache=None):
+        """
+        Constructor.
+
+        :param manifest: Normalized manifest (see load_manifest)
+        :type manifest: dict
+        :param cache: Response cache (shared cache if not provided)
+        :type cache: ResponseCache
+        """
+        self.manifest = manifest
+        self.name = manifest['name']
+        self.grid = TileGrid(manifest['tile_size'])
+        self.cache = cache or get_default_cache()
+        self.db = JobDatabase(manifest['database'])
+        self.layers = {layer['typename']: layer for layer in manifest['layers']}
+        self.aois = {}
+        self.resumed = False
+        self.quota_exhausted = False
+
+    def tiles_for_aoi(self, aoi):
+        """
+        Get the tiles touching an AOI (not just its bounding box).
+
+        :param aoi: AOI (see load_aois)
+        :type aoi: dict
+        :return: Tiles (col, row)
+        :rtype: list
+        """
+        return tiles_for_geometry(self.grid, aoi['geometry'])
+
+    def plan(self):
+        """
+        Plan all tile requests and outputs into the job database.
+
+        Tiles shared by overlapping AOIs are requested once.
+
+        :return: Number of planned requests
+        :rtype: int
+        """
+        self.aois = {aoi['name']: aoi for aoi in load_aois(self.manifest['aois'])}
+
+        requests = []
+        outputs = []
+        for aoi in self.aois.values():
+            tiles = self.tiles_for_aoi(aoi)
+            for typename in self.layers:
+                requests.extend((typename, col, row) for col, row in tiles)
+                outputs.append((aoi['name'], typename))
+
+        self.resumed = self.db.plan(requests, outputs)
+        counts = self.db.request_counts()
+        total = sum(counts.values())
+        LOGGER.info(f"Bulk job {self.name}: {total} requests for {len(outputs)} outputs "
+                    f"({'resumed, ' + str(counts.get('done', 0)) + ' done' if self.resumed else 'new run'})")
+        return total
+
+    def progress(self):
+        """
+        Get the share of finished requests.
+
+        :return: Progress in percent
+        :rtype: float
+        """
+        counts = self.db.request_counts()
+        total = sum(counts.values())
+        return counts.get('done', 0) * 100.0 / total if total else 100.0
+
+    def run_worker(self, is_canceled=None, progress_callback=None):
+        """
+        Execute pending requests until none are left.
+
+        :param is_canceled: Returns True when the worker should stop
+        :type is_canceled: callable
+        :param progress_callback: Called every PROGRESS_INTERVAL requests
+        :type progress_callback: callable
+        :return: Number of requests completed by this worker
+        :rtype: int
+        """
+        client = VworldWFSClient(self.manifest.get('api_key'))
+        client.set_priority(Priority.BULK, job_id=f'job:{self.name}')
+        limiter = get_quota_limiter()
+        completed = 0
+        attempted = 0
+
+        try:
+            while not (is_canceled and is_canceled()) and not self.quota_exhausted:
+                request = self.db.claim()
+                if request is None:
+                    break
+
+                typename, col, row = request
+                client.errors = []
+                if client.fetch_tile(typename, (col, row), self.grid, self.cache):
+                    self.db.complete(request)
+                    completed += 1
+                elif not limiter.has_remaining(PREFETCH_QUOTA_RESERVE):
+                    # Not the request's fault: keep it for the next run
+                    self.db.release(request)
+                    self.quota_exhausted = True
+                    LOGGER.warning(f"Bulk job {self.name} paused: daily request quota reached")
+                else:
+                    self.db.fail(request, '; '.join(client.get_errors()), self.manifest['max_attempts'])
+
+                attempted += 1
+                if progress_callback and attempted % PROGRESS_INTERVAL == 0:
+                    progress_callback()
+        finally:
+            client.cleanup()
+
+        return completed
+
+    def output_path(self, aoi_name, typename):
+        """
+        Get the output file of an AOI and layer.
+
+        The output path template may use ``{aoi}`` and ``{typename}``
+        (see DEFAULT_OUTPUT_PATHS).
+
+        :return: Output file
+        :rtype: str
+        """
+        output = self.manifest['output']
+        path = output['path'].format(aoi=_file_name(aoi_name), typename=typename)
+        return os.path.join(output['directory'], os.path.expanduser(path))
+
+    def write_outputs(self, is_canceled=None):
+        """
+        Write every output whose tiles are all downloaded.
+
+        :param is_canceled: Returns True when writing should stop
+        :type is_canceled: callable
+        :return: Number of outputs written
+        :rtype: int
+        """
+        client = VworldWFSClient(self.manifest.get('api_key'))
+        client.set_priority(Priority.BULK, job_id=f'job:{self.name}')
+        written = 0
+
+        try:
+            for aoi_name, typename in self.db.pending_outputs():
+                if is_canceled and is_canceled():
+                    break
+
+                aoi = self.aois.get(aoi_name)
+                if aoi is None:
+                    # Removed from the manifest since the job was planned
+                    continue
+
+                tiles = self.tiles_for_aoi(aoi)
+                if any(self.db.request_status(typename, col, row) != 'done' for col, row in tiles):
+                    # Missing tiles are requested again by the next run
+                    continue
+
+                tile_files = []
+                for tile in tiles:
+                    # Downloaded by this job, even if the cache entry expired since
+                    path = (self.cache.get(client.tile_url(typename, tile, self.grid), allow_stale=True)
+                            or client.fetch_tile(typename, tile, self.grid, self.cache))
+                    if not path:
+                        break
+                    tile_files.append(path)
+
+                if len(tile_files) != len(tiles):
+                    self.db.fail_output(aoi_name, typename, '; '.join(client.get_errors()) or 'missing tile')
+                    continue
+
+                path = self.output_path(aoi_name, typename)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                layer = self.layers[typename]
+                count = export_tiles(
+                    tile_files, path, typename, self.manifest['output']['format'],
+                    aoi=aoi['geometry'], expression=layer['filter'], properties=layer['properties']
+                )
+                if count is None:
+                    self.db.fail_output(aoi_name, typename, f"Cannot write {path}")
+                    continue
+
+                self.db.complete_output(aoi_name, typename, path, count)
+                written += 1
+        finally:
+            client.cleanup()
+
+        if self.is_finished():
+            # The next run of this manifest starts over
+            self.db.set_state('status', 'finished')
+        return written
+
+    def is_finished(self):
+        """
+        Check whether every request and output of the job is done.
+
+        :return: True if the job is complete
+        :rtype: bool
+        """
+        requests = self.db.request_counts()
+        outputs = self.db.output_counts()
+        return (set(requests) <= {'done'}) and (set(outputs) <= {'done'})
+
+    def summary(self):
+        """
+        Get a one-line summary of the job state.
+
+        :return: Summary text
+        :rtype: str
+        """
+        requests = self.db.request_counts()
+        outputs = self.db.output_counts()
+        text = (f"요청 {requests.get('done', 0)}/{sum(requests.values())} 완료"
+                f" (실패 {requests.get('failed', 0)}), "
+                f"출력 {outputs.get('done', 0)}/{sum(outputs.values())} 완료")
+        if self.quota_exhausted:
+            text += " - 일일 요청 한도에 도달했습니다. 다시 실행하면 이어서 진행합니다."
+        return text
+
+    def close(self):
+        """Close the job database."""
+        self.db.close()
+
+
+class BulkPlanTask(QgsTask):
+    """
+    Sub task planning the job (reads the AOIs and fills the job database).
+
+    Planning a large job intersects thousands of tiles with the AOIs and
+    inserts a row per request, so it runs before the workers instead of
+    in the main thread.
+    """
+
+    planned = pyqtSignal(int, bool)
+
+    def __init__(self, job):
+        """
+        Constructor.
+
+        :param job: Job to plan
+        :type job: BulkJob
+        """
+        super().__init__(f'Quick Vworld job {job.name} planning', QgsTask.CanCancel | QgsTask.Silent)
+        self.job = job
+        self.total = 0
+        self.error = None
+
+    def run(self):
+        """Plan the job (runs in a worker thread)."""
+        try:
+            self.total = self.job.plan()
+        except (OSError, ValueError, sqlite3.Error) as e:
+            LOGGER.error(f"Cannot plan bulk job {self.job.name}: {e}")
+            self.error = str(e)
+            return False
+        return True
+
+    def finished(self, result):
+        """Report the planned requests (runs in the main thread)."""
+        if result:
+            self.planned.emit(self.total, self.job.resumed)
+
+
+class BulkWorkerTask(QgsTask):
+    """Sub task executing the job's requests (one per worker)."""
+
+    def __init__(self, job, index):
+        """
+        Constructor.
+
+        :param job: Planned job
+        :type job: BulkJob
+        :param index: Worker number
+        :type index: int
+        """
+        super().__init__(f'Quick Vworld job {job.name} #{index}', QgsTask.CanCancel | QgsTask.Silent)
+        self.job = job
+        self.completed = 0
+
+    def run(self):
+        """Execute requests (runs in a worker thread)."""
+        self.completed = self.job.run_worker(
+            self.isCanceled, lambda: self.setProgress(self.job.progress())
+        )
+        return not self.isCanceled()
+
+
+class BulkJobTask(QgsTask):
+    """
+    Runs a bulk download job in the background.
+
+    The job is planned by a first sub task. Its requests are then
+    executed by ``workers`` sub tasks in parallel, and the outputs are
+    written by this task. jobPlanned is emitted with the number of
+    requests and whether an earlier run is resumed.
+    """
+
+    jobPlanned = pyqtSignal(int, bool)
+    jobFinished = pyqtSignal(bool, str)
+
+    def __init__(self, manifest, cache=None):
+        """
+        Constructor.
+
+        :param manifest: Normalized manifest (see load_manifest)
+        :type manifest: dict
+        :param cache: Response cache (shared cache if not provided)
+        :type cache: ResponseCache
+        """
+        super().__init__(f"Quick Vworld job {manifest['name']}", QgsTask.CanCancel)
+        self.job = BulkJob(manifest, cache)
+        self.written = 0
+
+        self.plan_task = BulkPlanTask(self.job)
+        self.plan_task.planned.connect(self.jobPlanned)
+        self.addSubTask(self.plan_task, [], QgsTask.ParentDependsOnSubTask)
+        for index in range(manifest['workers']):
+            self.addSubTask(BulkWorkerTask(self.job, index + 1), [self.plan_task],
+                            QgsTask.ParentDependsOnSubTask)
+
+    def run(self):
+        """Write the outputs (runs after all workers finished)."""
+        self.written = self.job.write_outputs(self.isCanceled)
+        return self.job.is_finished()
+
+    def finished(self, result):
+        """Report the job result (runs in the main thread)."""
+        if self.plan_task.error:
+            summary = f"작업을 계획할 수 없습니다: {self.plan_task.error}"
+        else:
+            summary = self.job.summary()
+        LOGGER.info(f"Bulk job {self.job.name} {'finished' if result else 'stopped'}: {summary}")
+        self.job.close()
+        self.jobFinished.emit(result, summary)
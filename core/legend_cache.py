@@ -0,0 +1,489 @@
+"""
+Legend image cache for Quick Vworld Plugin
+
+범례 이미지를 디스크에 오래 보관하고, 그 위에 QPixmap LRU 캐시를 두어
+범례 다이얼로그가 네트워크 요청 없이 바로 열리도록 합니다.
+"""
+
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from qgis.PyQt.QtCore import QPoint, QRect, Qt, pyqtSignal
+from qgis.PyQt.QtGui import QColor, QImage, QPainter, QPixmap
+from qgis.core import QgsTask
+
+from ..definitions.layers import LEGEND_CACHE_TTL, LEGEND_PIXMAP_CACHE_SIZE
+from .api.legend_client import VworldLegendClient
+from .api.scheduler import Priority
+from .cache import ResponseCache
+from .utilities import get_cache_dir
+
+LOGGER = logging.getLogger('QuickVworld')
+
+# Per-geometry legend types of GetLegendGraphic
+GEOMETRY_LEGEND_TYPES = ('POINT', 'LINE', 'POLYGON')
+
+LEGEND_TYPE_LABELS = {
+    'ALL': '전체',
+    'POINT': '점',
+    'LINE': '선',
+    'POLYGON': '면',
+}
+
+# Atlas layout (pixels)
+ATLAS_SPACING = 8
+ATLAS_LABEL_HEIGHT = 18
+
+
+def compose_legend_images(entries):
+    """
+    Stack legend images vertically into one atlas image.
+
+    Safe to call from worker threads (paints on a QImage).
+
+    :param entries: (layer, legend_type, QImage) tuples, in display order
+    :type entries: list
+    :return: Atlas image and its index, a list of dicts with layer, type
+        and the image rectangle (x, y, width, height) in the atlas
+    :rtype: tuple
+    """
+    width = max((image.width() for _, _, image in entries), default=1)
+    height = sum(ATLAS_LABEL_HEIGHT + image.height() + ATLAS_SPACING
+                 for _, _, image in entries) or 1
+
+    atlas = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    atlas.fill(QColor(255, 255, 255, 0))
+
+    index = []
+    painter = QPainter(atlas)
+    y = 0
+    for layer, legend_type, image in entries:
+        label_rect = QRect(0, y, width, ATLAS_LABEL_HEIGHT)
+        painter.drawText(label_rect, Qt.AlignLeft | Qt.AlignVCenter,
+                         f"{layer} - {LEGEND_TYPE_LABELS.get(legend_type, legend_type)}")
+        y += ATLAS_LABEL_HEIGHT
+
+        painter.drawImage(QPoint(0, y), image)
+        index.append({
+            'layer': layer,
+            'type': legend_type,
+            'rect': [0, y, image.width(), image.height()],
+        })
+        y += image.height() + ATLAS_SPACING
+    painter.end()
+
+    return atlas, index
+
+
+class LegendCache:
+    """
+    Two level legend cache.
+
+    - 디스크: (layer, style, type, format) 키의 해시로 저장, 긴 TTL.
+      만료된 항목은 다시 받아오고, 실패하면 만료된 이미지를 그대로 사용합니다.
+    - 메모리: 최근에 사용한 QPixmap LRU (GUI 스레드 전용).
+    """
+
+    def __init__(self, cache=None, max_pixmaps=LEGEND_PIXMAP_CACHE_SIZE):
+        """
+        Constructor.
+
+        :param cache: Disk cache (plugin legend cache if not provided)
+        :type cache: ResponseCache
+        :param max_pixmaps: Number of pixmaps kept in memory
+        :type max_pixmaps: int
+        """
+        self.cache = cache or ResponseCache(
+            get_cache_dir('legend'), ttl=LEGEND_CACHE_TTL, suffix='.png'
+        )
+        self.max_pixmaps = max_pixmaps
+        self._pixmaps = OrderedDict()
+
+    @staticmethod
+    def key(layer, style=None, legend_type='ALL', image_format='png'):
+        """
+        Get the cache key of a legend image.
+
+        :param layer: Layer name
+        :type layer: str
+        :param style: Style name (defaults to layer name)
+        :type style: str
+        :param legend_type: Legend type (ALL, POINT, LINE, POLYGON)
+        :type legend_type: str
+        :param image_format: Image format
+        :type image_format: str
+        :return: Cache key
+        :rtype: str
+        """
+        return f"legend:{layer}|{style or layer}|{legend_type.upper()}|{image_format}"
+
+    def get_file(self, layer, style=None, legend_type='ALL', priority=Priority.LEGEND):
+        """
+        Get the legend image file, downloading it on a miss.
+
+        Safe to call from worker threads.
+
+        :param layer: Layer name
+        :type layer: str
+        :param style: Style name
+        :type style: str
+        :param legend_type: Legend type
+        :type legend_type: str
+        :param priority: Request priority on a miss
+        :type priority: int
+        :return: Path to the cached image, or None if unavailable
+        :rtype: str or None
+        """
+        key = self.key(layer, style, legend_type)
+
+        cached_path = self.cache.get(key)
+        if cached_path:
+            return cached_path
+
+        client = VworldLegendClient()
+        client.set_priority(priority)
+        # An expired image is revalidated instead of downloaded again
+        client.request_headers = self.cache.conditional_headers(key)
+        file_path = client.fetch_legend(layer, style, legend_type)
+
+        try:
+            if file_path and client.is_not_modified():
+                return self.cache.touch(key, client.get_validators())
+
+            # VWorld answers some errors with HTTP 200 and an XML body
+            if file_path and not QImage(file_path).isNull():
+                return self.cache.put(key, file_path, extra=client.get_validators())
+
+            LOGGER.warning(f"Legend download failed, using stale cache if any: {key}")
+            return self.cache.get(key, allow_stale=True)
+        finally:
+            if file_path and os.path.exists(file_path):
+                os.remove(file_path)
+
+    @staticmethod
+    def atlas_key(layers, legend_types=GEOMETRY_LEGEND_TYPES):
+        """
+        Get the cache key of a legend atlas.
+
+        :param layers: Layer names
+        :type layers: list
+        :param legend_types: Legend types per layer
+        :type legend_types: tuple
+        :return: Cache key
+        :rtype: str
+        """
+        return f"atlas:{','.join(layers)}|{'+'.join(t.upper() for t in legend_types)}|png"
+
+    def get_atlas(self, layers, legend_types=GEOMETRY_LEGEND_TYPES):
+        """
+        Get a cached legend atlas.
+
+        :param layers: Layer names
+        :type layers: list
+        :param legend_types: Legend types per layer
+        :type legend_types: tuple
+        :return: (image path, index) or None on a miss
+        :rtype: tuple or None
+        """
+        key = self.atlas_key(layers, legend_types)
+        file_path = self.cache.get(key)
+        if not file_path:
+            return None
+        meta = self.cache.get_meta(key) or {}
+        return file_path, meta.get('index', [])
+
+    def put_atlas(self, layers, legend_types, image, index):
+        """
+        Store a legend atlas as a single cache entry.
+
+        :param layers: Layer names
+        :type layers: list
+        :param legend_types: Legend types per layer
+        :type legend_types: tuple
+        :param image: Atlas image
+        :type image: QImage
+        :param index: Atlas index (see compose_legend_images)
+        :type index: list
+        :return: Path to the cached atlas image, or None if saving failed
+        :rtype: str or None
+        """
+        handle, tmp_path = tempfile.mkstemp(prefix='quickvworld-atlas-', suffix='.png')
+        os.close(handle)
+        try:
+            if not image.save(tmp_path, 'PNG'):
+                LOGGER.error(f"Failed to save legend atlas: {tmp_path}")
+                return None
+            return self.cache.put(self.atlas_key(layers, legend_types), tmp_path,
+                                  extra={'index': index})
+        finally:
+            os.remove(tmp_path)
+
+    def get_pixmap(self, layer, style=None, legend_type='ALL'):
+        """
+        Get the legend image as a QPixmap (GUI thread only).
+
+        :param layer: Layer name
+        :type layer: str
+        :param style: Style name
+        :type style: str
+        :param legend_type: Legend type
+        :type legend_type: str
+        :return: Legend pixmap, or None if unavailable
+        :rtype: QPixmap or None
+        """
+        key = self.key(layer, style, legend_type)
+
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+
+        file_path = self.get_file(layer, style, legend_type)
+        if not file_path:
+            return None
+
+        pixmap = QPixmap(file_path)
+        if pixmap.isNull():
+            return None
+
+        self.put_pixmap(key, pixmap)
+        return pixmap
+
+    def find_pixmap(self, key):
+        """
+        Look up a pixmap in the in-memory LRU without downloading.
+
+        :param key: Cache key
+        :type key: str
+        :return: Pixmap, or None if not in memory
+        :rtype: QPixmap or None
+        """
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+        return pixmap
+
+    def put_pixmap(self, key, pixmap):
+        """
+        Keep a pixmap in the in-memory LRU.
+
+        :param key: Cache key (see key())
+        :type key: str
+        :param pixmap: Legend pixmap
+        :type pixmap: QPixmap
+        """
+        self._pixmaps[key] = pixmap
+        self._pixmaps.move_to_end(key)
+        while len(self._pixmaps) > self.max_pixmaps:
+            self._pixmaps.popitem(last=False)
+
+
+class LegendImageTask(QgsTask):
+    """
+    Fetches and decodes a legend image off the GUI thread.
+
+    The image is downscaled to fit the given size (in device pixels)
+    before it is handed back, so the GUI thread only converts it to
+    a QPixmap.
+    """
+
+    imageReady = pyqtSignal(QImage)
+    imageFailed = pyqtSignal()
+
+    def __init__(self, legend_cache, layer, style=None, legend_type='ALL', max_size=None):
+        """
+        Constructor.
+
+        :param legend_cache: Legend cache
+        :type legend_cache: LegendCache
+        :param layer: Layer name
+        :type layer: str
+        :param style: Style name
+        :type style: str
+        :param legend_type: Legend type
+        :type legend_type: str
+        :param max_size: Maximum image size in device pixels (no scaling if None)
+        :type max_size: QSize
+        """
+        super().__init__(f'Quick Vworld legend: {layer}', QgsTask.CanCancel | QgsTask.Silent)
+        self.legend_cache = legend_cache
+        self.layer = layer
+        self.style = style
+        self.legend_type = legend_type
+        self.max_size = max_size
+        self.image = None
+
+    def run(self):
+        """Download and decode the image (runs in a worker thread)."""
+        file_path = self.legend_cache.get_file(self.layer, self.style, self.legend_type)
+        if not file_path or self.isCanceled():
+            return False
+
+        image = QImage(file_path)
+        if image.isNull():
+            return False
+
+        # Only shrink, small legends stay pixel exact
+        if self.max_size and (image.width() > self.max_size.width()
+                              or image.height() > self.max_size.height()):
+            image = image.scaled(self.max_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+        self.image = image
+        return not self.isCanceled()
+
+    def finished(self, result):
+        """Hand the image to the GUI (runs in the main thread)."""
+        if result and self.image is not None:
+            self.imageReady.emit(self.image)
+        elif not self.isCanceled():
+            self.imageFailed.emit()
+
+
+class LegendFileTask(QgsTask):
+    """Sub task fetching one legend image into the disk cache."""
+
+    def __init__(self, legend_cache, layer, legend_type):
+        """
+        Constructor.
+
+        :param legend_cache: Legend cache
+        :type legend_cache: LegendCache
+        :param layer: Layer name
+        :type layer: str
+        :param legend_type: Legend type
+        :type legend_type: str
+        """
+        super().__init__(f'Quick Vworld legend: {layer} {legend_type}', QgsTask.CanCancel | QgsTask.Silent)
+        self.legend_cache = legend_cache
+        self.layer = layer
+        self.legend_type = legend_type
+        self.file_path = None
+
+    def run(self):
+        """Fetch the legend (runs in a worker thread)."""
+        self.file_path = self.legend_cache.get_file(self.layer, legend_type=self.legend_type)
+        # A missing per-geometry legend is not an error for the atlas
+        return True
+
+
+class LegendAtlasTask(QgsTask):
+    """
+    Fetches the per-geometry legends of many layers in parallel and
+    composes them into one atlas image.
+
+    Each (layer, type) legend is a sub task, so the task manager runs
+    them concurrently within the scheduler's legend slots. The atlas is
+    cached as a single unit together with its index.
+    """
+
+    atlasReady = pyqtSignal(QImage, list)
+    atlasFailed = pyqtSignal()
+
+    def __init__(self, legend_cache, layers, legend_types=GEOMETRY_LEGEND_TYPES):
+        """
+        Constructor.
+
+        :param legend_cache: Legend cache
+        :type legend_cache: LegendCache
+        :param layers: Layer names
+        :type layers: list
+        :param legend_types: Legend types per layer
+        :type legend_types: tuple
+        """
+        super().__init__('Quick Vworld legend atlas', QgsTask.CanCancel | QgsTask.Silent)
+        self.legend_cache = legend_cache
+        self.layers = list(layers)
+        self.legend_types = tuple(legend_types)
+        self.image = None
+        self.index = []
+
+        self._sub_tasks = []
+        if legend_cache.get_atlas(self.layers, self.legend_types):
+            return
+
+        for layer in self.layers:
+            for legend_type in self.legend_types:
+                sub_task = LegendFileTask(legend_cache, layer, legend_type)
+                self._sub_tasks.append(sub_task)
+                self.addSubTask(sub_task, [], QgsTask.ParentDependsOnSubTask)
+
+    def run(self):
+        """Compose the atlas (runs after all sub tasks finished)."""
+        cached = self.legend_cache.get_atlas(self.layers, self.legend_types)
+        if cached:
+            file_path, self.index = cached
+            self.image = QImage(file_path)
+            return not self.image.isNull()
+
+        entries = []
+        for sub_task in self._sub_tasks:
+            if self.isCanceled():
+                return False
+            if not sub_task.file_path:
+                continue
+            image = QImage(sub_task.file_path)
+            if not image.isNull():
+                entries.append((sub_task.layer, sub_task.legend_type, image))
+
+        if not entries:
+            return False
+
+        self.image, self.index = compose_legend_images(entries)
+        self.legend_cache.put_atlas(self.layers, self.legend_types, self.image, self.index)
+        return True
+
+    def finished(self, result):
+        """Hand the atlas to the GUI (runs in the main thread)."""
+        if result and self.image is not None:
+            self.atlasReady.emit(self.image, self.index)
+        elif not self.isCanceled():
+            self.atlasFailed.emit()
+
+
+class LegendWarmupTask(QgsTask):
+    """Background task filling the disk cache with legend images."""
+
+    def __init__(self, legend_cache, layers):
+        """
+        Constructor.
+
+        :param legend_cache: Legend cache to fill
+        :type legend_cache: LegendCache
+        :param layers: Layer names
+        :type layers: list
+        """
+        super().__init__('Quick Vworld legend warm-up', QgsTask.CanCancel | QgsTask.Silent)
+        self.legend_cache = legend_cache
+        self.layers = list(layers)
+        self.loaded = 0
+
+    def run(self):
+        """Download missing legends (runs in a worker thread)."""
+        for index, layer in enumerate(self.layers):
+            if self.isCanceled():
+                return False
+            if self.legend_cache.get_file(layer, priority=Priority.BULK):
+                self.loaded += 1
+            self.setProgress((index + 1) * 100.0 / len(self.layers))
+        return True
+
+    def finished(self, result):
+        """Log the task result (runs in the main thread)."""
+        LOGGER.info(f"Legend warm-up finished: {self.loaded}/{len(self.layers)} legends cached")
+
+
+_legend_cache = None
+
+
+def get_legend_cache():
+    """
+    Get the shared legend cache.
+
+    :return: Legend cache
+    :rtype: LegendCache
+    """
+    global _legend_cache
+    if _legend_cache is None:
+        _legend_cache = LegendCache()
+    return _legend_cache
@@ -0,0 +1,240 @@
+"""
+Predictive tile prefetch for Quick Vworld Plugin
+
+This module watches the map canvas and, while the user pans, downloads
+the grid tiles lying ahead in the pan direction into the response cache.
+The next download of that area is then served from the cache.
+"""
+
+import logging
+from qgis.PyQt.QtCore import QObject, QTimer
+from qgis.core import QgsApplication, QgsTask
+
+from ..definitions.layers import PREFETCH_DELAY_MS, PREFETCH_MAX_TILES
+from .api.scheduler import Priority
+from .api.vworld_client import VworldWFSClient
+from .cache import get_default_cache
+from .processor import VworldDataProcessor
+from .tiling import TileGrid, extent_to_tuple
+
+LOGGER = logging.getLogger('QuickVworld')
+
+# Minimum pan, as a fraction of the extent size, treated as a direction
+PAN_THRESHOLD = 0.1
+
+# Relative size change above which an extent change is treated as a zoom
+ZOOM_THRESHOLD = 0.05
+
+
+def pan_direction(previous, current):
+    """
+    Estimate the pan direction between two extents.
+
+    :param previous: Previous extent (xmin, ymin, xmax, ymax)
+    :type previous: tuple
+    :param current: Current extent (xmin, ymin, xmax, ymax)
+    :type current: tuple
+    :return: Direction (dx, dy) with components -1, 0 or 1,
+        or None if the change was not a pan
+    :rtype: tuple or None
+    """
+    prev_w, prev_h = previous[2] - previous[0], previous[3] - previous[1]
+    width, height = current[2] - current[0], current[3] - current[1]
+
+    if width <= 0 or height <= 0 or prev_w <= 0:
+        return None
+
+    # Zooming changes the extent size, panning keeps it
+    if abs(width - prev_w) / prev_w > ZOOM_THRESHOLD:
+        return None
+
+    shift_x = ((current[0] + current[2]) - (previous[0] + previous[2])) / 2
+    shift_y = ((current[1] + current[3]) - (previous[1] + previous[3])) / 2
+
+    dx = 0 if abs(shift_x) < width * PAN_THRESHOLD else (1 if shift_x > 0 else -1)
+    dy = 0 if abs(shift_y) < height * PAN_THRESHOLD else (1 if shift_y > 0 else -1)
+
+    if dx == 0 and dy == 0:
+        return None
+    return dx, dy
+
+
+class PrefetchTask(QgsTask):
+    """Background task downloading tiles into the response cache."""
+
+    def __init__(self, typenames, tiles, grid, cache):
+        """
+        Constructor.
+
+        :param typenames: Layer typenames to prefetch
+        :type typenames: list
+        :param tiles: Tiles (col, row) to prefetch
+        :type tiles: list
+        :param grid: Tile grid
+        :type grid: TileGrid
+        :param cache: Response cache
+        :type cache: ResponseCache
+        """
+        super().__init__('Quick Vworld prefetch', QgsTask.CanCancel | QgsTask.Silent)
+        self.typenames = list(typenames)
+        self.tiles = list(tiles)
+        self.grid = grid
+        self.cache = cache
+        self.fetched = 0
+
+    def run(self):
+        """Download the tiles (runs in a worker thread)."""
+        client = VworldWFSClient()
+        client.set_priority(Priority.PREFETCH, job_id='prefetch')
+        total = len(self.typenames) * len(self.tiles)
+        done = 0
+
+        for typename in self.typenames:
+            for tile in self.tiles:
+                if self.isCanceled():
+                    return False
+
+                if not self.cache.contains(client.tile_url(typename, tile, self.grid)):
+                    if client.fetch_tile(typename, tile, self.grid, self.cache):
+                        self.fetched += 1
+                    elif client.has_errors():
+                        # Preempted or quota reserve reached: stay out of the way
+                        LOGGER.debug(f"Prefetch stopped: {client.get_errors()}")
+                        return True
+
+                done += 1
+                self.setProgress(done * 100.0 / total)
+
+        return True
+
+    def finished(self, result):
+        """Log the task result (runs in the main thread)."""
+        LOGGER.info(f"Prefetch finished: {self.fetched} new tiles cached")
+
+
+class TilePrefetcher(QObject):
+    """
+    Canvas-aware prefetcher.
+
+    Listens to mapCanvas extentsChanged, extrapolates the pan direction
+    and queues the adjacent tiles for the selected VWorld layers.
+    """
+
+    def __init__(self, iface, grid=None, cache=None, parent=None):
+        """
+        Constructor.
+
+        :param iface: QGIS interface
+        :type iface: QgsInterface
+        :param grid: Tile grid (default grid if not provided)
+        :type grid: TileGrid
+        :param cache: Response cache (shared cache if not provided)
+        :type cache: ResponseCache
+        :param parent: Parent object
+        :type parent: QObject
+        """
+        super().__init__(parent)
+
+        self.iface = iface
+        self.grid = grid or TileGrid()
+        self.cache = cache or get_default_cache()
+        self.processor = VworldDataProcessor(iface)
+        self.typenames = []
+
+        self._enabled = False
+        self._previous_extent = None
+        self._task = None
+
+        # Debounce bursts of extent changes while the user drags the map
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(PREFETCH_DELAY_MS)
+        self._timer.timeout.connect(self._prefetch)
+
+    def is_enabled(self):
+        """
+        Check whether the prefetcher is listening to the canvas.
+
+        :return: True if enabled
+        :rtype: bool
+        """
+        return self._enabled
+
+    def set_enabled(self, enabled):
+        """
+        Start or stop listening to the canvas.
+
+        :param enabled: Enable prefetch
+        :type enabled: bool
+        """
+        if enabled == self._enabled:
+            return
+
+        canvas = self.iface.mapCanvas()
+        if enabled:
+            canvas.extentsChanged.connect(self._on_extents_changed)
+            self._previous_extent = None
+        else:
+            canvas.extentsChanged.disconnect(self._on_extents_changed)
+            self._timer.stop()
+            self.cancel()
+
+        self._enabled = enabled
+        LOGGER.info(f"Tile prefetch {'enabled' if enabled else 'disabled'}")
+
+    def set_typenames(self, typenames):
+        """
+        Set the VWorld layers to prefetch.
+
+        :param typenames: Layer typenames
+        :type typenames: list
+        """
+        self.typenames = list(typenames)
+
+    def cancel(self):
+        """Cancel the running prefetch task, if any."""
+        if self._task is not None:
+            try:
+                self._task.cancel()
+            except RuntimeError:
+                # Task already deleted by the task manager
+                pass
+            self._task = None
+
+    def _on_extents_changed(self):
+        self._timer.start()
+
+    def _prefetch(self):
+        if not self.typenames:
+            return
+
+        current = extent_to_tuple(self.processor.get_canvas_extent())
+        previous, self._previous_extent = self._previous_extent, current
+        if previous is None:
+            return
+
+        direction = pan_direction(previous, current)
+        if direction is None:
+            return
+
+        dx, dy = direction
+        width, height = current[2] - current[0], current[3] - current[1]
+        predicted = (current[0] + dx * width, current[1] + dy * height,
+                     current[2] + dx * width, current[3] + dy * height)
+
+        visible = set(self.grid.tiles_for_extent(current))
+        tiles = [tile for tile in self.grid.tiles_for_extent(predicted) if tile not in visible]
+
+        # Closest tiles first, so a partial prefetch covers the next pan step
+        center = self.grid.tile_at((current[0] + current[2]) / 2, (current[1] + current[3]) / 2)
+        tiles.sort(key=lambda t: abs(t[0] - center[0]) + abs(t[1] - center[1]))
+        tiles = tiles[:PREFETCH_MAX_TILES]
+
+        if not tiles:
+            return
+
+        # A new pan supersedes the previous prediction
+        self.cancel()
+        self._task = PrefetchTask(self.typenames, tiles, self.grid, self.cache)
+        QgsApplication.taskManager().addTask(self._task)
+        LOGGER.debug(f"Prefetching {len(tiles)} tiles towards {direction}")
@@ -5,22 +5,89 @@ This module handles data processing, coordinate transformation,
 and layer creation from downloaded WFS data.
 """
 
+import json
 import logging
+import os
+import time
+import uuid
 from qgis.core import (
     QgsVectorLayer,
     QgsProject,
     QgsCoordinateReferenceSystem,
     QgsCoordinateTransform,
     QgsRectangle,
+    QgsPointXY,
     QgsLayerMetadata,
     QgsMessageLog,
+    QgsFeature,
+    QgsFeatureRequest,
+    QgsFeatureSource,
+    QgsVectorDataProvider,
+    QgsVectorFileWriter,
+    QgsWkbTypes,
     Qgis
 )
 
 from ..definitions.layers import CRS_WGS84, get_layer_info
+from .cache import ResponseCache
+from .utilities import get_cache_dir
 
 LOGGER = logging.getLogger('QuickVworld')
 
+# Number of features handed to the data provider at once
+APPEND_BATCH_SIZE = 500
+
+# Minimum time between two canvas repaints while tiles arrive (seconds)
+REPAINT_INTERVAL = 1.0
+
+# Layer property holding the VWorld typename of downloaded layers
+TYPENAME_PROPERTY = 'quick_vworld/typename'
+
+# Field holding the VWorld feature id (exposed by OGR from the GeoJSON id)
+FEATURE_ID_FIELD = 'id'
+
+# Layer property mapping the tiles loaded into it ("col,row") to their content hash
+TILE_HASHES_PROPERTY = 'quick_vworld/tile_hashes'
+
+# QObject property marking layers whose edits are followed (see watch_layer_edits)
+EDITS_WATCHED_PROPERTY = 'quickVworldEditsWatched'
+
+
+def watch_layer_edits(layer):
+    """
+    Forget the tile hashes of a downloaded layer when edits are committed.
+
+    Unchanged tiles are only skipped while the layer still holds what was
+    downloaded; after the user deleted or edited features, downloading
+    the same tiles again must restore them.
+
+    :param layer: Downloaded layer
+    :type layer: QgsVectorLayer
+    """
+    if layer.property(EDITS_WATCHED_PROPERTY):
+        return
+    layer.setProperty(EDITS_WATCHED_PROPERTY, True)
+    layer.afterCommitChanges.connect(lambda: layer.removeCustomProperty(TILE_HASHES_PROPERTY))
+
+
+def read_tile_hashes(layer):
+    """
+    Get the content hashes of the tiles loaded into a layer.
+
+    :param layer: Downloaded layer
+    :type layer: QgsVectorLayer
+    :return: "col,row" -> content hash (empty for edited layers)
+    :rtype: dict
+    """
+    if layer.isModified():
+        return {}
+    try:
+        hashes = json.loads(layer.customProperty(TILE_HASHES_PROPERTY) or '{}')
+    except ValueError:
+        return {}
+    # Older versions stored a plain list of hashes, which cannot be pruned
+    return hashes if isinstance(hashes, dict) else {}
+
 
 class ExtentType:
     """Extent selection types."""
@@ -29,6 +96,81 @@ class ExtentType:
     LAYER_SELECTED = 'layer_selected'
 
 
+class TransformCache:
+    """
+    Cache of QgsCoordinateTransform objects.
+
+    Setting up a PROJ pipeline is expensive, so transforms are built once
+    per (source CRS, destination CRS, project transform context) and
+    reused. The cache is cleared when the project CRS or its transform
+    context changes.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self._transforms = {}
+        self._crs = {}
+        self._generation = 0
+        self._project = None
+
+    def _connect(self, project):
+        if self._project is project:
+            return
+        self._project = project
+        project.crsChanged.connect(self.invalidate)
+        project.transformContextChanged.connect(self.invalidate)
+        project.cleared.connect(self.invalidate)
+
+    def crs(self, authid):
+        """
+        Get a (cached) CRS by its authority id.
+
+        :param authid: Authority id (e.g. 'EPSG:4326')
+        :type authid: str
+        :return: Coordinate reference system
+        :rtype: QgsCoordinateReferenceSystem
+        """
+        crs = self._crs.get(authid)
+        if crs is None:
+            crs = self._crs[authid] = QgsCoordinateReferenceSystem(authid)
+        return crs
+
+    def get(self, src_crs, dst_crs=None):
+        """
+        Get a transform between two CRS.
+
+        :param src_crs: Source CRS
+        :type src_crs: QgsCoordinateReferenceSystem
+        :param dst_crs: Destination CRS (WGS84 if not provided)
+        :type dst_crs: QgsCoordinateReferenceSystem
+        :return: Coordinate transform
+        :rtype: QgsCoordinateTransform
+        """
+        project = QgsProject.instance()
+        self._connect(project)
+
+        dst_crs = dst_crs or self.crs(CRS_WGS84)
+        # Custom CRS have no authid, their WKT identifies them
+        key = (src_crs.authid() or src_crs.toWkt(),
+               dst_crs.authid() or dst_crs.toWkt(),
+               self._generation)
+
+        transform = self._transforms.get(key)
+        if transform is None:
+            transform = QgsCoordinateTransform(src_crs, dst_crs, project)
+            self._transforms[key] = transform
+            LOGGER.debug(f"Created coordinate transform: {key[0]} -> {key[1]}")
+        return transform
+
+    def invalidate(self):
+        """Drop all cached transforms."""
+        self._transforms.clear()
+        self._generation += 1
+
+
+_transform_cache = TransformCache()
+
+
 class VworldDataProcessor:
     """
     Processor for VWorld WFS data.
@@ -37,22 +179,83 @@ class VworldDataProcessor:
     and layer creation.
     """
 
-    def __init__(self, iface):
+    def __init__(self, iface=None):
         """
         Constructor.
         
-        :param iface: QGIS interface
+        :param iface: QGIS interface (None when running without the GUI)
         :type iface: QgsInterface
         """
         self.iface = iface
+        self.transforms = _transform_cache
+
+    def push_message(self, message, level=Qgis.Info, duration=5):
+        """
+        Show a message in the message bar, or the message log without GUI.
+        
+        :param message: Message text
+        :type message: str
+        :param level: Message level
+        :type level: Qgis.MessageLevel
+        :param duration: Seconds the message stays in the message bar
+        :type duration: int
+        """
+        if self.iface is None:
+            QgsMessageLog.logMessage(message, 'QuickVworld', level)
+            return
+        self.iface.messageBar().pushMessage("Quick Vworld", message, level=level, duration=duration)
+
+    def transform_extents(self, extents, src_crs, dst_crs=None):
+        """
+        Transform many rectangles with a single transform.
+        
+        :param extents: Rectangles to transform
+        :type extents: list
+        :param src_crs: CRS of the rectangles
+        :type src_crs: QgsCoordinateReferenceSystem
+        :param dst_crs: Target CRS (WGS84 if not provided)
+        :type dst_crs: QgsCoordinateReferenceSystem
+        :return: Transformed bounding boxes
+        :rtype: list
+        """
+        dst_crs = dst_crs or self.transforms.crs(CRS_WGS84)
+        if src_crs == dst_crs:
+            return [QgsRectangle(extent) for extent in extents]
+        
+        transform = self.transforms.get(src_crs, dst_crs)
+        return [transform.transformBoundingBox(extent) for extent in extents]
+
+    def transform_points(self, points, src_crs, dst_crs=None):
+        """
+        Transform many points with a single transform.
+        
+        :param points: Points to transform
+        :type points: list
+        :param src_crs: CRS of the points
+        :type src_crs: QgsCoordinateReferenceSystem
+        :param dst_crs: Target CRS (WGS84 if not provided)
+        :type dst_crs: QgsCoordinateReferenceSystem
+        :return: Transformed points
+        :rtype: list
+        """
+        dst_crs = dst_crs or self.transforms.crs(CRS_WGS84)
+        if src_crs == dst_crs:
+            return [QgsPointXY(point) for point in points]
+        
+        transform = self.transforms.get(src_crs, dst_crs)
+        return [transform.transform(point) for point in points]
 
     def get_canvas_extent(self):
         """
         Get the current map canvas extent.
         
-        :return: Canvas extent in WGS84 (EPSG:4326)
-        :rtype: QgsRectangle
+        :return: Canvas extent in WGS84 (EPSG:4326), None without GUI
+        :rtype: QgsRectangle or None
         """
+        if self.iface is None:
+            LOGGER.error("No map canvas when running without the GUI")
+            return None
+        
         canvas = self.iface.mapCanvas()
         extent = canvas.extent()
         
@@ -61,12 +264,7 @@ class VworldDataProcessor:
         
         # Transform to WGS84 if needed
         if canvas_crs.authid() != CRS_WGS84:
-            wgs84_crs = QgsCoordinateReferenceSystem(CRS_WGS84)
-            transform = QgsCoordinateTransform(
-                canvas_crs,
-                wgs84_crs,
-                QgsProject.instance()
-            )
+            transform = self.transforms.get(canvas_crs)
             extent = transform.transformBoundingBox(extent)
         
         LOGGER.info(f"Canvas extent (WGS84): {extent.toString()}")
@@ -100,12 +298,7 @@ class VworldDataProcessor:
         
         # Transform to WGS84 if needed
         if layer_crs.authid() != CRS_WGS84:
-            wgs84_crs = QgsCoordinateReferenceSystem(CRS_WGS84)
-            transform = QgsCoordinateTransform(
-                layer_crs,
-                wgs84_crs,
-                QgsProject.instance()
-            )
+            transform = self.transforms.get(layer_crs)
             extent = transform.transformBoundingBox(extent)
         
         LOGGER.info(f"Layer extent (WGS84): {extent.toString()}")
@@ -136,6 +329,14 @@ class VworldDataProcessor:
         # Set encoding
         layer.setProviderEncoding('UTF-8')
         
+        # GeoJSON cannot carry a spatial index, GeoPackage has an R-tree
+        if data_file.lower().endswith(('.geojson', '.json')):
+            gpkg_layer = self._convert_to_geopackage(layer, layer_name, typename)
+            if gpkg_layer:
+                layer = gpkg_layer
+        
+        self.ensure_spatial_index(layer)
+        
         # Add metadata
         self._add_metadata(layer, typename)
         
@@ -145,6 +346,68 @@ class VworldDataProcessor:
         
         return layer
 
+    def _convert_to_geopackage(self, layer, layer_name, typename):
+        """
+        Copy a layer into a GeoPackage next to its source file.
+        
+        :param layer: Source layer
+        :type layer: QgsVectorLayer
+        :param layer_name: Name for the new layer
+        :type layer_name: str
+        :param typename: VWorld layer typename (GeoPackage table name)
+        :type typename: str
+        :return: GeoPackage layer, or None if the conversion failed
+        :rtype: QgsVectorLayer or None
+        """
+        gpkg_path = os.path.splitext(layer.source().split('|')[0])[0] + '.gpkg'
+        
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = 'GPKG'
+        options.fileEncoding = 'UTF-8'
+        options.layerName = typename
+        
+        result = QgsVectorFileWriter.writeAsVectorFormatV3(
+            layer, gpkg_path, QgsProject.instance().transformContext(), options
+        )
+        error, message = result[0], result[1]
+        
+        if error != QgsVectorFileWriter.NoError:
+            LOGGER.warning(f"GeoPackage conversion failed, keeping GeoJSON: {message}")
+            return None
+        
+        gpkg_layer = QgsVectorLayer(f"{gpkg_path}|layername={typename}", layer_name, "ogr")
+        if not gpkg_layer.isValid():
+            LOGGER.warning(f"Converted GeoPackage is not a valid layer: {gpkg_path}")
+            return None
+        
+        LOGGER.info(f"Converted to GeoPackage with R-tree index: {gpkg_path}")
+        return gpkg_layer
+
+    def ensure_spatial_index(self, layer):
+        """
+        Make sure a layer's data source has a spatial index.
+        
+        File based providers build an R-tree or a sidecar index,
+        the memory provider builds an in-memory QgsSpatialIndex.
+        
+        :param layer: Vector layer
+        :type layer: QgsVectorLayer
+        :return: True if the layer is indexed
+        :rtype: bool
+        """
+        provider = layer.dataProvider()
+        
+        if provider.hasSpatialIndex() == QgsFeatureSource.SpatialIndexPresent:
+            return True
+        
+        if not provider.capabilities() & QgsVectorDataProvider.CreateSpatialIndex:
+            LOGGER.warning(f"Provider cannot create a spatial index: {layer.name()}")
+            return False
+        
+        created = provider.createSpatialIndex()
+        LOGGER.info(f"Spatial index {'created' if created else 'failed'}: {layer.name()}")
+        return created
+
     def _add_metadata(self, layer, typename):
         """
         Add metadata to the layer.
@@ -177,6 +440,33 @@ class VworldDataProcessor:
         metadata.setKeywords({'keywords': keywords})
         
         layer.setMetadata(metadata)
+        layer.setCustomProperty(TYPENAME_PROPERTY, typename)
+
+    def find_vworld_layer(self, typename):
+        """
+        Find a project layer previously downloaded for a typename.
+        
+        Only layers whose provider can add and change features are
+        returned, so the result can be used as an upsert target.
+        
+        :param typename: VWorld layer typename
+        :type typename: str
+        :return: Matching layer or None
+        :rtype: QgsVectorLayer or None
+        """
+        required = (QgsVectorDataProvider.AddFeatures
+                    | QgsVectorDataProvider.ChangeAttributeValues
+                    | QgsVectorDataProvider.ChangeGeometries)
+        
+        for layer in QgsProject.instance().mapLayers().values():
+            if not isinstance(layer, QgsVectorLayer) or not layer.isValid():
+                continue
+            if layer.customProperty(TYPENAME_PROPERTY) != typename:
+                continue
+            if layer.dataProvider().capabilities() & required == required:
+                return layer
+        
+        return None
 
     def add_layer_to_project(self, layer, add_to_legend=True):
         """
@@ -199,15 +489,28 @@ class VworldDataProcessor:
         LOGGER.info(f"Layer added to project: {layer.name()}")
         
         # Show message in QGIS message bar
-        self.iface.messageBar().pushMessage(
-            "Quick Vworld",
+        self.push_message(
             f"레이어가 추가되었습니다: {layer.name()} ({layer.featureCount()} features)",
-            level=Qgis.Success,
-            duration=5
+            level=Qgis.Success
         )
         
         return True
 
+    def create_progressive_loader(self, layer_name, typename, target_layer=None):
+        """
+        Create a loader that adds features to the map as tiles arrive.
+        
+        :param layer_name: Name for the layer
+        :type layer_name: str
+        :param typename: VWorld layer typename
+        :type typename: str
+        :param target_layer: Existing layer to upsert into (optional)
+        :type target_layer: QgsVectorLayer
+        :return: Progressive loader
+        :rtype: ProgressiveLayerLoader
+        """
+        return ProgressiveLayerLoader(self, layer_name, typename, target_layer)
+
     def process_and_load(self, data_file, layer_name, typename):
         """
         Complete workflow: create layer and add to project.
@@ -240,8 +543,7 @@ class VworldDataProcessor:
             LOGGER.exception(f"Error processing and loading data: {e}")
             
             # Show error message
-            self.iface.messageBar().pushMessage(
-                "Quick Vworld",
+            self.push_message(
                 f"레이어 생성 중 오류 발생: {str(e)}",
                 level=Qgis.Critical,
                 duration=10
@@ -250,6 +552,278 @@ class VworldDataProcessor:
             return None
 
 
+class ProgressiveLayerLoader:
+    """
+    Builds a layer tile by tile while a multi-tile download runs.
+
+    The layer (a GeoPackage with an R-tree index in the plugin's layers
+    directory, so it is kept with the project) is created and added to
+    the project as soon as the first tile with features has been parsed.
+    Later tiles are appended in batches through the data provider and
+    the canvas is repainted at throttled intervals, so features appear
+    after the first round trip.
+
+    When a target layer is given, features are upserted into it instead:
+    features whose VWorld id is already present are updated in place,
+    the others are inserted. Only the columns received from VWorld are
+    updated (columns added by the user and the primary key are kept),
+    and geometries are converted to the layer's geometry type. Writes
+    go to the data provider, so the target must not be in edit mode.
+    """
+
+    def __init__(self, processor, layer_name, typename, target_layer=None,
+                 batch_size=APPEND_BATCH_SIZE, repaint_interval=REPAINT_INTERVAL):
+        """
+        Constructor.
+
+        :param processor: Data processor used for metadata and messages
+        :type processor: VworldDataProcessor
+        :param layer_name: Name for the new layer
+        :type layer_name: str
+        :param typename: VWorld layer typename
+        :type typename: str
+        :param target_layer: Existing layer to upsert into (optional)
+        :type target_layer: QgsVectorLayer
+        :param batch_size: Features per data provider call
+        :type batch_size: int
+        :param repaint_interval: Minimum seconds between repaints
+        :type repaint_interval: float
+        """
+        self.processor = processor
+        self.layer_name = layer_name
+        self.typename = typename
+        self.batch_size = batch_size
+        self.repaint_interval = repaint_interval
+
+        self.layer = target_layer
+        self.feature_count = 0
+        self.updated_count = 0
+        self.skipped_tiles = 0
+        self.skipped_geometries = 0
+        self._tile_hashes = read_tile_hashes(target_layer) if target_layer else {}
+        self._seen_ids = set()
+        self._existing_ids = self._index_existing(target_layer) if target_layer else {}
+        self._last_repaint = 0.0
+
+        if target_layer is not None:
+            processor.ensure_spatial_index(target_layer)
+
+    @staticmethod
+    def _index_existing(layer):
+        # VWorld feature id -> feature id of the target layer
+        id_index = layer.fields().indexOf(FEATURE_ID_FIELD)
+        if id_index < 0:
+            return {}
+
+        request = QgsFeatureRequest()
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes([id_index])
+        return {feature[id_index]: feature.id() for feature in layer.getFeatures(request)}
+
+    def _create_layer(self, source):
+        # Multi geometry type so single and multi parts from any tile fit
+        wkb_type = QgsWkbTypes.multiType(source.wkbType())
+
+        layer = self._create_geopackage(source.fields(), wkb_type)
+        if layer is None:
+            LOGGER.warning(f"Falling back to a memory layer for {self.layer_name}, "
+                           f"it will not be saved with the project")
+            uri = f"{QgsWkbTypes.displayString(wkb_type)}?crs={CRS_WGS84}"
+            layer = QgsVectorLayer(uri, self.layer_name, "memory")
+            layer.dataProvider().addAttributes(source.fields().toList())
+            layer.updateFields()
+
+        # Kept up to date by the provider as features are added or changed
+        self.processor.ensure_spatial_index(layer)
+
+        self.processor._add_metadata(layer, self.typename)
+        QgsProject.instance().addMapLayer(layer)
+
+        LOGGER.info(f"Progressive layer created: {self.layer_name} ({QgsWkbTypes.displayString(wkb_type)})")
+        return layer
+
+    def _create_geopackage(self, fields, wkb_type):
+        path = os.path.join(get_cache_dir('layers'), f"{self.typename}-{uuid.uuid4().hex[:12]}.gpkg")
+
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = 'GPKG'
+        options.fileEncoding = 'UTF-8'
+        options.layerName = self.typename
+
+        writer = QgsVectorFileWriter.create(
+            path, fields, wkb_type, QgsCoordinateReferenceSystem(CRS_WGS84),
+            QgsProject.instance().transformContext(), options
+        )
+        if writer.hasError() != QgsVectorFileWriter.NoError:
+            LOGGER.error(f"Cannot create {path}: {writer.errorMessage()}")
+            return None
+        # The empty table (with its R-tree) is written when the writer is deleted
+        del writer
+
+        layer = QgsVectorLayer(f"{path}|layername={self.typename}", self.layer_name, "ogr")
+        if not layer.isValid():
+            LOGGER.error(f"Created GeoPackage is not a valid layer: {path}")
+            return None
+        layer.setProviderEncoding('UTF-8')
+        return layer
+
+    def add_tile(self, tile_file, tile=None):
+        """
+        Append the features of a downloaded tile.
+
+        :param tile_file: Path to the tile GeoJSON file
+        :type tile_file: str
+        :param tile: Grid tile (col, row) of the file, used to skip a tile
+            identical to the one loaded last time
+        :type tile: tuple
+        :return: Number of features added or updated
+        :rtype: int
+        """
+        if tile is not None:
+            # The same tile with the same content as last time (e.g. refetched
+            # after its cache entry expired) has nothing new
+            tile_key = f"{tile[0]},{tile[1]}"
+            tile_hash = ResponseCache.content_hash(tile_file)[:16]
+            if self._tile_hashes.get(tile_key) == tile_hash:
+                self.skipped_tiles += 1
+                return 0
+            # One hash per tile, replaced on refresh
+            self._tile_hashes[tile_key] = tile_hash
+
+        source = QgsVectorLayer(tile_file, 'tile', 'ogr')
+        if not source.isValid() or source.featureCount() == 0:
+            return 0
+
+        if self.layer is None:
+            self.layer = self._create_layer(source)
+
+        target_fields = self.layer.fields()
+        source_names = source.fields().names()
+        # Map target fields to source columns by name (tiles may differ)
+        mapping = [source_names.index(name) if name in source_names else -1
+                   for name in target_fields.names()]
+        # Updates leave the primary key and the columns VWorld did not send alone
+        primary_keys = set(self.layer.dataProvider().pkAttributeIndexes())
+        updated_columns = [(index, source_index) for index, source_index in enumerate(mapping)
+                           if source_index >= 0 and index not in primary_keys]
+        wkb_type = self.layer.wkbType()
+        id_index = source_names.index(FEATURE_ID_FIELD) if FEATURE_ID_FIELD in source_names else -1
+
+        batch = []
+        geometry_changes = {}
+        attribute_changes = {}
+        added = 0
+
+        for source_feature in source.getFeatures():
+            feature_id = source_feature[id_index] if id_index >= 0 else None
+
+            # Features crossing tile borders are returned by every tile
+            if feature_id is not None:
+                if feature_id in self._seen_ids:
+                    continue
+                self._seen_ids.add(feature_id)
+
+            source_attributes = source_feature.attributes()
+            attributes = [source_attributes[i] if i >= 0 else None for i in mapping]
+
+            geometry = source_feature.geometry()
+            if not geometry.isNull() and not self._convert_geometry(geometry, wkb_type):
+                self.skipped_geometries += 1
+                continue
+
+            existing_fid = self._existing_ids.get(feature_id)
+            if existing_fid is not None:
+                geometry_changes[existing_fid] = geometry
+                attribute_changes[existing_fid] = {
+                    index: source_attributes[source_index] for index, source_index in updated_columns
+                }
+                if len(attribute_changes) >= self.batch_size:
+                    self._flush_changes(geometry_changes, attribute_changes)
+                continue
+
+            feature = QgsFeature(target_fields)
+            feature.setAttributes(attributes)
+            if not geometry.isNull():
+                feature.setGeometry(geometry)
+
+            batch.append(feature)
+            if len(batch) >= self.batch_size:
+                added += self._flush_features(batch)
+                batch = []
+
+        if batch:
+            added += self._flush_features(batch)
+        self._flush_changes(geometry_changes, attribute_changes)
+
+        self.feature_count += added
+        self._repaint()
+        return added
+
+    @staticmethod
+    def _convert_geometry(geometry, wkb_type):
+        # Layers created by the loader are multi; an existing target may be single
+        if QgsWkbTypes.isMultiType(wkb_type):
+            return geometry.convertToMultiType()
+        if geometry.isMultipart():
+            # Fails for geometries with more than one part
+            return geometry.convertToSingleType()
+        return True
+
+    def _flush_features(self, features):
+        self.layer.dataProvider().addFeatures(features)
+        return len(features)
+
+    def _flush_changes(self, geometry_changes, attribute_changes):
+        if not attribute_changes:
+            return
+        provider = self.layer.dataProvider()
+        provider.changeAttributeValues(attribute_changes)
+        provider.changeGeometryValues(
+            {fid: geometry for fid, geometry in geometry_changes.items() if not geometry.isNull()}
+        )
+        self.updated_count += len(attribute_changes)
+        geometry_changes.clear()
+        attribute_changes.clear()
+
+    def _repaint(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_repaint < self.repaint_interval:
+            return
+        self._last_repaint = now
+        self.layer.updateExtents()
+        self.layer.triggerRepaint()
+
+    def finish(self):
+        """
+        Finish loading after the last tile.
+
+        :return: The loaded layer, or None if no tile had features
+        :rtype: QgsVectorLayer or None
+        """
+        if self.layer is None:
+            LOGGER.warning(f"No features received for {self.typename}")
+            return None
+
+        self._repaint(force=True)
+        self.layer.setCustomProperty(TILE_HASHES_PROPERTY, json.dumps(self._tile_hashes, sort_keys=True))
+        watch_layer_edits(self.layer)
+
+        if self.updated_count:
+            message = (f"레이어가 갱신되었습니다: {self.layer.name()} "
+                       f"(추가 {self.feature_count}, 갱신 {self.updated_count})")
+        else:
+            message = f"레이어가 추가되었습니다: {self.layer.name()} ({self.feature_count} features)"
+
+        LOGGER.info(f"Progressive load finished: {self.layer.name()} "
+                    f"({self.feature_count} added, {self.updated_count} updated, "
+                    f"{self.skipped_tiles} unchanged tiles skipped)")
+        if self.skipped_geometries:
+            LOGGER.warning(f"{self.skipped_geometries} multipart features do not fit "
+                           f"the single geometry type of {self.layer.name()} and were skipped")
+        self.processor.push_message(message, level=Qgis.Success)
+        return self.layer
+
+
 def get_extent_for_download(iface, extent_type, layer=None, selected_only=False):
     """
     Helper function to get extent based on extent type.
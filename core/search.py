@@ -0,0 +1,204 @@
+"""
+Layer search for Quick Vworld Plugin
+
+This module builds an n-gram index over the layer catalog so layers can
+be found by Korean name, English name, typename or description while
+typing. Queries made only of Hangul initial consonants (초성, e.g.
+'ㄷㅅㄱㅎ' for '도시계획') are matched against the initials of the names.
+"""
+
+import re
+import threading
+
+from ..definitions.layers import get_all_layers
+
+# Compatibility jamo of the 19 initial consonants, in Unicode syllable order
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+SYLLABLES_PER_INITIAL = 21 * 28
+
+# Layer fields that are searched, by decreasing relevance
+SEARCH_FIELDS = ('name', 'typename', 'name_en', 'description')
+
+NGRAM_SIZE = 2
+
+_SEPARATORS = re.compile(r'[\s_\-()\[\]/.,·]+')
+
+
+def normalize(text):
+    """
+    Normalize text for matching (lowercase, separators removed).
+
+    :param text: Text
+    :type text: str
+    :return: Normalized text
+    :rtype: str
+    """
+    return _SEPARATORS.sub('', (text or '').lower())
+
+
+def hangul_initials(text):
+    """
+    Replace Hangul syllables with their initial consonant.
+
+    :param text: Text (e.g., '도시계획')
+    :type text: str
+    :return: Text with initials (e.g., 'ㄷㅅㄱㅎ')
+    :rtype: str
+    """
+    chars = []
+    for char in text:
+        code = ord(char)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            chars.append(CHOSEONG[(code - HANGUL_BASE) // SYLLABLES_PER_INITIAL])
+        else:
+            chars.append(char)
+    return ''.join(chars)
+
+
+def is_initials_query(text):
+    """
+    Check whether a query consists of initial consonants only.
+
+    :param text: Normalized query
+    :type text: str
+    :return: True for queries like 'ㄷㅅ'
+    :rtype: bool
+    """
+    return bool(text) and all(char in CHOSEONG for char in text)
+
+
+def _ngrams(text):
+    if len(text) < NGRAM_SIZE:
+        return {text} if text else set()
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class LayerSearchIndex:
+    """
+    Prebuilt search index over a set of layers.
+
+    Every searched field is normalized and split into character bigrams
+    (plus single characters for one-letter queries). A query is answered
+    by intersecting the posting sets of its bigrams and verifying the
+    few remaining candidates by substring match, so the cost depends on
+    the number of matches rather than on the catalog size.
+    """
+
+    def __init__(self, layers):
+        """
+        Constructor.
+
+        :param layers: Layer information keyed by typename
+        :type layers: dict
+        """
+        self.layers = layers
+        self._texts = {}
+        self._initials = {}
+        self._postings = {}
+        self._initial_postings = {}
+        self._order = {}
+
+        ordered = sorted(layers.items(), key=lambda item: (item[1].get('name') or item[0], item[0]))
+        for position, (typename, info) in enumerate(ordered):
+            self._order[typename] = position
+            texts = tuple(
+                normalize(typename if field == 'typename' else info.get(field))
+                for field in SEARCH_FIELDS
+            )
+            self._texts[typename] = texts
+            self._initials[typename] = hangul_initials(texts[0])
+
+            for text in texts:
+                self._add_postings(self._postings, typename, text)
+            self._add_postings(self._initial_postings, typename, self._initials[typename])
+
+    @staticmethod
+    def _add_postings(postings, typename, text):
+        for gram in _ngrams(text) | set(text):
+            postings.setdefault(gram, set()).add(typename)
+
+    def all(self):
+        """
+        Get all typenames in display order.
+
+        :return: Typenames sorted by name
+        :rtype: list
+        """
+        return sorted(self._order, key=self._order.get)
+
+    def _candidates(self, postings, query):
+        grams = _ngrams(query)
+        candidates = None
+        # Rarest grams first keeps the intersections small
+        for gram in sorted(grams, key=lambda g: len(postings.get(g, ()))):
+            found = postings.get(gram)
+            if not found:
+                return set()
+            candidates = set(found) if candidates is None else candidates & found
+            if not candidates:
+                break
+        return candidates or set()
+
+    def _rank(self, typename, query):
+        for field_rank, text in enumerate(self._texts[typename]):
+            position = text.find(query)
+            if position == 0:
+                return (0 if text == query else 1, field_rank)
+            if position > 0:
+                return (2, field_rank)
+        return None
+
+    def search(self, query, limit=None):
+        """
+        Search layers.
+
+        :param query: Search text (name, typename, description or 초성)
+        :type query: str
+        :param limit: Maximum number of results
+        :type limit: int
+        :return: Matching typenames, best matches first
+        :rtype: list
+        """
+        query = normalize(query)
+        if not query:
+            results = self.all()
+            return results[:limit] if limit else results
+
+        ranked = []
+        if is_initials_query(query):
+            for typename in self._candidates(self._initial_postings, query):
+                position = self._initials[typename].find(query)
+                if position >= 0:
+                    ranked.append(((0 if position == 0 else 2, 0), typename))
+        else:
+            for typename in self._candidates(self._postings, query):
+                rank = self._rank(typename, query)
+                if rank is not None:
+                    ranked.append((rank, typename))
+
+        ranked.sort(key=lambda item: (item[0], self._order[item[1]]))
+        results = [typename for _, typename in ranked]
+        return results[:limit] if limit else results
+
+
+_search_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """
+    Get the search index of the layer catalog.
+
+    The index is rebuilt when the catalog has been updated.
+
+    :return: Search index
+    :rtype: LayerSearchIndex
+    """
+    global _search_index
+    layers = get_all_layers()
+    with _index_lock:
+        if _search_index is None or _search_index.layers is not layers:
+            _search_index = LayerSearchIndex(layers)
+        return _search_index
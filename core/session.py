@@ -0,0 +1,81 @@
+"""
+Plugin session for Quick Vworld Plugin
+
+This module holds the objects that live for the whole QGIS session once
+the plugin is first used: the main dialog, the WFS client, the caches,
+the request scheduler and the canvas tile prefetcher. They are created
+once and reused by every run instead of being rebuilt each time.
+"""
+
+import logging
+
+from .api.scheduler import Priority, get_scheduler
+from .api.vworld_client import VworldWFSClient
+from .cache import get_default_cache
+from .legend_cache import get_legend_cache
+from .prefetch import TilePrefetcher
+from .processor import VworldDataProcessor
+
+LOGGER = logging.getLogger('QuickVworld')
+
+
+class PluginSession:
+    """Long-lived objects shared by the plugin's dialogs and downloads."""
+
+    def __init__(self, iface):
+        """
+        Constructor.
+
+        :param iface: QGIS interface
+        :type iface: QgsInterface
+        """
+        self.iface = iface
+        self.processor = VworldDataProcessor(iface)
+        self.client = VworldWFSClient()
+        self.cache = get_default_cache()
+        self.legend_cache = get_legend_cache()
+        self.scheduler = get_scheduler()
+        self.prefetcher = TilePrefetcher(
+            iface, cache=self.cache, parent=iface.mainWindow()
+        )
+        self._dialog = None
+
+        LOGGER.info('Quick Vworld session started')
+
+    def get_client(self, priority=Priority.INTERACTIVE_VISIBLE):
+        """
+        Get the shared WFS client, prepared for a new download.
+
+        :param priority: Scheduling priority of the download
+        :type priority: int
+        :return: WFS client
+        :rtype: VworldWFSClient
+        """
+        self.client.set_priority(priority)
+        self.client.errors = []
+        return self.client
+
+    def get_dialog(self):
+        """
+        Get the main dialog, creating it on first use.
+
+        :return: Main dialog
+        :rtype: QuickVworldDialog
+        """
+        if self._dialog is None:
+            from ..ui.main_dialog import QuickVworldDialog
+            self._dialog = QuickVworldDialog(self, self.iface.mainWindow())
+        return self._dialog
+
+    def close(self):
+        """Release the session (called when the plugin is unloaded)."""
+        if self._dialog is not None:
+            self._dialog.disconnect_project()
+            self._dialog.deleteLater()
+            self._dialog = None
+
+        self.prefetcher.set_enabled(False)
+        self.prefetcher.deleteLater()
+        self.client.cleanup()
+
+        LOGGER.info('Quick Vworld session closed')
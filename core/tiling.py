@@ -0,0 +1,144 @@
+"""
+Tiling utilities for Quick Vworld Plugin
+
+This module splits WGS84 extents into a fixed, grid-aligned set of tiles
+so that the same area always produces the same WFS requests. Aligned
+requests make cached responses reusable between downloads and prefetches.
+"""
+
+import logging
+import math
+
+from ..definitions.layers import DEFAULT_TILE_SIZE
+
+LOGGER = logging.getLogger('QuickVworld')
+
+# Decimal places used for tile bounds (keeps request URLs stable)
+BOUNDS_PRECISION = 8
+
+
+def extent_to_tuple(extent):
+    """
+    Convert an extent to a (xmin, ymin, xmax, ymax) tuple.
+
+    :param extent: Extent (QgsRectangle or 4-tuple)
+    :type extent: QgsRectangle or tuple
+    :return: Extent tuple
+    :rtype: tuple
+    """
+    if hasattr(extent, 'xMinimum'):
+        return (extent.xMinimum(), extent.yMinimum(),
+                extent.xMaximum(), extent.yMaximum())
+    xmin, ymin, xmax, ymax = extent
+    return (float(xmin), float(ymin), float(xmax), float(ymax))
+
+
+class TileGrid:
+    """
+    Regular grid of square tiles in EPSG:4326.
+
+    Tiles are addressed by (col, row) integer pairs counted from the
+    grid origin (0, 0).
+    """
+
+    def __init__(self, tile_size=DEFAULT_TILE_SIZE):
+        """
+        Constructor.
+
+        :param tile_size: Tile edge length in degrees
+        :type tile_size: float
+        """
+        if tile_size <= 0:
+            raise ValueError("Tile size must be positive")
+        self.tile_size = float(tile_size)
+
+    def _grid_coord(self, value):
+        # Round away float noise so values on grid lines stay on them
+        return round(value / self.tile_size, BOUNDS_PRECISION)
+
+    def tile_at(self, x, y):
+        """
+        Get the tile containing a point.
+
+        :param x: Longitude
+        :type x: float
+        :param y: Latitude
+        :type y: float
+        :return: Tile (col, row)
+        :rtype: tuple
+        """
+        return (int(math.floor(self._grid_coord(x))),
+                int(math.floor(self._grid_coord(y))))
+
+    def _tile_range(self, extent):
+        xmin, ymin, xmax, ymax = extent_to_tuple(extent)
+        col_min, row_min = self.tile_at(xmin, ymin)
+        col_max, row_max = self.tile_at(xmax, ymax)
+
+        # An extent ending exactly on a grid line does not need the next tile
+        if col_max > col_min and self._grid_coord(xmax) == col_max:
+            col_max -= 1
+        if row_max > row_min and self._grid_coord(ymax) == row_max:
+            row_max -= 1
+
+        return col_min, row_min, col_max, row_max
+
+    def tiles_for_extent(self, extent):
+        """
+        Get all tiles intersecting an extent.
+
+        :param extent: Extent in EPSG:4326
+        :type extent: QgsRectangle or tuple
+        :return: List of tiles (col, row), row-major from south-west
+        :rtype: list
+        """
+        col_min, row_min, col_max, row_max = self._tile_range(extent)
+        return [
+            (col, row)
+            for row in range(row_min, row_max + 1)
+            for col in range(col_min, col_max + 1)
+        ]
+
+    def tile_count(self, extent):
+        """
+        Count tiles intersecting an extent without building the list.
+
+        :param extent: Extent in EPSG:4326
+        :type extent: QgsRectangle or tuple
+        :return: Number of tiles
+        :rtype: int
+        """
+        col_min, row_min, col_max, row_max = self._tile_range(extent)
+        return (col_max - col_min + 1) * (row_max - row_min + 1)
+
+    def tile_bounds(self, tile):
+        """
+        Get the bounds of a tile.
+
+        :param tile: Tile (col, row)
+        :type tile: tuple
+        :return: Bounds (xmin, ymin, xmax, ymax)
+        :rtype: tuple
+        """
+        col, row = tile
+        return (
+            round(col * self.tile_size, BOUNDS_PRECISION),
+            round(row * self.tile_size, BOUNDS_PRECISION),
+            round((col + 1) * self.tile_size, BOUNDS_PRECISION),
+            round((row + 1) * self.tile_size, BOUNDS_PRECISION),
+        )
+
+    def tile_bbox(self, tile):
+        """
+        Get the VWorld BBOX string of a tile.
+
+        VWorld expects ymin,xmin,ymax,xmax for EPSG:4326.
+
+        :param tile: Tile (col, row)
+        :type tile: tuple
+        :return: BBOX parameter value
+        :rtype: str
+        """
+        xmin, ymin, xmax, ymax = self.tile_bounds(tile)
+        return f"{ymin},{xmin},{ymax},{xmax}"
+
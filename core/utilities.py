@@ -3,10 +3,14 @@ Utility functions for Quick Vworld Plugin
 """
 
 import logging
+import os
 from qgis.PyQt.QtCore import QSettings
+from qgis.core import QgsApplication
 
 LOGGER = logging.getLogger('QuickVworld')
 
+_version = None
+
 
 def get_setting(key, default=None):
     """
@@ -33,23 +37,66 @@ def set_setting(key, value):
     settings.setValue(f'quick_vworld/{key}', value)
 
 
+def get_bool_setting(key, default=False):
+    """
+    Get a boolean plugin setting value.
+
+    QSettings stores booleans as strings on some platforms.
+
+    :param key: Setting key
+    :type key: str
+    :param default: Default value if key doesn't exist
+    :type default: bool
+    :return: Setting value
+    :rtype: bool
+    """
+    value = get_setting(key, default)
+    if isinstance(value, str):
+        return value.lower() in ('true', '1', 'yes')
+    return bool(value)
+
+
+def get_cache_dir(name=None):
+    """
+    Get (and create) the plugin cache directory.
+
+    :param name: Optional sub directory name (e.g. 'wfs')
+    :type name: str
+    :return: Absolute path of the cache directory
+    :rtype: str
+    """
+    cache_dir = os.path.join(QgsApplication.qgisSettingsDirPath(), 'cache', 'quick_vworld')
+    if name:
+        cache_dir = os.path.join(cache_dir, name)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
 def get_version():
     """
     Get plugin version from metadata.txt
     
+    The file is scanned for the version line only (no configparser) and
+    the result is cached, so this is cheap to call during initGui.
+    
     :return: Version string
     :rtype: str
     """
-    import os
-    import configparser
+    global _version
+    if _version is not None:
+        return _version
     
     metadata_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'metadata.txt')
     
+    _version = 'unknown'
     try:
-        config = configparser.ConfigParser()
-        config.read(metadata_path, encoding='utf-8')
-        return config.get('general', 'version', fallback='unknown')
-    except Exception as e:
+        with open(metadata_path, encoding='utf-8') as f:
+            for line in f:
+                key, separator, value = line.partition('=')
+                if separator and key.strip() == 'version':
+                    _version = value.strip()
+                    break
+    except OSError as e:
         LOGGER.error(f"Failed to read version: {e}")
-        return 'unknown'
-
+    
+    return _version
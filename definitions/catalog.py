@@ -0,0 +1,262 @@
+"""
+VWorld Layer Catalog
+
+This module holds the catalog of VWorld WFS layers. The catalog starts
+from the layers defined in layers.py and is extended with the feature
+types advertised by the WFS GetCapabilities document, persisted as JSON
+so the document only has to be fetched once.
+
+The persisted file is read lazily, on the first lookup, and the layers
+are indexed by typename, category and geometry type.
+"""
+
+import json
+import os
+import threading
+import time
+
+# Category of layers that are only known from GetCapabilities
+DEFAULT_CATEGORY = 'other'
+
+# VWorld typenames encode the geometry in the second part (lt_c_*, lt_l_*, lt_p_*)
+GEOMETRY_PREFIXES = {
+    'c': 'Polygon',
+    'l': 'LineString',
+    'p': 'Point',
+}
+
+
+def _local_name(tag):
+    """Strip the XML namespace from a tag."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(element, name):
+    """Get the text of the first direct child with the given local name."""
+    for child in element:
+        if _local_name(child.tag) == name:
+            return (child.text or '').strip()
+    return ''
+
+
+def guess_geometry_type(typename):
+    """
+    Guess the geometry type of a layer from its typename.
+
+    :param typename: Layer typename (e.g., 'lt_l_moctlink')
+    :return: Geometry type, or None if unknown
+    """
+    parts = typename.split('_')
+    if len(parts) > 2 and parts[0] == 'lt':
+        return GEOMETRY_PREFIXES.get(parts[1])
+    if typename.startswith('lp_pa_'):
+        return 'Polygon'
+    return None
+
+
+def parse_capabilities(content):
+    """
+    Parse the feature types of a WFS GetCapabilities document.
+
+    :param content: GetCapabilities response
+    :type content: bytes or str
+    :return: Dict of layer information keyed by typename
+    :raises ValueError: If the document is not valid XML
+    """
+    # Imported here, the XML parser is only needed when refreshing the catalog
+    import xml.etree.ElementTree as ET
+
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError as e:
+        raise ValueError(f"Invalid GetCapabilities document: {e}")
+
+    layers = {}
+    for element in root.iter():
+        if _local_name(element.tag) != 'FeatureType':
+            continue
+
+        # Names may be qualified with a namespace prefix (e.g. 'vworld:lt_c_uq111')
+        typename = _child_text(element, 'Name').split(':')[-1].lower()
+        if not typename:
+            continue
+
+        title = _child_text(element, 'Title') or typename
+        keywords = [
+            (keyword.text or '').strip()
+            for keyword in element.iter()
+            if _local_name(keyword.tag) == 'Keyword' and keyword.text
+        ]
+
+        layers[typename] = {
+            'name': title,
+            'name_en': '',
+            'category': keywords[0] if keywords else DEFAULT_CATEGORY,
+            'description': _child_text(element, 'Abstract') or title,
+            'geometry_type': guess_geometry_type(typename),
+        }
+
+    return layers
+
+
+class LayerCatalog:
+    """
+    Indexed store of VWorld layers.
+
+    Built-in layer definitions take precedence over GetCapabilities
+    entries, which carry less information (no Korean category names).
+    """
+
+    def __init__(self, builtin_layers, path=None):
+        """
+        Constructor.
+
+        :param builtin_layers: Layers defined in the plugin
+        :type builtin_layers: dict
+        :param path: JSON file the GetCapabilities layers are persisted to
+        :type path: str
+        """
+        self.builtin_layers = dict(builtin_layers)
+        self.path = path
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._layers = {}
+        self._by_category = {}
+        self._by_geometry = {}
+
+    def set_path(self, path):
+        """
+        Set the JSON file the catalog is persisted to.
+
+        The file is read on the next lookup.
+
+        :param path: Catalog file path
+        :type path: str
+        """
+        with self._lock:
+            if path != self.path:
+                self.path = path
+                self._loaded = False
+
+    def _read(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f).get('layers', {})
+        except (OSError, ValueError):
+            return {}
+
+    def _index(self, layers):
+        self._layers = layers
+        self._by_category = {}
+        self._by_geometry = {}
+        for typename, info in layers.items():
+            self._by_category.setdefault(info.get('category'), {})[typename] = info
+            self._by_geometry.setdefault(info.get('geometry_type'), {})[typename] = info
+        self._loaded = True
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                layers = self._read()
+                layers.update(self.builtin_layers)
+                self._index(layers)
+
+    def get(self, typename):
+        """
+        Get layer information by typename.
+
+        :param typename: Layer typename
+        :return: Layer information dict or None
+        """
+        self._ensure_loaded()
+        return self._layers.get(typename)
+
+    def all(self):
+        """
+        Get all layers.
+
+        :return: Dict of all layers (shared, do not modify)
+        """
+        self._ensure_loaded()
+        return self._layers
+
+    def by_category(self, category):
+        """
+        Get the layers of a category.
+
+        :param category: Category name
+        :return: Dict of layers in the category (shared, do not modify)
+        """
+        self._ensure_loaded()
+        return self._by_category.get(category, {})
+
+    def by_geometry(self, geometry_type):
+        """
+        Get the layers of a geometry type.
+
+        :param geometry_type: Geometry type (Point, LineString, Polygon)
+        :return: Dict of layers with the geometry type (shared, do not modify)
+        """
+        self._ensure_loaded()
+        return self._by_geometry.get(geometry_type, {})
+
+    def categories(self):
+        """
+        Get the category names.
+
+        :return: Sorted list of categories
+        """
+        self._ensure_loaded()
+        return sorted(category for category in self._by_category if category)
+
+    def age(self):
+        """
+        Get the age of the persisted catalog file.
+
+        Does not load the catalog.
+
+        :return: Age in seconds, or None if the catalog was never fetched
+        """
+        if not self.path or not os.path.exists(self.path):
+            return None
+        return time.time() - os.path.getmtime(self.path)
+
+    def update_from_capabilities(self, content):
+        """
+        Replace the GetCapabilities layers and persist them.
+
+        :param content: GetCapabilities response
+        :type content: bytes or str
+        :return: Number of layers in the document
+        :raises ValueError: If the document is not valid XML or lists no layers
+        """
+        fetched = parse_capabilities(content)
+        if not fetched:
+            # Service exception reports parse fine but list no layers
+            raise ValueError("GetCapabilities document lists no feature types")
+
+        with self._lock:
+            if self.path:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = self.path + '.part'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'fetched_at': time.time(), 'layers': fetched}, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+
+            layers = dict(fetched)
+            layers.update(self.builtin_layers)
+            self._index(layers)
+
+        return len(fetched)
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._layers)
+
+    def __contains__(self, typename):
+        self._ensure_loaded()
+        return typename in self._layers
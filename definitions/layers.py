@@ -5,6 +5,8 @@ This module contains definitions for VWorld WFS layers,
 focusing on urban planning related layers.
 """
 
+from .catalog import LayerCatalog
+
 # VWorld API Base URL
 VWORLD_WFS_URL = "https://api.vworld.kr/req/wfs"
 
@@ -83,6 +85,14 @@ ADDITIONAL_LAYERS = {
     },
 }
 
+# Layer catalog (WFS GetCapabilities), refreshed weekly
+CATALOG_TTL = 7 * 24 * 60 * 60
+CATALOG_REFRESH_DELAY_MS = 10000
+
+# Legend (GetLegendGraphic) API
+LEGEND_API_URL = "https://api.vworld.kr/req/image"
+LEGEND_TYPES = ('ALL', 'POINT', 'LINE', 'POLYGON')
+
 # WFS request parameters
 WFS_VERSION = '1.1.0'
 WFS_SERVICE = 'WFS'
@@ -102,6 +112,81 @@ OUTPUT_FORMAT_GML3 = 'GML3'
 MAX_FEATURES = 1000
 DEFAULT_MAX_FEATURES = 1000
 
+# Daily request budget per API key (WFS quota differs per key, see 9.1)
+DAILY_REQUEST_LIMIT = 40000
+
+# Maximum number of simultaneous requests to api.vworld.kr
+MAX_CONCURRENT_REQUESTS = 4
+
+# Tiling (EPSG:4326 degrees, about 1km at Korean latitudes)
+DEFAULT_TILE_SIZE = 0.01
+MAX_TILES_PER_DOWNLOAD = 100
+
+# Response cache lifetime in seconds
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+
+# Legend images rarely change
+LEGEND_CACHE_TTL = 30 * 24 * 60 * 60
+LEGEND_PIXMAP_CACHE_SIZE = 64
+LEGEND_WARMUP_DELAY_MS = 5000
+
+# Prefetch settings
+PREFETCH_DELAY_MS = 500
+PREFETCH_MAX_TILES = 16
+PREFETCH_QUOTA_RESERVE = 0.1
+
+
+def get_legend_params(layer, style=None, legend_type='ALL', image_format='png', api_key=None):
+    """
+    Get the query parameters of a GetLegendGraphic request.
+
+    Shared by the QGIS legend client and the standalone legend harvester.
+
+    :param layer: Layer name (e.g., 'lt_c_upisuq153')
+    :param style: Style name (defaults to layer name)
+    :param legend_type: Legend type (ALL, POINT, LINE, POLYGON)
+    :param image_format: Image format
+    :param api_key: API key (uses default if not provided)
+    :return: List of (name, value) pairs in request order
+    """
+    if not layer:
+        raise ValueError("Layer must be set before building URL")
+
+    legend_type = legend_type.upper()
+    if legend_type not in LEGEND_TYPES:
+        raise ValueError(f"Invalid legend type: {legend_type}")
+
+    return [
+        ('service', 'image'),
+        ('request', 'GetLegendGraphic'),
+        ('format', image_format),
+        ('layer', layer),
+        ('style', style or layer),
+        ('type', legend_type),
+        ('key', api_key or DEFAULT_API_KEY),
+    ]
+
+
+_catalog = None
+
+
+def get_catalog():
+    """
+    Get the shared layer catalog.
+    
+    The catalog contains the layers defined above plus, once fetched,
+    every layer advertised by VWorld GetCapabilities.
+    
+    :return: Layer catalog
+    """
+    global _catalog
+    if _catalog is None:
+        builtin_layers = {}
+        builtin_layers.update(URBAN_PLANNING_LAYERS)
+        builtin_layers.update(ADDITIONAL_LAYERS)
+        _catalog = LayerCatalog(builtin_layers)
+    return _catalog
+
 
 def get_layer_info(typename):
     """
@@ -110,23 +195,16 @@ def get_layer_info(typename):
     :param typename: Layer typename (e.g., 'lt_c_upisuq153')
     :return: Layer information dict or None
     """
-    if typename in URBAN_PLANNING_LAYERS:
-        return URBAN_PLANNING_LAYERS[typename]
-    elif typename in ADDITIONAL_LAYERS:
-        return ADDITIONAL_LAYERS[typename]
-    return None
+    return get_catalog().get(typename)
 
 
 def get_all_layers():
     """
     Get all available layers.
     
-    :return: Combined dict of all layers
+    :return: Dict of all layers (shared, do not modify)
     """
-    all_layers = {}
-    all_layers.update(URBAN_PLANNING_LAYERS)
-    all_layers.update(ADDITIONAL_LAYERS)
-    return all_layers
+    return get_catalog().all()
 
 
 def get_layers_by_category(category):
@@ -134,12 +212,6 @@ def get_layers_by_category(category):
     Get layers filtered by category.
     
     :param category: Category name (e.g., 'urban_planning')
-    :return: Dict of layers in the category
+    :return: Dict of layers in the category (shared, do not modify)
     """
-    all_layers = get_all_layers()
-    return {
-        typename: info 
-        for typename, info in all_layers.items() 
-        if info.get('category') == category
-    }
-
+    return get_catalog().by_category(category)
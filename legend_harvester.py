@@ -0,0 +1,597 @@
+"""
+VWorld 범례 일괄 수집 도구
+
+GetLegendGraphic 요청을 제한된 동시성으로 병렬 수행하여 전체 레이어
+카탈로그의 범례 이미지를 수집합니다. 요청 파라미터는 플러그인의
+VworldLegendClient와 같은 get_legend_params()를 사용합니다.
+
+- 동시 요청 수 제한 및 초당 요청 수 제한
+- 시간 초과/서버 오류 재시도 (지수 백오프)
+- 이미지 내용 해시로 중복 제거 (images/<sha256>.png)
+- 수집 결과 인덱스 (index.json) 및 보고서 (LEGEND_USAGE_REPORT.md) 작성
+
+사용 예:
+    python legend_harvester.py --workers 8 --rate 10
+    python legend_harvester.py --layers-file layers.txt --types ALL,POINT
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from definitions.layers import LEGEND_API_URL, get_all_layers, get_catalog, get_legend_params
+
+# 기본 설정
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 10.0  # 초당 요청 수
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 30
+DEFAULT_OUTPUT_DIR = 'legends'
+INDEX_FILENAME = 'index.json'
+REPORT_FILENAME = 'LEGEND_USAGE_REPORT.md'
+
+# 보고서 제목과 수집 결과 뒤에 붙는 활용 방안
+REPORT_TITLE = 'VWorld GetLegendGraphic API 활용 방안'
+USAGE_GUIDE = """
+## 1. API 개요
+
+### 1.1 기본 정보
+- **API URL**: https://api.vworld.kr/req/image
+- **요청 타입**: GetLegendGraphic
+- **응답 형식**: PNG 이미지
+
+### 1.2 파라미터
+- `service`: image (고정값)
+- `request`: GetLegendGraphic (고정값)
+- `format`: png (이미지 포맷)
+- `layer`: 레이어 이름 (예: lt_c_uq111)
+- `style`: 스타일 이름 (보통 레이어 이름과 동일)
+- `type`: 범례 타입 (ALL, POINT, LINE, POLYGON)
+- `key`: API 인증키
+
+## 2. QGIS 플러그인 활용 방안
+
+### 2.1 레이어 다운로드 시 범례 자동 표시
+플러그인에서 VWorld 레이어를 다운로드할 때 해당 레이어의 범례 이미지를 함께 다운로드하여 
+QGIS 레이어 스타일 패널에 표시할 수 있습니다.
+
+**구현 방법:**
+1. WFS로 레이어 데이터 다운로드
+2. GetLegendGraphic으로 범례 이미지 다운로드
+3. QgsMessageBar 또는 별도 다이얼로그에서 범례 표시
+4. 레이어 메타데이터에 범례 이미지 경로 저장
+
+### 2.2 범례 기반 심볼로지 적용
+범례 이미지를 분석하여 QGIS 심볼로지를 자동으로 설정할 수 있습니다.
+
+**구현 방법:**
+1. 범례 이미지 다운로드
+2. 이미지 OCR로 텍스트 추출 (선택사항)
+3. 색상 팔레트 추출
+4. QML 스타일 파일 생성 또는 직접 스타일 적용
+
+### 2.3 사용자 레이어 선택 UI 개선
+레이어 선택 다이얼로그에 각 레이어의 범례 미리보기를 표시하여 
+사용자가 레이어 내용을 쉽게 파악할 수 있습니다.
+
+**구현 방법:**
+1. 레이어 목록 다이얼로그에 범례 섬네일 추가
+2. 범례 이미지 캐싱으로 성능 최적화
+3. 툴팁에 상세 범례 표시
+
+### 2.4 오프라인 범례 데이터베이스
+자주 사용되는 레이어의 범례를 미리 다운로드하여 로컬 데이터베이스에 저장,
+오프라인 환경에서도 범례를 확인할 수 있습니다.
+
+**구현 방법:**
+1. 주요 레이어 범례 사전 다운로드
+2. SQLite 또는 파일 시스템에 저장
+3. 플러그인 배포 시 포함
+
+## 3. 기술적 구현 사항
+
+### 3.1 Python 코드 예제
+
+```python
+import requests
+from qgis.PyQt.QtGui import QPixmap
+
+def download_legend(layer, style, api_key):
+    \"\"\"VWorld 레전드 이미지 다운로드\"\"\"
+    url = "https://api.vworld.kr/req/image"
+    params = {
+        'service': 'image',
+        'request': 'GetLegendGraphic',
+        'format': 'png',
+        'layer': layer,
+        'style': style,
+        'type': 'ALL',
+        'key': api_key
+    }
+    
+    response = requests.get(url, params=params)
+    if response.status_code == 200:
+        return response.content
+    return None
+
+def display_legend_in_qgis(legend_data):
+    \"\"\"QGIS에서 레전드 표시\"\"\"
+    pixmap = QPixmap()
+    pixmap.loadFromData(legend_data)
+    
+    # QLabel 또는 QMessageBox에 표시
+    # 또는 레이어 속성 다이얼로그에 추가
+    return pixmap
+```
+
+### 3.2 QGIS 통합 포인트
+
+1. **QgsMapLayer 메타데이터**
+   - 레전드 URL을 레이어 메타데이터에 저장
+   - `layer.setCustomProperty('vworld_legend_url', url)`
+
+2. **레이어 트리 컨텍스트 메뉴**
+   - "VWorld 범례 보기" 메뉴 항목 추가
+   - 클릭 시 범례 이미지 표시
+
+3. **다이얼로그 위젯**
+   - QTextBrowser 또는 QLabel에 HTML로 임베딩
+   - `<img src="data:image/png;base64,{base64_data}" />`
+
+## 4. 제약사항 및 고려사항
+
+### 4.1 제약사항
+- API 호출 제한이 있을 수 있음 (API 키별)
+- 일부 레이어는 범례를 제공하지 않을 수 있음
+- 네트워크 연결 필요
+
+### 4.2 고려사항
+- 범례 이미지 캐싱으로 반복 다운로드 방지
+- 에러 처리 (404, 타임아웃 등)
+- 사용자에게 범례 표시 옵션 제공
+
+## 5. 향후 확장 가능성
+
+### 5.1 다중 언어 범례
+- 한국어/영어 범례 지원
+- 사용자 언어 설정에 따라 자동 선택
+
+### 5.2 대화형 범례
+- 범례 항목 클릭 시 해당 피처만 표시
+- 범례 기반 필터링 기능
+
+### 5.3 범례 편집 기능
+- 다운로드한 범례를 기반으로 커스텀 범례 생성
+- QML 스타일 파일로 저장
+
+## 6. 참고 자료
+- VWorld OpenAPI: https://www.vworld.kr/dev/v4dv_wmsguide2_s001.do
+- QGIS Python API: https://qgis.org/pyqgis/
+- WMS GetLegendGraphic 표준: https://www.ogc.org/standards/wms
+"""
+
+# 재시도할 HTTP 상태 코드
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class RateLimiter:
+    """
+    요청 시작 간격을 제한하는 스레드 안전 레이트 리미터.
+    """
+
+    def __init__(self, rate):
+        """
+        :param rate: 초당 최대 요청 수 (0 이하이면 제한 없음)
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        """다음 요청을 보낼 수 있을 때까지 대기합니다."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class LegendHarvester:
+    """
+    범례 이미지 병렬 수집기.
+    """
+
+    def __init__(self, output_dir=DEFAULT_OUTPUT_DIR, workers=DEFAULT_WORKERS,
+                 rate=DEFAULT_RATE, retries=DEFAULT_RETRIES, timeout=DEFAULT_TIMEOUT,
+                 api_key=None):
+        """
+        :param output_dir: 저장 디렉토리
+        :param workers: 동시 요청 수
+        :param rate: 초당 최대 요청 수
+        :param retries: 실패 시 재시도 횟수
+        :param timeout: 요청 시간 제한 (초)
+        :param api_key: API 키 (기본 키 사용 시 None)
+        """
+        self.output_dir = output_dir
+        self.image_dir = os.path.join(output_dir, 'images')
+        self.workers = workers
+        self.retries = retries
+        self.timeout = timeout
+        self.api_key = api_key
+        self.rate_limiter = RateLimiter(rate)
+
+        # 연결을 재사용하도록 작업자 수만큼 연결 풀 유지
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        self._hashes = set()
+
+    def _request(self, layer, style, legend_type):
+        """
+        재시도를 포함하여 범례 이미지를 요청합니다.
+
+        :return: (content, error_message)
+        """
+        params = get_legend_params(layer, style, legend_type, api_key=self.api_key)
+        error = None
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(min(2 ** attempt, 30))
+
+            self.rate_limiter.wait()
+            try:
+                response = self.session.get(LEGEND_API_URL, params=params, timeout=self.timeout)
+            except requests.exceptions.Timeout:
+                error = "요청 시간 초과"
+                continue
+            except requests.exceptions.RequestException as e:
+                error = f"요청 오류: {str(e)}"
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES:
+                error = f"HTTP 오류: {response.status_code}"
+                continue
+
+            if response.status_code != 200:
+                return None, f"HTTP 오류: {response.status_code}"
+
+            content_type = response.headers.get('Content-Type', '')
+            if 'image' not in content_type.lower():
+                # 오류 응답은 재시도해도 같은 결과
+                return None, f"이미지가 아닌 응답: {content_type}"
+
+            return response.content, None
+
+        return None, error
+
+    def _store(self, content):
+        """
+        이미지를 내용 해시 이름으로 저장합니다 (같은 이미지는 한 번만 저장).
+
+        :return: (sha256, 파일 경로, 새로 저장했는지 여부)
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        file_path = os.path.join(self.image_dir, f"{digest}.png")
+
+        with self._lock:
+            is_new = digest not in self._hashes and not os.path.exists(file_path)
+            self._hashes.add(digest)
+
+        if is_new:
+            tmp_path = f"{file_path}.{threading.get_ident()}.part"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, file_path)
+
+        return digest, file_path, is_new
+
+    def harvest_one(self, layer, style=None, legend_type='ALL', description=''):
+        """
+        레이어 하나의 범례를 수집합니다.
+
+        :return: 결과 dict
+        """
+        content, error = self._request(layer, style, legend_type)
+        result = {
+            'layer': layer,
+            'style': style or layer,
+            'type': legend_type,
+            'description': description,
+            'success': content is not None,
+            'error': error,
+        }
+
+        if content is not None:
+            digest, file_path, is_new = self._store(content)
+            result.update({
+                'sha256': digest,
+                'filepath': file_path,
+                'size': len(content),
+                'duplicate': not is_new,
+            })
+
+        return result
+
+    def harvest(self, layers, legend_types=('ALL',), progress=None):
+        """
+        여러 레이어의 범례를 병렬로 수집합니다.
+
+        :param layers: 레이어 dict 목록 (layer, style, description)
+        :param legend_types: 레이어별로 요청할 범례 타입
+        :param progress: 결과마다 호출되는 콜백 (result, done, total)
+        :return: 결과 목록 (입력 순서)
+        """
+        os.makedirs(self.image_dir, exist_ok=True)
+
+        jobs = [
+            (index, layer_info, legend_type)
+            for index, layer_info in enumerate(layers)
+            for legend_type in legend_types
+        ]
+        results = [None] * len(jobs)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(
+                    self.harvest_one,
+                    layer_info['layer'],
+                    layer_info.get('style'),
+                    legend_type,
+                    layer_info.get('description', ''),
+                ): position
+                for position, (index, layer_info, legend_type) in enumerate(jobs)
+            }
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                position = futures[future]
+                results[position] = future.result()
+                if progress:
+                    progress(results[position], done, len(jobs))
+
+        return results
+
+    def write_index(self, results):
+        """
+        수집 결과 인덱스를 저장합니다.
+
+        :return: 인덱스 파일 경로
+        """
+        index = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'api_url': LEGEND_API_URL,
+            'total': len(results),
+            'success': sum(1 for r in results if r['success']),
+            'unique_images': len({r['sha256'] for r in results if r['success']}),
+            'legends': [
+                {key: value for key, value in r.items() if key != 'filepath'}
+                for r in results
+            ],
+        }
+
+        index_path = os.path.join(self.output_dir, INDEX_FILENAME)
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+
+        return index_path
+
+    def write_report(self, results, title=REPORT_TITLE, guide=USAGE_GUIDE):
+        """
+        수집 결과 보고서 (Markdown)를 저장합니다.
+
+        :param results: harvest() 결과 목록 또는 load_index()로 읽은 목록
+        :param title: 보고서 제목
+        :param guide: 결과 뒤에 덧붙일 Markdown 본문 (기본: 활용 방안)
+        :return: 보고서 파일 경로
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        report_path = os.path.join(self.output_dir, REPORT_FILENAME)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(build_report(results, title, guide))
+        return report_path
+
+
+def load_index(output_dir=DEFAULT_OUTPUT_DIR):
+    """
+    이전 수집의 결과 목록을 인덱스 파일에서 읽습니다.
+
+    :param output_dir: 수집 디렉토리
+    :return: 결과 목록 (인덱스가 없으면 빈 목록)
+    """
+    try:
+        with open(os.path.join(output_dir, INDEX_FILENAME), encoding='utf-8') as f:
+            return json.load(f).get('legends', [])
+    except (OSError, ValueError):
+        return []
+
+
+def build_report(results, title=REPORT_TITLE, guide=None):
+    """
+    수집 결과 보고서 본문을 만듭니다.
+
+    요청 성공/실패 수, 고유 이미지 수와 레이어별 고유 이미지 및 다른
+    레이어와 공유하는 이미지 수를 정리합니다.
+
+    :param results: 결과 목록
+    :param title: 보고서 제목
+    :param guide: 결과 뒤에 덧붙일 Markdown 본문 (선택)
+    :return: Markdown 문자열
+    """
+    success = [r for r in results if r['success']]
+    failed = [r for r in results if not r['success']]
+
+    # 이미지 해시 -> 그 이미지를 쓰는 레이어
+    image_layers = {}
+    for r in success:
+        image_layers.setdefault(r['sha256'], set()).add(r['layer'])
+
+    layers = {}
+    for r in results:
+        layers.setdefault(r['layer'], []).append(r)
+
+    lines = [
+        f"# {title}",
+        "",
+        f"- 생성 시각: {datetime.now().isoformat(timespec='seconds')}",
+        f"- API URL: {LEGEND_API_URL}",
+        "",
+        "## 수집 결과",
+        "",
+        f"- 요청: {len(results)}건 (레이어 {len(layers)}개)",
+        f"- 성공: {len(success)}건",
+        f"- 실패: {len(failed)}건",
+        f"- 고유 이미지: {len(image_layers)}개 "
+        f"(중복 제거 {len(success) - len(image_layers)}건)",
+        "",
+        "## 레이어별 결과",
+        "",
+        "| 레이어 | 설명 | 성공/요청 | 고유 이미지 | 다른 레이어와 공유 |",
+        "|---|---|---|---|---|",
+    ]
+    for layer, layer_results in layers.items():
+        hashes = {r['sha256'] for r in layer_results if r['success']}
+        shared = sum(1 for digest in hashes if len(image_layers[digest]) > 1)
+        description = next((r['description'] for r in layer_results if r.get('description')), '')
+        lines.append(
+            f"| `{layer}` | {description} "
+            f"| {sum(1 for r in layer_results if r['success'])}/{len(layer_results)} "
+            f"| {len(hashes)} | {shared} |"
+        )
+
+    if failed:
+        lines += ["", "## 실패한 요청", ""]
+        lines += [f"- `{r['layer']}` ({r['type']}): {r['error']}" for r in failed]
+
+    report = '\n'.join(lines) + '\n'
+    if guide:
+        report += '\n' + guide.strip() + '\n'
+    return report
+
+
+def default_catalog_path():
+    """
+    플러그인이 저장한 레이어 카탈로그 파일의 경로를 반환합니다.
+
+    QGIS 없이 실행되므로 core.catalog.init_catalog() 대신 기본 프로필의
+    캐시 디렉토리 (<프로필>/cache/quick_vworld/catalog/layers.json)를
+    직접 계산합니다.
+    """
+    if sys.platform == 'win32':
+        base = os.path.join(os.environ.get('APPDATA', ''), 'QGIS', 'QGIS3')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support/QGIS/QGIS3')
+    else:
+        base = os.path.expanduser('~/.local/share/QGIS/QGIS3')
+    return os.path.join(base, 'profiles', 'default', 'cache', 'quick_vworld', 'catalog', 'layers.json')
+
+
+def load_layers(layers_file=None, catalog_path=None):
+    """
+    수집할 레이어 목록을 읽습니다.
+
+    :param layers_file: 레이어 이름 목록 파일 (한 줄에 하나, 또는 JSON 목록).
+        지정하지 않으면 레이어 카탈로그의 전체 레이어를 사용합니다.
+    :param catalog_path: 레이어 카탈로그 파일 (기본: default_catalog_path()).
+        파일이 없으면 플러그인에 정의된 레이어만 사용합니다.
+    :return: 레이어 dict 목록
+    """
+    if not layers_file:
+        catalog_path = catalog_path or default_catalog_path()
+        if os.path.exists(catalog_path):
+            get_catalog().set_path(catalog_path)
+        else:
+            print(f"레이어 카탈로그 파일이 없어 기본 레이어만 수집합니다: {catalog_path}")
+        return [
+            {'layer': typename, 'style': typename, 'description': info.get('name', '')}
+            for typename, info in get_all_layers().items()
+        ]
+
+    with open(layers_file, encoding='utf-8') as f:
+        text = f.read()
+
+    if layers_file.lower().endswith('.json'):
+        entries = json.loads(text)
+    else:
+        entries = [line.strip() for line in text.splitlines()
+                   if line.strip() and not line.startswith('#')]
+
+    return [
+        entry if isinstance(entry, dict) else {'layer': entry, 'style': entry, 'description': ''}
+        for entry in entries
+    ]
+
+
+def print_summary(results):
+    """수집 결과 요약을 출력합니다."""
+    print("\n" + "="*60)
+    print("범례 수집 결과 요약")
+    print("="*60)
+
+    success = [r for r in results if r['success']]
+    print(f"\n성공: {len(success)}/{len(results)}")
+    print(f"고유 이미지: {len({r['sha256'] for r in success})}개")
+
+    failed = [r for r in results if not r['success']]
+    if failed:
+        print("\n실패한 레이어:")
+        for r in failed:
+            print(f"  [FAIL] {r['description']} ({r['layer']}, {r['type']})")
+            print(f"         오류: {r['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='VWorld 범례 일괄 수집')
+    parser.add_argument('--layers-file', help='레이어 목록 파일 (txt 또는 json)')
+    parser.add_argument('--catalog', help='레이어 카탈로그 파일 (기본: QGIS 기본 프로필의 캐시)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR, help='저장 디렉토리')
+    parser.add_argument('--types', default='ALL', help='범례 타입 (쉼표 구분)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='동시 요청 수')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='초당 최대 요청 수')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help='재시도 횟수')
+    parser.add_argument('--key', help='VWorld API 키')
+    args = parser.parse_args()
+
+    layers = load_layers(args.layers_file, args.catalog)
+    legend_types = [t.strip().upper() for t in args.types.split(',') if t.strip()]
+
+    harvester = LegendHarvester(
+        output_dir=args.output,
+        workers=args.workers,
+        rate=args.rate,
+        retries=args.retries,
+        api_key=args.key,
+    )
+
+    started = time.monotonic()
+    results = harvester.harvest(
+        layers, legend_types,
+        progress=lambda r, done, total: print(
+            f"[{done}/{total}] {'OK  ' if r['success'] else 'FAIL'} {r['layer']} ({r['type']})"
+        )
+    )
+    index_path = harvester.write_index(results)
+    report_path = harvester.write_report(results)
+
+    print_summary(results)
+    print(f"\n소요 시간: {time.monotonic() - started:.1f}초")
+    print(f"인덱스: {index_path}")
+    print(f"보고서: {report_path}")
+
+
+if __name__ == '__main__':
+    main()
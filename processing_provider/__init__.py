@@ -0,0 +1,5 @@
+"""Processing provider package for Quick Vworld plugin."""
+
+from .provider import VworldProvider
+
+__all__ = ['VworldProvider']
@@ -0,0 +1,217 @@
+"""
+Base algorithm for Quick Vworld Processing algorithms
+
+Holds the parameters and the download steps shared by the algorithms.
+Downloads use worker threads with one WFS client each, while the
+response cache, request scheduler and daily quota are shared with the
+plugin and with every other algorithm running at the same time (e.g.
+the rows of a batch run).
+"""
+
+import os
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
+    QgsFeatureSink,
+    QgsFields,
+    QgsGeometry,
+    QgsProcessingAlgorithm,
+    QgsProcessingException,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterExpression,
+    QgsProcessingParameterString,
+    QgsWkbTypes,
+)
+from qgis.PyQt.QtGui import QIcon
+
+from ..definitions.layers import CRS_WGS84, MAX_CONCURRENT_REQUESTS, get_all_layers, get_layer_info
+
+ICON_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'icon.png')
+
+
+class VworldAlgorithm(QgsProcessingAlgorithm):
+    """Base class of the Quick Vworld algorithms."""
+
+    PROPERTIES = 'PROPERTIES'
+    FILTER = 'FILTER'
+
+    def createInstance(self):
+        return type(self)()
+
+    def flags(self):
+        # Runs in a background thread and stops between tile requests
+        return super().flags() | QgsProcessingAlgorithm.FlagCanCancel
+
+    def icon(self):
+        return QIcon(ICON_PATH)
+
+    def group(self):
+        return 'Download'
+
+    def groupId(self):
+        return 'download'
+
+    @staticmethod
+    def wgs84():
+        return QgsCoordinateReferenceSystem(CRS_WGS84)
+
+    def add_typename_parameter(self, name, description, multiple=False):
+        """
+        Add a layer parameter listing the catalog typenames.
+
+        The typename itself is stored (not the option index), so models
+        and batch files keep working when the catalog grows.
+        """
+        typenames = sorted(get_all_layers())
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                name,
+                description,
+                options=typenames,
+                allowMultiple=multiple,
+                usesStaticStrings=True,
+                defaultValue=None if multiple else typenames[0] if typenames else None
+            )
+        )
+
+    def add_filter_parameters(self):
+        """Add the property list and feature filter parameters."""
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.PROPERTIES,
+                'Properties to keep (comma separated, all if empty)',
+                optional=True
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterExpression(
+                self.FILTER,
+                'Feature filter expression',
+                optional=True
+            )
+        )
+
+    def filter_parameters(self, parameters, context):
+        """
+        Get the property list and filter expression.
+
+        :return: (properties, expression)
+        :rtype: tuple
+        """
+        properties = self.parameterAsString(parameters, self.PROPERTIES, context)
+        expression = self.parameterAsExpression(parameters, self.FILTER, context)
+        return [name.strip() for name in properties.split(',') if name.strip()], expression or None
+
+    def source_geometry(self, source, context, feedback):
+        """
+        Get the union of a feature source's geometries in EPSG:4326.
+
+        :param source: Feature source
+        :type source: QgsProcessingFeatureSource
+        :return: Area of interest
+        :rtype: QgsGeometry
+        """
+        transform = QgsCoordinateTransform(source.sourceCrs(), self.wgs84(), context.transformContext())
+        geometries = []
+        for feature in source.getFeatures():
+            if feedback.isCanceled():
+                break
+            geometry = QgsGeometry(feature.geometry())
+            if not geometry.isNull():
+                geometry.transform(transform)
+                geometries.append(geometry)
+
+        if not geometries:
+            raise QgsProcessingException('The area of interest has no geometries')
+        return QgsGeometry.unaryUnion(geometries)
+
+    def fetch_layers(self, typenames, geometry, feedback, tile_size=None, progress_share=100.0):
+        """
+        Download the tiles of several layers covering an area.
+
+        :param typenames: Layer typenames
+        :type typenames: list
+        :param geometry: Area in EPSG:4326
+        :type geometry: QgsGeometry
+        :param feedback: Feedback (progress from 0 to progress_share)
+        :type feedback: QgsProcessingFeedback
+        :param tile_size: Tile size in degrees (default grid if not provided)
+        :type tile_size: float
+        :param progress_share: Part of the progress bar used by the download
+        :type progress_share: float
+        :return: Typename -> tile files
+        :rtype: dict
+        """
+        from ..core.api.limits import get_quota_limiter
+        from ..core.api.scheduler import Priority
+        from ..core.jobs import fetch_tiles_parallel, tiles_for_geometry
+        from ..core.tiling import TileGrid
+
+        grid = TileGrid(tile_size) if tile_size else TileGrid()
+        tiles = tiles_for_geometry(grid, geometry)
+        requests = [(typename, tile) for typename in typenames for tile in tiles]
+        feedback.pushInfo(f'{len(tiles)} tiles x {len(typenames)} layers = {len(requests)} requests')
+
+        remaining = get_quota_limiter().remaining()
+        if len(requests) > remaining:
+            feedback.pushWarning(
+                f'{len(requests)} requests needed but only {remaining} left in the daily quota '
+                f'(cached tiles do not count)'
+            )
+
+        def on_progress(done, total):
+            feedback.setProgress(done * progress_share / total)
+
+        paths, errors = fetch_tiles_parallel(
+            requests, grid,
+            workers=MAX_CONCURRENT_REQUESTS,
+            priority=Priority.INTERACTIVE_OFFSCREEN,
+            job_id=f'processing:{id(self)}',
+            is_canceled=feedback.isCanceled,
+            progress_callback=on_progress
+        )
+
+        if feedback.isCanceled():
+            raise QgsProcessingException('Canceled')
+
+        missing = [request for request, path in paths.items() if not path]
+        if missing:
+            raise QgsProcessingException(
+                f'{len(missing)} of {len(requests)} tile requests failed: '
+                + '; '.join(sorted(set(errors))[:5])
+            )
+
+        return {
+            typename: [paths[(typename, tile)] for tile in tiles]
+            for typename in typenames
+        }
+
+    def write_sink(self, name, parameters, context, feedback, typename, tile_files,
+                   aoi=None, expression=None, properties=None, clip=False):
+        """
+        Write the merged tiles of a layer to a feature sink parameter.
+
+        :return: (sink id, feature count)
+        :rtype: tuple
+        """
+        from ..core.export import iter_tile_features, read_tile_schema
+
+        fields, wkb_type = read_tile_schema(tile_files, properties)
+        if fields is None:
+            # No features: keep the geometry type of the layer for the empty output
+            info = get_layer_info(typename) or {}
+            fields = QgsFields()
+            wkb_type = QgsWkbTypes.multiType(QgsWkbTypes.parseType(info.get('geometry_type') or ''))
+            feedback.pushWarning(f'No features received for {typename}')
+
+        sink, dest_id = self.parameterAsSink(parameters, name, context, fields, wkb_type, self.wgs84())
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, name))
+
+        count = 0
+        for feature in iter_tile_features(tile_files, fields, aoi, expression, clip, feedback.isCanceled):
+            sink.addFeature(feature, QgsFeatureSink.FastInsert)
+            count += 1
+
+        feedback.pushInfo(f'{typename}: {count} features')
+        return dest_id, count
@@ -0,0 +1,213 @@
+"""
+Download algorithms for Quick Vworld Processing provider
+"""
+
+import os
+from qgis.core import (
+    QgsGeometry,
+    QgsProcessing,
+    QgsProcessingException,
+    QgsProcessingOutputNumber,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterDefinition,
+    QgsProcessingParameterExtent,
+    QgsProcessingParameterFeatureSink,
+    QgsProcessingParameterFeatureSource,
+    QgsProcessingParameterFileDestination,
+    QgsProcessingParameterNumber,
+)
+
+from .base import VworldAlgorithm
+from ..definitions.layers import DEFAULT_TILE_SIZE
+
+
+class DownloadTiledAlgorithm(VworldAlgorithm):
+    """Download one layer for an extent, tile by tile."""
+
+    TYPENAME = 'TYPENAME'
+    EXTENT = 'EXTENT'
+    TILE_SIZE = 'TILE_SIZE'
+    OUTPUT = 'OUTPUT'
+
+    def name(self):
+        return 'downloadtiled'
+
+    def displayName(self):
+        return 'Download layer (extent)'
+
+    def shortHelpString(self):
+        return (
+            'VWorld WFS 레이어를 지정한 범위로 다운로드합니다.\n\n'
+            '범위는 격자에 맞춘 타일로 나뉘어 병렬로 요청되며, 플러그인과 같은 '
+            '응답 캐시와 요청 한도를 사용합니다. 여러 타일에 걸친 피처는 한 번만 저장됩니다.'
+        )
+
+    def initAlgorithm(self, config=None):
+        self.add_typename_parameter(self.TYPENAME, 'VWorld layer')
+        self.addParameter(QgsProcessingParameterExtent(self.EXTENT, 'Extent'))
+
+        tile_size = QgsProcessingParameterNumber(
+            self.TILE_SIZE,
+            'Tile size (degrees)',
+            type=QgsProcessingParameterNumber.Double,
+            defaultValue=DEFAULT_TILE_SIZE,
+            minValue=0.001
+        )
+        tile_size.setFlags(tile_size.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(tile_size)
+
+        self.add_filter_parameters()
+        self.addParameter(QgsProcessingParameterFeatureSink(self.OUTPUT, 'Downloaded layer'))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        typename = self.parameterAsEnumString(parameters, self.TYPENAME, context)
+        extent = self.parameterAsExtent(parameters, self.EXTENT, context, self.wgs84())
+        tile_size = self.parameterAsDouble(parameters, self.TILE_SIZE, context)
+        properties, expression = self.filter_parameters(parameters, context)
+
+        area = QgsGeometry.fromRect(extent)
+        tile_files = self.fetch_layers([typename], area, feedback, tile_size, 90.0)[typename]
+
+        dest_id, _count = self.write_sink(
+            self.OUTPUT, parameters, context, feedback, typename, tile_files,
+            aoi=area, expression=expression, properties=properties
+        )
+        feedback.setProgress(100)
+        return {self.OUTPUT: dest_id}
+
+
+class DownloadAoiAlgorithm(VworldAlgorithm):
+    """Download one layer for the features of an area of interest layer."""
+
+    TYPENAME = 'TYPENAME'
+    AOI = 'AOI'
+    CLIP = 'CLIP'
+    OUTPUT = 'OUTPUT'
+
+    def name(self):
+        return 'downloadaoi'
+
+    def displayName(self):
+        return 'Download layer (area of interest)'
+
+    def shortHelpString(self):
+        return (
+            'VWorld WFS 레이어를 관심 지역(폴리곤 레이어)으로 다운로드합니다.\n\n'
+            '관심 지역에 닿는 타일만 요청하며, 관심 지역과 겹치는 피처만 저장합니다. '
+            '"Clip to area of interest"를 선택하면 피처를 관심 지역 경계로 자릅니다. '
+            '선택한 피처만 사용할 수도 있습니다.'
+        )
+
+    def initAlgorithm(self, config=None):
+        self.add_typename_parameter(self.TYPENAME, 'VWorld layer')
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.AOI,
+                'Area of interest',
+                [QgsProcessing.TypeVectorPolygon]
+            )
+        )
+        self.addParameter(QgsProcessingParameterBoolean(self.CLIP, 'Clip to area of interest', defaultValue=True))
+        self.add_filter_parameters()
+        self.addParameter(QgsProcessingParameterFeatureSink(self.OUTPUT, 'Downloaded layer'))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        typename = self.parameterAsEnumString(parameters, self.TYPENAME, context)
+        source = self.parameterAsSource(parameters, self.AOI, context)
+        if source is None:
+            raise QgsProcessingException(self.invalidSourceError(parameters, self.AOI))
+        clip = self.parameterAsBoolean(parameters, self.CLIP, context)
+        properties, expression = self.filter_parameters(parameters, context)
+
+        area = self.source_geometry(source, context, feedback)
+        tile_files = self.fetch_layers([typename], area, feedback, progress_share=90.0)[typename]
+
+        dest_id, _count = self.write_sink(
+            self.OUTPUT, parameters, context, feedback, typename, tile_files,
+            aoi=area, expression=expression, properties=properties, clip=clip
+        )
+        feedback.setProgress(100)
+        return {self.OUTPUT: dest_id}
+
+
+class DownloadPackageAlgorithm(VworldAlgorithm):
+    """Download several layers into one GeoPackage."""
+
+    TYPENAMES = 'TYPENAMES'
+    EXTENT = 'EXTENT'
+    AOI = 'AOI'
+    CLIP = 'CLIP'
+    OUTPUT = 'OUTPUT'
+    FEATURE_COUNT = 'FEATURE_COUNT'
+
+    def name(self):
+        return 'downloadpackage'
+
+    def displayName(self):
+        return 'Download layer package (GeoPackage)'
+
+    def shortHelpString(self):
+        return (
+            '여러 VWorld WFS 레이어를 한 GeoPackage로 다운로드합니다 (레이어마다 테이블 하나).\n\n'
+            '관심 지역 레이어를 지정하면 범위 대신 관심 지역을 사용합니다. '
+            '모든 레이어의 타일 요청이 함께 병렬로 처리됩니다.'
+        )
+
+    def initAlgorithm(self, config=None):
+        self.add_typename_parameter(self.TYPENAMES, 'VWorld layers', multiple=True)
+        self.addParameter(QgsProcessingParameterExtent(self.EXTENT, 'Extent', optional=True))
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.AOI,
+                'Area of interest (instead of the extent)',
+                [QgsProcessing.TypeVectorPolygon],
+                optional=True
+            )
+        )
+        self.addParameter(QgsProcessingParameterBoolean(self.CLIP, 'Clip to area of interest', defaultValue=False))
+        self.add_filter_parameters()
+        self.addParameter(
+            QgsProcessingParameterFileDestination(self.OUTPUT, 'GeoPackage', 'GeoPackage (*.gpkg)')
+        )
+        self.addOutput(QgsProcessingOutputNumber(self.FEATURE_COUNT, 'Features written'))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        from ..core.export import export_tiles
+
+        typenames = self.parameterAsEnumStrings(parameters, self.TYPENAMES, context)
+        if not typenames:
+            raise QgsProcessingException('Select at least one layer')
+
+        source = self.parameterAsSource(parameters, self.AOI, context)
+        if source is not None:
+            area = self.source_geometry(source, context, feedback)
+        elif parameters.get(self.EXTENT):
+            area = QgsGeometry.fromRect(self.parameterAsExtent(parameters, self.EXTENT, context, self.wgs84()))
+        else:
+            raise QgsProcessingException('Give an extent or an area of interest')
+
+        clip = self.parameterAsBoolean(parameters, self.CLIP, context)
+        properties, expression = self.filter_parameters(parameters, context)
+        output_path = self.parameterAsFileOutput(parameters, self.OUTPUT, context)
+
+        tile_files = self.fetch_layers(typenames, area, feedback, progress_share=80.0)
+
+        # Tables of an earlier run must not stay in the package
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+        total = 0
+        for index, typename in enumerate(typenames):
+            if feedback.isCanceled():
+                break
+            count = export_tiles(
+                tile_files[typename], output_path, typename, 'gpkg',
+                aoi=area, expression=expression, properties=properties, clip=clip
+            )
+            if count is None:
+                raise QgsProcessingException(f'Cannot write {typename} to {output_path}')
+            feedback.pushInfo(f'{typename}: {count} features')
+            total += count
+            feedback.setProgress(80.0 + (index + 1) * 20.0 / len(typenames))
+
+        return {self.OUTPUT: output_path, self.FEATURE_COUNT: total}
@@ -0,0 +1,95 @@
+"""
+Legend export algorithm for Quick Vworld Processing provider
+"""
+
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from qgis.core import (
+    QgsProcessingException,
+    QgsProcessingOutputNumber,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterFolderDestination,
+)
+
+from .base import VworldAlgorithm
+from ..definitions.layers import LEGEND_TYPES, MAX_CONCURRENT_REQUESTS
+
+
+class ExportLegendsAlgorithm(VworldAlgorithm):
+    """Export the legend images of layers to a folder."""
+
+    TYPENAMES = 'TYPENAMES'
+    LEGEND_TYPES = 'LEGEND_TYPES'
+    OUTPUT = 'OUTPUT'
+    EXPORTED = 'EXPORTED'
+
+    def name(self):
+        return 'exportlegends'
+
+    def displayName(self):
+        return 'Export layer legends'
+
+    def group(self):
+        return 'Legend'
+
+    def groupId(self):
+        return 'legend'
+
+    def shortHelpString(self):
+        return (
+            'VWorld 레이어의 범례 이미지를 폴더에 PNG 파일로 저장합니다.\n\n'
+            '파일 이름은 <typename>_<범례 종류>.png 입니다. 범례 캐시에 있는 이미지는 '
+            '다시 요청하지 않습니다.'
+        )
+
+    def initAlgorithm(self, config=None):
+        self.add_typename_parameter(self.TYPENAMES, 'VWorld layers', multiple=True)
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.LEGEND_TYPES,
+                'Legend types',
+                options=list(LEGEND_TYPES),
+                allowMultiple=True,
+                usesStaticStrings=True,
+                defaultValue=['ALL']
+            )
+        )
+        self.addParameter(QgsProcessingParameterFolderDestination(self.OUTPUT, 'Output folder'))
+        self.addOutput(QgsProcessingOutputNumber(self.EXPORTED, 'Legends exported'))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        from ..core.legend_cache import get_legend_cache
+
+        typenames = self.parameterAsEnumStrings(parameters, self.TYPENAMES, context)
+        legend_types = self.parameterAsEnumStrings(parameters, self.LEGEND_TYPES, context) or ['ALL']
+        if not typenames:
+            raise QgsProcessingException('Select at least one layer')
+
+        output_dir = self.parameterAsString(parameters, self.OUTPUT, context)
+        os.makedirs(output_dir, exist_ok=True)
+
+        legend_cache = get_legend_cache()
+        items = [(typename, legend_type) for typename in typenames for legend_type in legend_types]
+
+        def export(item):
+            if feedback.isCanceled():
+                return None
+            typename, legend_type = item
+            path = legend_cache.get_file(typename, legend_type=legend_type)
+            if not path:
+                return None
+            target = os.path.join(output_dir, f'{typename}_{legend_type.lower()}.png')
+            shutil.copyfile(path, target)
+            return target
+
+        exported = 0
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            for index, (item, target) in enumerate(zip(items, executor.map(export, items))):
+                if target:
+                    exported += 1
+                elif not feedback.isCanceled():
+                    feedback.pushWarning(f'No legend for {item[0]} ({item[1]})')
+                feedback.setProgress((index + 1) * 100.0 / len(items))
+
+        return {self.OUTPUT: output_dir, self.EXPORTED: exported}
@@ -0,0 +1,39 @@
+"""
+Processing provider for Quick Vworld Plugin
+"""
+
+from qgis.core import QgsProcessingProvider
+from qgis.PyQt.QtGui import QIcon
+
+from .base import ICON_PATH
+from .download import DownloadAoiAlgorithm, DownloadPackageAlgorithm, DownloadTiledAlgorithm
+from .legends import ExportLegendsAlgorithm
+
+
+class VworldProvider(QgsProcessingProvider):
+    """Processing provider with the VWorld download algorithms."""
+
+    def id(self):
+        return 'quickvworld'
+
+    def name(self):
+        return 'Quick Vworld'
+
+    def longName(self):
+        return 'Quick Vworld (VWorld Open API)'
+
+    def icon(self):
+        return QIcon(ICON_PATH)
+
+    def loadAlgorithms(self):
+        # The layer parameters list the catalog, which needs its file path
+        from ..core.catalog import init_catalog
+        init_catalog()
+
+        for algorithm in (
+            DownloadTiledAlgorithm(),
+            DownloadAoiAlgorithm(),
+            DownloadPackageAlgorithm(),
+            ExportLegendsAlgorithm(),
+        ):
+            self.addAlgorithm(algorithm)
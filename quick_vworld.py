@@ -4,13 +4,16 @@ Quick Vworld Plugin - Main Entry Point
 
 import logging
 import os
-from qgis.PyQt.QtCore import QSettings, QTranslator, QCoreApplication, QUrl
+from qgis.PyQt.QtCore import QSettings, QTranslator, QCoreApplication, QTimer, QUrl
 from qgis.PyQt.QtGui import QIcon, QDesktopServices
-from qgis.PyQt.QtWidgets import QAction, QMessageBox, QPushButton
-from qgis.core import Qgis, QgsMessageLog
+from qgis.PyQt.QtWidgets import QAction, QFileDialog, QMessageBox, QPushButton
+from qgis.core import Qgis, QgsApplication, QgsMessageLog, QgsProject
 
-from .ui.main_dialog import QuickVworldDialog
-from .core.utilities import get_setting, set_setting, get_version
+# Only what is needed to register the action is imported here. The dialog,
+# API clients and background tasks are imported on first use so they do
+# not add to QGIS startup time.
+from .definitions.layers import CATALOG_REFRESH_DELAY_MS, LEGEND_WARMUP_DELAY_MS
+from .core.utilities import get_setting, set_setting, get_bool_setting, get_version
 
 LOGGER = logging.getLogger('QuickVworld')
 
@@ -46,6 +49,11 @@ class QuickVworld:
         self.menu = self.tr('&Quick Vworld')
         self.toolbar = None
         self.help_action = None
+        self.session = None
+        self.legend_warmup_task = None
+        self.catalog_task = None
+        self.bulk_job_task = None
+        self.provider = None
 
         LOGGER.info('Quick Vworld Plugin initialized')
         QgsMessageLog.logMessage('Quick Vworld Plugin initialized', 'QuickVworld', Qgis.Info)
@@ -90,8 +98,16 @@ class QuickVworld:
 
         return action
 
+    def initProcessing(self):
+        """Register the Processing provider (also called by qgis_process)."""
+        from .processing_provider import VworldProvider
+        
+        self.provider = VworldProvider()
+        QgsApplication.processingRegistry().addProvider(self.provider)
+
     def initGui(self):
         """Create the menu entries and toolbar icons inside the QGIS GUI."""
+        self.initProcessing()
         
         icon_path = os.path.join(self.plugin_dir, 'icon.png')
         icon = QIcon(icon_path)
@@ -113,6 +129,30 @@ class QuickVworld:
             status_tip=self.tr('Download spatial data from Vworld WFS API'),
             whats_this=self.tr('Download spatial data from Vworld WFS API'))
 
+        self.add_action(
+            icon_path,
+            text=self.tr('Run Bulk Download Job...'),
+            callback=self.run_bulk_job,
+            add_to_toolbar=False,
+            parent=self.iface.mainWindow(),
+            status_tip=self.tr('Download many layers for many areas from a job manifest'))
+
+        # Downloaded layers edited by the user must not skip "unchanged" tiles later
+        QgsProject.instance().layersAdded.connect(self.watch_downloaded_layers)
+        self.watch_downloaded_layers(QgsProject.instance().mapLayers().values())
+
+        # Canvas tile prefetcher (created once the event loop runs, if turned on
+        # and there are layers to prefetch)
+        if get_bool_setting("prefetch_enabled") and get_setting("prefetch_typenames"):
+            QTimer.singleShot(0, self.enable_prefetcher)
+
+        # Refetch the layer catalog (GetCapabilities) later if it is stale
+        QTimer.singleShot(CATALOG_REFRESH_DELAY_MS, self.refresh_catalog)
+
+        # Fill the legend cache in the background once QGIS has settled
+        if get_bool_setting("legend_warmup", True):
+            QTimer.singleShot(LEGEND_WARMUP_DELAY_MS, self.warm_up_legends)
+
         # Log version info
         version = get_version()
         LOGGER.info(f'Quick Vworld Plugin loaded with version: {version}')
@@ -134,9 +174,168 @@ class QuickVworld:
         # Remove the toolbar
         if self.toolbar:
             del self.toolbar
+        
+        QgsProject.instance().layersAdded.disconnect(self.watch_downloaded_layers)
+        
+        # Stop the background tasks
+        for task in (self.legend_warmup_task, self.catalog_task, self.bulk_job_task):
+            if task:
+                try:
+                    task.cancel()
+                except RuntimeError:
+                    # Task already finished and deleted
+                    pass
+        self.legend_warmup_task = None
+        self.catalog_task = None
+        self.bulk_job_task = None
+        
+        if self.provider:
+            QgsApplication.processingRegistry().removeProvider(self.provider)
+            self.provider = None
+        
+        # Release the dialog, client and prefetcher
+        if self.session:
+            self.session.close()
+            self.session = None
 
         LOGGER.info('Quick Vworld plugin unloaded')
 
+    @staticmethod
+    def watch_downloaded_layers(layers):
+        """Follow the edits of the VWorld layers among added project layers."""
+        from .core.processor import TYPENAME_PROPERTY, watch_layer_edits
+        
+        for layer in layers:
+            if layer.customProperty(TYPENAME_PROPERTY):
+                watch_layer_edits(layer)
+
+    def get_session(self):
+        """
+        Get the plugin session, creating it on first use.
+        
+        :return: Plugin session
+        :rtype: PluginSession
+        """
+        if self.session is None:
+            from .core.catalog import init_catalog
+            from .core.session import PluginSession
+            
+            init_catalog()
+            self.session = PluginSession(self.iface)
+        return self.session
+
+    def enable_prefetcher(self):
+        """Start the prefetcher turned on in a previous session."""
+        if getattr(self, 'toolbar', None) is None:
+            # Plugin was unloaded before the timer fired
+            return
+        
+        typenames = [typename for typename in (get_setting("prefetch_typenames") or "").split(",")
+                     if typename]
+        if not typenames:
+            return
+        
+        prefetcher = self.get_session().prefetcher
+        prefetcher.set_typenames(typenames)
+        prefetcher.set_enabled(True)
+
+    def warm_up_legends(self):
+        """Download the legends of all known layers into the legend cache."""
+        if getattr(self, 'toolbar', None) is None:
+            # Plugin was unloaded before the timer fired
+            return
+        
+        from .core.catalog import init_catalog
+        from .core.legend_cache import LegendWarmupTask, get_legend_cache
+        
+        self.legend_warmup_task = LegendWarmupTask(get_legend_cache(), init_catalog().all().keys())
+        QgsApplication.taskManager().addTask(self.legend_warmup_task)
+
+    def refresh_catalog(self):
+        """Fetch the full VWorld layer list from GetCapabilities."""
+        if getattr(self, 'toolbar', None) is None:
+            # Plugin was unloaded before the timer fired
+            return
+        
+        from .core.catalog import CatalogRefreshTask, catalog_needs_refresh, init_catalog
+        
+        # The catalog file is only checked here, it is read on first lookup
+        if not catalog_needs_refresh(init_catalog()):
+            return
+        
+        self.catalog_task = CatalogRefreshTask()
+        # The Processing layer parameters list the catalog
+        if self.provider:
+            self.catalog_task.taskCompleted.connect(self.provider.refreshAlgorithms)
+        QgsApplication.taskManager().addTask(self.catalog_task)
+
+    def run_bulk_job(self):
+        """Run a bulk download job from a manifest file in the background."""
+        if self.bulk_job_task is not None:
+            QMessageBox.information(
+                self.iface.mainWindow(),
+                'Quick Vworld',
+                '대량 다운로드 작업이 이미 실행 중입니다.'
+            )
+            return
+        
+        path, _ = QFileDialog.getOpenFileName(
+            self.iface.mainWindow(),
+            '대량 다운로드 작업 매니페스트 선택',
+            get_setting('bulk_job_dir', ''),
+            '작업 매니페스트 (*.json *.yaml *.yml)'
+        )
+        if not path:
+            return
+        set_setting('bulk_job_dir', os.path.dirname(path))
+        
+        from .core.catalog import init_catalog
+        from .core.jobs import BulkJobTask, load_manifest
+        
+        init_catalog()
+        try:
+            task = BulkJobTask(load_manifest(path))
+        except (OSError, ValueError) as e:
+            LOGGER.error(f"Cannot start bulk job {path}: {e}")
+            QMessageBox.critical(
+                self.iface.mainWindow(),
+                '대량 다운로드 작업',
+                f'작업 매니페스트를 읽을 수 없습니다:\n{e}'
+            )
+            return
+        
+        task.jobPlanned.connect(self._on_bulk_job_planned)
+        task.jobFinished.connect(self._on_bulk_job_finished)
+        self.bulk_job_task = task
+        QgsApplication.taskManager().addTask(task)
+        
+        self.iface.messageBar().pushMessage(
+            'Quick Vworld',
+            f"대량 다운로드 작업을 준비하는 중입니다: {task.job.name}",
+            level=Qgis.Info,
+            duration=5
+        )
+
+    def _on_bulk_job_planned(self, total, resumed):
+        if self.bulk_job_task is None:
+            return
+        self.iface.messageBar().pushMessage(
+            'Quick Vworld',
+            f"대량 다운로드 작업을 시작했습니다: {self.bulk_job_task.job.name} ({total}개 요청)"
+            + (" (이전 실행에서 이어받음)" if resumed else ""),
+            level=Qgis.Info,
+            duration=5
+        )
+
+    def _on_bulk_job_finished(self, result, summary):
+        self.bulk_job_task = None
+        self.iface.messageBar().pushMessage(
+            'Quick Vworld',
+            f"대량 다운로드 작업 {'완료' if result else '중단'}: {summary}",
+            level=Qgis.Success if result else Qgis.Warning,
+            duration=0 if not result else 10
+        )
+
     @staticmethod
     def show_help():
         """Open the help documentation."""
@@ -189,9 +388,9 @@ class QuickVworld:
 
     def run(self):
         """Run method that performs all the real work"""
-        
-        # Create the dialog with elements (after translation) and keep reference
-        dlg = QuickVworldDialog(self.iface)
+        # The dialog is created on first run and reused afterwards
+        dlg = self.get_session().get_dialog()
+        dlg.reset()
         
         # Show license agreement on first run
         self.open_vworld_license_message(dlg)
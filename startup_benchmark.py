@@ -0,0 +1,135 @@
+"""
+Quick Vworld 플러그인 시작 시간 측정 스크립트
+
+QGIS 시작 시 플러그인이 차지하는 시간을 측정합니다.
+매 측정은 새 Python 프로세스에서 수행되어 모듈 캐시의 영향을 받지 않습니다.
+
+- import: 플러그인 패키지 import + classFactory
+- initGui: 액션/툴바 등록
+- 시작 시 로드된 플러그인 모듈 수
+
+QGIS Python 환경에서 실행합니다:
+    python startup_benchmark.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+PLUGIN_PACKAGE = os.path.basename(PLUGIN_DIR)
+
+
+class _MinimalInterface:
+    """initGui에 필요한 QgsInterface 메서드만 제공하는 측정용 인터페이스"""
+
+    def __init__(self):
+        from qgis.PyQt.QtWidgets import QMainWindow, QMenu
+        from qgis.gui import QgsMapCanvas
+
+        self._window = QMainWindow()
+        self._help_menu = QMenu()
+        self._canvas = QgsMapCanvas(self._window)
+
+    def mainWindow(self):
+        return self._window
+
+    def mapCanvas(self):
+        return self._canvas
+
+    def pluginHelpMenu(self):
+        return self._help_menu
+
+    def addToolBar(self, name):
+        return self._window.addToolBar(name)
+
+    def addPluginToVectorMenu(self, menu, action):
+        pass
+
+    def removePluginVectorMenu(self, menu, action):
+        pass
+
+    def removeToolBarIcon(self, action):
+        pass
+
+
+def measure_once():
+    """
+    현재 프로세스에서 import와 initGui 시간을 한 번 측정합니다.
+
+    :return: 측정 결과 dict (밀리초)
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    from qgis.core import QgsApplication
+
+    app = QgsApplication([], True)
+    app.initQgis()
+    iface = _MinimalInterface()
+
+    sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+    modules_before = set(sys.modules)
+
+    started = time.perf_counter()
+    package = __import__(PLUGIN_PACKAGE)
+    plugin = package.classFactory(iface)
+    import_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    plugin.initGui()
+    init_gui_ms = (time.perf_counter() - started) * 1000
+
+    loaded = sorted(
+        name for name in set(sys.modules) - modules_before
+        if name == PLUGIN_PACKAGE or name.startswith(PLUGIN_PACKAGE + '.')
+    )
+
+    plugin.unload()
+    app.exitQgis()
+
+    return {
+        'import_ms': import_ms,
+        'init_gui_ms': init_gui_ms,
+        'modules': loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Quick Vworld 플러그인 시작 시간 측정')
+    parser.add_argument('--runs', type=int, default=5, help='측정 횟수')
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(measure_once()))
+        return
+
+    results = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--single'],
+            check=True, capture_output=True, text=True
+        ).stdout
+        # QGIS may print messages before the result line
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print("\n" + "="*60)
+    print(f"Quick Vworld 시작 시간 ({len(results)}회 측정, 중앙값)")
+    print("="*60)
+    for key, label in (('import_ms', 'import + classFactory'), ('init_gui_ms', 'initGui')):
+        values = [r[key] for r in results]
+        print(f"  {label:<24} {statistics.median(values):8.1f} ms "
+              f"(최소 {min(values):.1f}, 최대 {max(values):.1f})")
+
+    modules = results[-1]['modules']
+    print(f"\n시작 시 로드된 플러그인 모듈 ({len(modules)}개):")
+    for name in modules:
+        print(f"  - {name}")
+
+
+if __name__ == '__main__':
+    main()
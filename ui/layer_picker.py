@@ -0,0 +1,212 @@
+"""
+Layer Picker for Quick Vworld Plugin
+
+Searchable list of the VWorld layer catalog. The list is backed by a
+lazy model that only holds typenames and creates display data on demand,
+and the search box queries the prebuilt layer search index.
+"""
+
+import logging
+from qgis.PyQt.QtCore import QAbstractListModel, QModelIndex, Qt, pyqtSignal
+from qgis.PyQt.QtWidgets import QAbstractItemView, QLineEdit, QListView, QVBoxLayout, QWidget
+
+from ..core.search import get_search_index
+from ..definitions.layers import get_layer_info
+
+LOGGER = logging.getLogger('QuickVworld')
+
+# Rows added to the view per fetchMore() call
+FETCH_BATCH_SIZE = 50
+
+# Visible rows of the layer list
+VISIBLE_ROWS = 6
+
+
+class LayerListModel(QAbstractListModel):
+    """List model of layer typenames, populated in batches as the view scrolls."""
+
+    TypenameRole = Qt.UserRole
+
+    def __init__(self, parent=None):
+        """
+        Constructor.
+
+        :param parent: Parent object
+        :type parent: QObject
+        """
+        super().__init__(parent)
+        self._typenames = []
+        self._loaded = 0
+
+    def set_typenames(self, typenames):
+        """
+        Replace the listed layers.
+
+        :param typenames: Layer typenames in display order
+        :type typenames: list
+        """
+        self.beginResetModel()
+        self._typenames = list(typenames)
+        self._loaded = min(len(self._typenames), FETCH_BATCH_SIZE)
+        self.endResetModel()
+
+    def typename(self, row):
+        """
+        Get the typename of a row.
+
+        :param row: Row number
+        :type row: int
+        :return: Typename or None
+        :rtype: str or None
+        """
+        if 0 <= row < self._loaded:
+            return self._typenames[row]
+        return None
+
+    def row_of(self, typename):
+        """
+        Get the row of a typename, loading rows up to it if needed.
+
+        :param typename: Layer typename
+        :type typename: str
+        :return: Row number or -1
+        :rtype: int
+        """
+        try:
+            row = self._typenames.index(typename)
+        except ValueError:
+            return -1
+
+        if row >= self._loaded:
+            self.beginInsertRows(QModelIndex(), self._loaded, row)
+            self._loaded = row + 1
+            self.endInsertRows()
+        return row
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def canFetchMore(self, parent):
+        if parent.isValid():
+            return False
+        return self._loaded < len(self._typenames)
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        count = min(len(self._typenames) - self._loaded, FETCH_BATCH_SIZE)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        typename = self.typename(index.row()) if index.isValid() else None
+        if typename is None:
+            return None
+
+        if role == self.TypenameRole:
+            return typename
+
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            info = get_layer_info(typename) or {}
+            if role == Qt.DisplayRole:
+                return f"{info.get('name', typename)} ({typename})"
+            return info.get('description') or info.get('name_en') or typename
+
+        return None
+
+
+class LayerPicker(QWidget):
+    """
+    Search box and layer list.
+
+    Typing filters the list by Korean name, English name, typename,
+    description or Hangul initials (초성).
+    """
+
+    currentTypenameChanged = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        """
+        Constructor.
+
+        :param parent: Parent widget
+        :type parent: QWidget
+        """
+        super().__init__(parent)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("레이어 검색 (이름, 영문명, 코드, 초성)")
+        self.search_edit.setClearButtonEnabled(True)
+
+        self.model = LayerListModel(self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.list_view.setMinimumHeight(self.list_view.fontMetrics().height() * VISIBLE_ROWS)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.search_edit)
+        layout.addWidget(self.list_view)
+        self.setLayout(layout)
+
+        self._current = None
+
+        self.search_edit.textChanged.connect(self._filter)
+        self.search_edit.returnPressed.connect(self.list_view.setFocus)
+        self.list_view.selectionModel().currentChanged.connect(self._on_current_changed)
+
+        self._filter('')
+
+    def current_typename(self):
+        """
+        Get the selected layer.
+
+        :return: Selected typename or None
+        :rtype: str or None
+        """
+        return self._current
+
+    def set_current_typename(self, typename):
+        """
+        Select a layer, clearing the search if it is filtered out.
+
+        :param typename: Layer typename
+        :type typename: str
+        """
+        row = self.model.row_of(typename)
+        if row < 0 and self.search_edit.text():
+            self.search_edit.clear()
+            row = self.model.row_of(typename)
+        if row >= 0:
+            self.list_view.setCurrentIndex(self.model.index(row))
+
+    def _filter(self, text):
+        previous = self._current
+        self.model.set_typenames(get_search_index().search(text))
+
+        # Keep the selection when it still matches, otherwise take the best match
+        row = self.model.row_of(previous) if previous else -1
+        if row < 0 and self.model.rowCount() > 0:
+            row = 0
+
+        if row >= 0:
+            self.list_view.setCurrentIndex(self.model.index(row))
+            self.list_view.scrollTo(self.model.index(row))
+        else:
+            self._set_current(None)
+
+    def _on_current_changed(self, current, previous):
+        self._set_current(self.model.typename(current.row()) if current.isValid() else None)
+
+    def _set_current(self, typename):
+        if typename != self._current:
+            self._current = typename
+            self.currentTypenameChanged.emit(typename or '')
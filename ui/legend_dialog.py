@@ -5,15 +5,16 @@ Legend Dialog
 """
 
 import logging
-from qgis.PyQt.QtCore import Qt, QSize
+from qgis.PyQt.QtCore import Qt, QSize, QTimer
 from qgis.PyQt.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
     QPushButton, QScrollArea, QWidget, QDialogButtonBox,
-    QMessageBox
+    QMessageBox, QCheckBox
 )
 from qgis.PyQt.QtGui import QPixmap
+from qgis.core import QgsApplication
 
-from ..core.api.legend_client import VworldLegendClient
+from ..core.legend_cache import LegendAtlasTask, LegendImageTask, get_legend_cache
 
 LOGGER = logging.getLogger('QuickVworld')
 
@@ -23,6 +24,8 @@ class LegendDialog(QDialog):
     범례를 표시하는 다이얼로그.
     
     VWorld API에서 범례 이미지를 다운로드하여 표시합니다.
+    다이얼로그는 즉시 열리고, 다운로드와 이미지 디코딩은
+    백그라운드 작업에서 수행됩니다.
     """
 
     def __init__(self, layer_name, layer_label=None, parent=None):
@@ -41,9 +44,13 @@ class LegendDialog(QDialog):
         self.layer_name = layer_name
         self.layer_label = layer_label or layer_name
         self.legend_pixmap = None
+        self._task = None
+        self._closed = False
         
         self._setup_ui()
-        self._load_legend()
+        
+        # 다이얼로그가 표시되어 뷰포트 크기가 정해진 뒤에 로드
+        QTimer.singleShot(0, self._load_legend)
 
     def _setup_ui(self):
         """UI 구성"""
@@ -63,6 +70,7 @@ class LegendDialog(QDialog):
         scroll_area.setWidgetResizable(True)
         scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.scroll_area = scroll_area
         
         # 범례 이미지 레이블
         self.legend_label = QLabel()
@@ -73,6 +81,11 @@ class LegendDialog(QDialog):
         scroll_area.setWidget(self.legend_label)
         layout.addWidget(scroll_area)
         
+        # 기하 유형별 범례 (점/선/면을 동시에 받아 하나의 이미지로 합성)
+        self.geometry_checkbox = QCheckBox("기하 유형별 범례 보기 (점/선/면)")
+        self.geometry_checkbox.toggled.connect(self._reload_legend)
+        layout.addWidget(self.geometry_checkbox)
+        
         # 버튼
         button_box = QDialogButtonBox(QDialogButtonBox.Close)
         button_box.rejected.connect(self.reject)
@@ -80,34 +93,116 @@ class LegendDialog(QDialog):
         
         self.setLayout(layout)
 
+    def _viewport_size(self):
+        """
+        범례 이미지의 최대 크기 (장치 픽셀).
+        
+        폭만 뷰포트에 맞추고 긴 범례는 세로로 스크롤합니다.
+        
+        :return: 최대 이미지 크기
+        :rtype: QSize
+        """
+        ratio = self.devicePixelRatioF()
+        width = int(self.scroll_area.viewport().width() * ratio)
+        return QSize(width, 16777215)
+
+    def _cache_key(self):
+        """메모리 캐시 키 (원본 키 + 표시 폭)"""
+        if self.geometry_checkbox.isChecked():
+            key = get_legend_cache().atlas_key([self.layer_name])
+        else:
+            key = get_legend_cache().key(self.layer_name, self.layer_name, 'ALL')
+        return f"{key}@{self._viewport_size().width()}"
+
+    def _reload_legend(self):
+        """범례 종류가 바뀌면 다시 로드"""
+        self._cancel_loading()
+        self.legend_label.setPixmap(QPixmap())
+        self.legend_label.setText("범례를 불러오는 중...")
+        self._load_legend()
+
     def _load_legend(self):
-        """범례 이미지를 다운로드하여 표시"""
-        try:
-            # 범례 다운로드
-            client = VworldLegendClient()
-            pixmap = client.fetch_legend_as_pixmap(
-                layer=self.layer_name,
+        """범례 이미지를 백그라운드에서 다운로드하여 표시"""
+        if self._closed:
+            # 로드가 시작되기 전에 닫힘
+            return
+        
+        # 이미 디코딩된 이미지가 메모리에 있으면 바로 표시
+        pixmap = get_legend_cache().find_pixmap(self._cache_key())
+        if pixmap is not None:
+            self._show_pixmap(pixmap)
+            return
+        
+        if self.geometry_checkbox.isChecked():
+            self._task = LegendAtlasTask(get_legend_cache(), [self.layer_name])
+            self._task.atlasReady.connect(self._on_atlas_ready)
+            self._task.atlasFailed.connect(self._on_image_failed)
+        else:
+            self._task = LegendImageTask(
+                get_legend_cache(),
+                self.layer_name,
                 style=self.layer_name,
-                legend_type='ALL'
+                legend_type='ALL',
+                max_size=self._viewport_size()
             )
-            
-            if pixmap and not pixmap.isNull():
-                self.legend_pixmap = pixmap
-                self.legend_label.setPixmap(pixmap)
-                LOGGER.info(f"Legend loaded successfully: {self.layer_name}")
+            self._task.imageReady.connect(self._on_image_ready)
+            self._task.imageFailed.connect(self._on_image_failed)
+        QgsApplication.taskManager().addTask(self._task)
+
+    def _on_atlas_ready(self, image, index):
+        """합성된 기하 유형별 범례를 표시 (GUI 스레드)"""
+        LOGGER.debug(f"Legend atlas for {self.layer_name}: {len(index)} legends")
+        self._on_image_ready(image)
+
+    def _on_image_ready(self, image):
+        """디코딩된 이미지를 표시 (GUI 스레드)"""
+        self._task = None
+        
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(self.devicePixelRatioF())
+        get_legend_cache().put_pixmap(self._cache_key(), pixmap)
+        self._show_pixmap(pixmap)
+
+    def _on_image_failed(self):
+        """범례를 불러오지 못한 경우 안내 메시지 표시"""
+        self._task = None
+        self.legend_label.setText(
+            f"범례를 불러올 수 없습니다.\n\n"
+            f"레이어: {self.layer_name}\n\n"
+            f"VWorld API에서 해당 레이어의 범례를\n"
+            f"제공하지 않거나 네트워크 오류가 발생했습니다."
+        )
+        LOGGER.warning(f"Failed to load legend: {self.layer_name}")
+
+    def _show_pixmap(self, pixmap):
+        """범례 이미지를 레이블에 표시"""
+        self.legend_pixmap = pixmap
+        self.legend_label.setPixmap(pixmap)
+        LOGGER.info(f"Legend loaded successfully: {self.layer_name}")
+
+    def _cancel_loading(self):
+        """진행 중인 범례 로드 작업 취소"""
+        if self._task is None:
+            return
+        
+        try:
+            if isinstance(self._task, LegendAtlasTask):
+                self._task.atlasReady.disconnect(self._on_atlas_ready)
+                self._task.atlasFailed.disconnect(self._on_image_failed)
             else:
-                self.legend_label.setText(
-                    f"범례를 불러올 수 없습니다.\n\n"
-                    f"레이어: {self.layer_name}\n\n"
-                    f"VWorld API에서 해당 레이어의 범례를\n"
-                    f"제공하지 않거나 네트워크 오류가 발생했습니다."
-                )
-                LOGGER.warning(f"Failed to load legend: {self.layer_name}")
-                
-        except Exception as e:
-            error_msg = f"범례 로드 중 오류 발생: {str(e)}"
-            self.legend_label.setText(error_msg)
-            LOGGER.error(error_msg)
+                self._task.imageReady.disconnect(self._on_image_ready)
+                self._task.imageFailed.disconnect(self._on_image_failed)
+            self._task.cancel()
+        except RuntimeError:
+            # 작업이 이미 끝나서 삭제됨
+            pass
+        self._task = None
+
+    def done(self, result):
+        """다이얼로그를 닫을 때 로드 작업 취소"""
+        self._closed = True
+        self._cancel_loading()
+        super().done(result)
 
     def get_pixmap(self):
         """
@@ -9,6 +9,7 @@ This dialog allows users to:
 """
 
 import logging
+from functools import partial
 from qgis.PyQt.QtCore import Qt
 from qgis.PyQt.QtWidgets import (
     QDialog,
@@ -25,9 +26,14 @@ from qgis.PyQt.QtWidgets import (
 )
 from qgis.core import QgsProject, QgsVectorLayer, QgsMessageLog, Qgis
 
-from ..core.api.vworld_client import VworldWFSClient
-from ..core.processor import VworldDataProcessor, ExtentType
-from ..definitions.layers import get_all_layers, get_layer_info
+from ..core.api.network import get_network_stats, warm_up_connection
+from ..core.api.scheduler import Priority
+from ..core.checkpoint import Checkpoint, remove_expired_checkpoints, tile_job_key
+from ..core.processor import ExtentType
+from ..core.tiling import TileGrid
+from ..core.utilities import get_bool_setting, set_setting
+from ..definitions.layers import MAX_TILES_PER_DOWNLOAD, get_layer_info
+from .layer_picker import LayerPicker
 from .legend_dialog import show_legend_dialog
 
 LOGGER = logging.getLogger('QuickVworld')
@@ -36,19 +42,26 @@ LOGGER = logging.getLogger('QuickVworld')
 class QuickVworldDialog(QDialog):
     """Main dialog for Quick Vworld plugin."""
 
-    def __init__(self, iface, parent=None):
+    def __init__(self, session, parent=None):
         """
         Constructor.
         
-        :param iface: QGIS interface
-        :type iface: QgsInterface
+        The dialog is created once per plugin session and reused, see
+        PluginSession.get_dialog().
+        
+        :param session: Plugin session
+        :type session: PluginSession
         :param parent: Parent widget
         :type parent: QWidget
         """
         super().__init__(parent)
         
-        self.iface = iface
-        self.processor = VworldDataProcessor(iface)
+        self.session = session
+        self.iface = session.iface
+        self.processor = session.processor
+        self.prefetcher = session.prefetcher
+        # Layer ID -> (layer, nameChanged slot) of the layers in the layer combo
+        self._rename_slots = {}
         
         # Initialize UI
         self.setup_ui()
@@ -104,16 +117,12 @@ class QuickVworldDialog(QDialog):
         layer_type_layout = QVBoxLayout()
         
         layer_type_label = QLabel("다운로드할 레이어:")
-        self.layer_type_combo = QComboBox()
         
-        # Add all available layers
-        all_layers = get_all_layers()
-        for typename, info in all_layers.items():
-            display_name = f"{info['name']} ({typename})"
-            self.layer_type_combo.addItem(display_name, typename)
+        # Searchable list of the whole layer catalog
+        self.layer_picker = LayerPicker()
         
         layer_type_layout.addWidget(layer_type_label)
-        layer_type_layout.addWidget(self.layer_type_combo)
+        layer_type_layout.addWidget(self.layer_picker)
         
         # Legend button
         self.legend_button = QPushButton("범례 보기")
@@ -126,6 +135,23 @@ class QuickVworldDialog(QDialog):
         self.layer_info_label.setStyleSheet("color: #666; font-size: 10px;")
         layer_type_layout.addWidget(self.layer_info_label)
         
+        # Append option
+        self.append_checkbox = QCheckBox("기존 VWorld 레이어에 추가 (같은 레이어 타입)")
+        self.append_checkbox.setToolTip(
+            "이미 불러온 같은 타입의 레이어에 피처를 병합합니다. "
+            "같은 ID의 피처는 갱신되고 새 피처만 추가됩니다"
+        )
+        self.append_checkbox.setChecked(get_bool_setting("append_mode"))
+        layer_type_layout.addWidget(self.append_checkbox)
+        
+        # Prefetch option
+        self.prefetch_checkbox = QCheckBox("지도 이동 방향의 타일 미리 받기")
+        self.prefetch_checkbox.setToolTip(
+            "캔버스를 이동하면 다음 영역의 데이터를 백그라운드에서 캐시에 저장합니다"
+        )
+        self.prefetch_checkbox.setChecked(self.prefetcher.is_enabled())
+        layer_type_layout.addWidget(self.prefetch_checkbox)
+        
         layer_type_group.setLayout(layer_type_layout)
         layout.addWidget(layer_type_group)
         
@@ -186,14 +212,41 @@ class QuickVworldDialog(QDialog):
         """Connect UI signals to slots."""
         self.extent_type_combo.currentIndexChanged.connect(self.update_layer_controls_state)
         self.layer_combo.currentIndexChanged.connect(self.update_selected_features_state)
-        self.layer_type_combo.currentIndexChanged.connect(self.update_layer_info)
+        self.layer_picker.currentTypenameChanged.connect(self.update_layer_info)
         self.legend_button.clicked.connect(self.show_legend)
+        self.prefetch_checkbox.toggled.connect(self.toggle_prefetch)
         self.download_button.clicked.connect(self.download_data)
         self.close_button.clicked.connect(self.reject)
+        
+        # Keep the layer combo in sync with the project
+        project = QgsProject.instance()
+        project.layersAdded.connect(self._on_layers_added)
+        project.layersRemoved.connect(self._on_layers_removed)
+
+    def disconnect_project(self):
+        """Stop following project layer changes (before the dialog is deleted)."""
+        project = QgsProject.instance()
+        project.layersAdded.disconnect(self._on_layers_added)
+        project.layersRemoved.disconnect(self._on_layers_removed)
+        for layer_id in list(self._rename_slots):
+            self._disconnect_layer(layer_id)
+
+    def reset(self):
+        """Reset progress and refresh state before the dialog is shown again."""
+        self.progress_bar.setValue(0)
+        self.status_label.setText("대기 중...")
+        self.request_url_label.hide()
+        self.prefetch_checkbox.setChecked(self.prefetcher.is_enabled())
+        self.update_layer_controls_state()
+        
+        # Open the connection while the user is still choosing
+        warm_up_connection()
 
     def populate_layer_combo(self):
         """Populate the layer combo box with available vector layers."""
         self.layer_combo.clear()
+        for layer_id in list(self._rename_slots):
+            self._disconnect_layer(layer_id)
         
         # Get all vector layers
         layers = QgsProject.instance().mapLayers().values()
@@ -205,7 +258,78 @@ class QuickVworldDialog(QDialog):
         
         # Add layers to combo
         for layer in vector_layers:
-            self.layer_combo.addItem(layer.name(), layer.id())
+            self._add_layer_item(layer)
+
+    def _add_layer_item(self, layer):
+        """
+        Add a vector layer to the layer combo.
+        
+        :param layer: Vector layer
+        :type layer: QgsVectorLayer
+        """
+        # Drop the "no layers" placeholder
+        if self.layer_combo.count() == 1 and self.layer_combo.itemData(0) is None:
+            self.layer_combo.removeItem(0)
+        
+        self.layer_combo.addItem(layer.name(), layer.id())
+        slot = partial(self._on_layer_renamed, layer.id())
+        layer.nameChanged.connect(slot)
+        self._rename_slots[layer.id()] = (layer, slot)
+
+    def _disconnect_layer(self, layer_id):
+        """
+        Stop following the name of a layer.
+        
+        :param layer_id: Layer ID
+        :type layer_id: str
+        """
+        layer, slot = self._rename_slots.pop(layer_id, (None, None))
+        if layer is None:
+            return
+        try:
+            layer.nameChanged.disconnect(slot)
+        except (RuntimeError, TypeError):
+            # The layer was already deleted, and its connections with it
+            pass
+
+    def _on_layers_added(self, layers):
+        """
+        Add new project layers to the layer combo.
+        
+        :param layers: Added layers
+        :type layers: list
+        """
+        for layer in layers:
+            if isinstance(layer, QgsVectorLayer):
+                self._add_layer_item(layer)
+
+    def _on_layers_removed(self, layer_ids):
+        """
+        Remove deleted project layers from the layer combo.
+        
+        :param layer_ids: Removed layer IDs
+        :type layer_ids: list
+        """
+        for layer_id in layer_ids:
+            self._disconnect_layer(layer_id)
+            index = self.layer_combo.findData(layer_id)
+            if index >= 0:
+                self.layer_combo.removeItem(index)
+        
+        if self.layer_combo.count() == 0:
+            self.layer_combo.addItem("(벡터 레이어 없음)", None)
+
+    def _on_layer_renamed(self, layer_id):
+        """
+        Update the combo text of a renamed layer.
+        
+        :param layer_id: Layer ID
+        :type layer_id: str
+        """
+        index = self.layer_combo.findData(layer_id)
+        layer = QgsProject.instance().mapLayer(layer_id)
+        if index >= 0 and layer:
+            self.layer_combo.setItemText(index, layer.name())
 
     def update_layer_controls_state(self):
         """Update enabled state of layer-related controls."""
@@ -236,7 +360,7 @@ class QuickVworldDialog(QDialog):
 
     def update_layer_info(self):
         """Update layer information display."""
-        typename = self.layer_type_combo.currentData()
+        typename = self.layer_picker.current_typename()
         
         if typename:
             layer_info = get_layer_info(typename)
@@ -248,6 +372,30 @@ class QuickVworldDialog(QDialog):
         else:
             self.layer_info_label.setText("")
 
+    def toggle_prefetch(self, enabled):
+        """
+        Enable or disable the canvas tile prefetcher.
+        
+        :param enabled: Enable prefetch
+        :type enabled: bool
+        """
+        typename = self.layer_picker.current_typename()
+        if enabled and typename and not self.prefetcher.typenames:
+            self._set_prefetch_typenames([typename])
+        
+        self.prefetcher.set_enabled(enabled)
+        set_setting("prefetch_enabled", "true" if enabled else "false")
+
+    def _set_prefetch_typenames(self, typenames):
+        """
+        Set the layers to prefetch, also for the next QGIS session.
+        
+        :param typenames: Layer typenames
+        :type typenames: list
+        """
+        self.prefetcher.set_typenames(typenames)
+        set_setting("prefetch_typenames", ",".join(typenames))
+
     def get_selected_layer(self):
         """
         Get the currently selected layer.
@@ -264,7 +412,7 @@ class QuickVworldDialog(QDialog):
 
     def show_legend(self):
         """Show legend dialog for the selected layer type."""
-        typename = self.layer_type_combo.currentData()
+        typename = self.layer_picker.current_typename()
         
         if not typename:
             QMessageBox.warning(
@@ -341,16 +489,79 @@ class QuickVworldDialog(QDialog):
             self.progress_bar.setValue(20)
             
             # Get layer type
-            typename = self.layer_type_combo.currentData()
+            typename = self.layer_picker.current_typename()
             layer_info = get_layer_info(typename)
             layer_name = layer_info['name'] if layer_info else typename
             
+            # Split the extent into grid tiles (aligned tiles can be cached)
+            grid = TileGrid()
+            tile_count = grid.tile_count(extent)
+            
+            if tile_count > MAX_TILES_PER_DOWNLOAD:
+                answer = QMessageBox.question(
+                    self,
+                    "확인",
+                    f"선택한 범위는 {tile_count}개의 타일 요청이 필요합니다.\n"
+                    f"계속하시겠습니까?"
+                )
+                if answer != QMessageBox.Yes:
+                    self.status_label.setText("취소되었습니다.")
+                    return
+            
             # Download data
             self.status_label.setText("VWorld WFS API에서 데이터 다운로드 중...")
             self.progress_bar.setValue(40)
             
-            client = VworldWFSClient()
-            data_file = client.fetch_data(typename, extent)
+            # Layer extents are usually not what the user is looking at
+            client = self.session.get_client(
+                Priority.INTERACTIVE_VISIBLE if extent_type == ExtentType.CANVAS
+                else Priority.INTERACTIVE_OFFSCREEN
+            )
+            
+            # Merge into the layer already loaded for this typename if asked
+            target_layer = None
+            if self.append_checkbox.isChecked():
+                target_layer = self.processor.find_vworld_layer(typename)
+                set_setting("append_mode", "true")
+                if target_layer is not None and target_layer.isEditable():
+                    # Provider writes would bypass the edit buffer and undo stack
+                    QMessageBox.warning(
+                        self,
+                        "편집 중인 레이어",
+                        f"'{target_layer.name()}' 레이어가 편집 모드입니다.\n"
+                        f"편집을 저장하거나 취소한 뒤 다시 시도하세요."
+                    )
+                    self.status_label.setText("취소되었습니다.")
+                    return
+            else:
+                set_setting("append_mode", "false")
+            
+            # Completed tiles are checkpointed so a failed or interrupted
+            # download continues from where it stopped when run again. Resumed
+            # tiles are read even if expired, so older checkpoints start over.
+            remove_expired_checkpoints(self.session.cache.ttl)
+            checkpoint = Checkpoint(
+                tile_job_key(typename, extent, grid),
+                description={'typename': typename, 'tiles': tile_count},
+                max_age=self.session.cache.ttl
+            )
+            if checkpoint.is_resumed():
+                self.status_label.setText(
+                    f"이전 다운로드를 이어서 받는 중... "
+                    f"({checkpoint.completed_count()}/{tile_count} 타일 완료)"
+                )
+            
+            # Features are added to the map as each tile arrives
+            loader = self.processor.create_progressive_loader(layer_name, typename, target_layer)
+            tile_files = client.fetch_tiles(
+                typename, extent, grid,
+                cache=self.session.cache,
+                progress_callback=self._on_tile_progress,
+                tile_callback=loader.add_tile,
+                checkpoint=checkpoint
+            )
+            
+            LOGGER.info(f"Network: {get_network_stats().summary()}")
             
             # Display the actual request URL that was used
             request_url = client.get_last_request_url()
@@ -358,9 +569,15 @@ class QuickVworldDialog(QDialog):
                 self.request_url_label.setText(f"Request URL:\n{request_url}")
                 self.request_url_label.show()
             
-            if not data_file:
+            layer = loader.finish()
+            
+            if not tile_files:
                 errors = client.get_errors()
                 error_msg = "\n".join(errors) if errors else "알 수 없는 오류"
+                if layer:
+                    error_msg += f"\n\n수신된 {loader.feature_count}개의 피처는 레이어에 추가되었습니다."
+                error_msg += (f"\n\n완료된 {checkpoint.completed_count()}개의 타일은 저장되었습니다. "
+                              f"다시 다운로드하면 나머지 타일부터 이어서 받습니다.")
                 
                 QMessageBox.critical(
                     self,
@@ -369,12 +586,8 @@ class QuickVworldDialog(QDialog):
                 )
                 return
             
-            self.progress_bar.setValue(70)
-            
-            # Create and load layer
-            self.status_label.setText("레이어 생성 중...")
-            
-            layer = self.processor.process_and_load(data_file, layer_name, typename)
+            # Every tile arrived; nothing left to resume
+            checkpoint.remove()
             
             if not layer:
                 QMessageBox.critical(
@@ -387,12 +600,15 @@ class QuickVworldDialog(QDialog):
             self.progress_bar.setValue(100)
             self.status_label.setText(f"완료! {layer.featureCount()}개의 피처를 다운로드했습니다.")
             
+            # Prefetch follows the layer that was just downloaded
+            self._set_prefetch_typenames([typename])
+            
             # Show success message
             QMessageBox.information(
                 self,
                 "성공",
                 f"데이터가 성공적으로 다운로드되었습니다!\n\n"
-                f"레이어: {layer_name}\n"
+                f"레이어: {layer.name()}\n"
                 f"피처 수: {layer.featureCount()}"
             )
             
@@ -413,3 +629,15 @@ class QuickVworldDialog(QDialog):
             # Re-enable controls
             self.download_button.setEnabled(True)
 
+    def _on_tile_progress(self, done, total):
+        """
+        Update progress while tiles are downloaded.
+        
+        :param done: Number of tiles fetched
+        :type done: int
+        :param total: Total number of tiles
+        :type total: int
+        """
+        self.progress_bar.setValue(40 + int(55 * done / total))
+        self.status_label.setText(f"VWorld WFS API에서 데이터 다운로드 중... ({done}/{total} 타일)")
+